@@ -0,0 +1,316 @@
+"""
+Offline compliance sweep over many projects.
+
+    python -m analyzer.batch repos/* archives/*.zip --manifest more.txt --eips ERC20,ERC721 --output sweep.jsonl
+
+Sources (directories, ZIPs, or paths listed one per line in a --manifest file) are read,
+parsed and statically classified in a process pool; only ambiguous (file, EIP) pairs go to the
+LLM, with at most --api-concurrency calls in flight. One JSON line is appended to --output per
+file as it completes. The output doubles as the checkpoint: re-running the same command skips
+files already recorded there without errors, so an interrupted sweep resumes where it stopped.
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import sys
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from typing import Dict, Iterable, List, Set, Tuple
+
+from analyzer.eip_interfaces import ConformanceChecker
+from analyzer.ingest import IngestLimits, load_solidity_directory, load_solidity_files
+from analyzer.similarity import (
+    DEFAULT_INDEX_PATH as DEFAULT_SIMILARITY_PATH, DEFAULT_PROVISIONAL_THRESHOLD, DEFAULT_REUSE_THRESHOLD,
+    SimilarityIndex
+)
+from analyzer.smart_contract_analyzer import DEFAULT_MIN_CONFIDENCE, SmartContractAnalyzer, conformance_signals
+from analyzer.static_classifier import StaticClassifier
+from analyzer.verdict_cache import DEFAULT_CACHE_PATH, VerdictCache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_API_CONCURRENCY = 8
+
+
+def read_sources(paths: Iterable[str], manifests: Iterable[str] = ()) -> List[str]:
+    """
+    Sources from the command line plus every non-blank, non-comment line of each manifest,
+    with duplicates removed. Relative manifest entries resolve against the manifest's directory.
+    """
+    sources = list(paths)
+    for manifest in manifests:
+        base = os.path.dirname(os.path.abspath(manifest))
+        with open(manifest, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if line and not line.startswith('#'):
+                    sources.append(line if os.path.isabs(line) else os.path.join(base, line))
+    return list(dict.fromkeys(sources))
+
+
+def prepare_source(source: str, eips: List[str]) -> Dict:
+    """
+    Process-pool stage: load a directory or ZIP, then parse and statically classify its files.
+    Returns {'source', 'ingest', 'files': [{'file', 'sha256', 'code', 'oz_modules', 'static',
+    'ambiguous', 'functions'}]} or {'source', 'error'}.
+    """
+    try:
+        limits = IngestLimits.from_env()
+        if os.path.isdir(source):
+            files, context_files, report = load_solidity_directory(source, limits)
+        elif zipfile.is_zipfile(source):
+            files, context_files, report = load_solidity_files(source, limits)
+        else:
+            return {'source': source, 'error': 'Not a directory or ZIP archive.'}
+
+        classifier = StaticClassifier({**context_files, **files})
+        conformance = ConformanceChecker(classifier)
+        prepared = []
+        for filename, code in files.items():
+            static = {}
+            ambiguous = []
+            for eip in eips:
+                verdict = classifier.classify(filename, eip)
+                if verdict is None:
+                    ambiguous.append(eip)
+                else:
+                    static[eip] = verdict
+            prepared.append({
+                'file': filename,
+                'sha256': hashlib.sha256(code.encode('utf-8')).hexdigest(),
+                'code': code,
+                'oz_modules': SmartContractAnalyzer.analyze_oz_imports(code),
+                'static': static,
+                'ambiguous': ambiguous,
+                'functions': conformance.check(filename, eips),
+            })
+        return {'source': source, 'ingest': report.summary(), 'files': prepared}
+    except Exception as e:
+        return {'source': source, 'error': f'{type(e).__name__}: {e}'}
+
+
+def completed_files(output_path: str, eips: List[str]) -> Set[Tuple[str, str, str]]:
+    """
+    (source, file, sha256) of every file recorded in an earlier run's output with all `eips`
+    decided and no errors. Truncated or malformed lines (e.g. from a crash) are ignored.
+    """
+    done = set()
+    if not os.path.exists(output_path):
+        return done
+    with open(output_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            compliance = record.get('compliance') or {}
+            if 'error' in record or not all(eip in compliance for eip in eips):
+                continue
+            if any(verdict.startswith('❌ Error') for verdict in compliance.values()):
+                continue
+            done.add((record.get('source'), record.get('file'), record.get('sha256')))
+    return done
+
+
+class BatchRun:
+    """
+    Drives one sweep: parse sources in processes, check ambiguous EIPs on threads, append JSONL.
+    """
+
+    def __init__(self, analyzer: SmartContractAnalyzer, eips: List[str], output, done: Set = None,
+                 processes: int = None, api_concurrency: int = DEFAULT_API_CONCURRENCY):
+        self.analyzer = analyzer
+        self.eips = eips
+        self.output = output
+        self.done = done or set()
+        self.processes = processes or os.cpu_count() or 1
+        self.api_concurrency = api_concurrency
+        self.stats = {
+            'sources': 0, 'source_failures': 0, 'files': 0, 'resumed': 0,
+            'static_only': 0, 'llm_files': 0, 'file_failures': 0,
+        }
+        self.failures: List[Dict] = []
+
+    def run(self, sources: List[str]) -> Dict:
+        started = time.perf_counter()
+        remaining = list(reversed(sources))
+        pending: Set[Future] = set()
+        parsing: Dict[Future, str] = {}
+
+        with ProcessPoolExecutor(max_workers=self.processes) as parsers, \
+                ThreadPoolExecutor(max_workers=self.api_concurrency) as api:
+            while remaining or pending:
+                # Keep a bounded number of parsed projects waiting, so memory stays flat
+                while remaining and len(parsing) < self.processes * 2:
+                    source = remaining.pop()
+                    future = parsers.submit(prepare_source, source, self.eips)
+                    parsing[future] = source
+                    pending.add(future)
+
+                finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    if future in parsing:
+                        source = parsing.pop(future)
+                        pending.update(self._handle_parsed(source, future, api))
+                    else:
+                        self._write(future.result())
+
+        elapsed = time.perf_counter() - started
+        analyzed = self.stats['files'] - self.stats['resumed']
+        return {
+            **self.stats,
+            'elapsed_seconds': round(elapsed, 3),
+            'files_per_second': round(analyzed / elapsed, 2) if elapsed else 0.0,
+            'llm_requests': self.analyzer.client.requests,
+            'llm_retries': self.analyzer.client.retries,
+            'cascade': self.analyzer.cascade_stats(),
+            'failures': self.failures,
+        }
+
+    def _handle_parsed(self, source: str, future: Future, api: ThreadPoolExecutor) -> List[Future]:
+        self.stats['sources'] += 1
+        try:
+            parsed = future.result()
+        except Exception as e:
+            parsed = {'source': source, 'error': f'{type(e).__name__}: {e}'}
+        if 'error' in parsed:
+            self.stats['source_failures'] += 1
+            self.failures.append({'source': source, 'error': parsed['error']})
+            self._write(parsed)
+            return []
+
+        submitted = []
+        for item in parsed['files']:
+            self.stats['files'] += 1
+            if (source, item['file'], item['sha256']) in self.done:
+                self.stats['resumed'] += 1
+                continue
+            if not item['ambiguous']:
+                self.stats['static_only'] += 1
+                self._write(self._record(source, item, {}, 0.0))
+                continue
+            self.stats['llm_files'] += 1
+            submitted.append(api.submit(self._check, source, item))
+        return submitted
+
+    def _check(self, source: str, item: Dict) -> Dict:
+        started = time.perf_counter()
+        try:
+            verdicts = {}
+            pending = item['ambiguous']
+            similar = self.analyzer.similar_verdicts(item['code'], pending)
+            if similar is not None and similar.reusable:
+                verdicts.update(similar.verdicts)
+                pending = [eip for eip in pending if eip not in similar.verdicts]
+            if pending:
+                verdicts.update(self.analyzer.check_eip_compliance(item['code'], item['oz_modules'], pending,
+                                                                   conformance_signals(item['functions'])))
+        except Exception as e:
+            return {'source': source, 'file': item['file'], 'sha256': item['sha256'],
+                    'error': f'{type(e).__name__}: {e}'}
+        record = self._record(source, item, verdicts, time.perf_counter() - started)
+        if similar is not None:
+            record['similar'] = similar.summary()
+        return record
+
+    def _record(self, source: str, item: Dict, verdicts: Dict, elapsed: float) -> Dict:
+        compliance = {**item['static'], **verdicts}
+        return {
+            'source': source,
+            'file': item['file'],
+            'sha256': item['sha256'],
+            'oz_modules': item['oz_modules'],
+            'compliance': {eip: compliance[eip] for eip in self.eips},
+            'static_eips': sorted(item['static']),
+            'functions': item['functions'],
+            'elapsed_seconds': round(elapsed, 3),
+        }
+
+    def _write(self, record: Dict) -> None:
+        if 'file' in record and ('error' in record or any(
+                verdict.startswith('❌ Error') for verdict in record['compliance'].values())):
+            self.stats['file_failures'] += 1
+            self.failures.append({'source': record['source'], 'file': record['file'],
+                                  'error': record.get('error') or 'LLM analysis error'})
+        self.output.write(json.dumps(record) + '\n')
+        # Flushed per line so the output is a usable checkpoint after any interruption
+        self.output.flush()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('sources', nargs='*', help="Project directories or ZIP archives")
+    parser.add_argument('--manifest', action='append', default=[], help="File listing one source per line")
+    parser.add_argument('--eips', required=True, help="Comma-separated standards, e.g. ERC20,ERC721")
+    parser.add_argument('--output', required=True, help="JSONL results file; also the resume checkpoint")
+    parser.add_argument('--restart', action='store_true', help="Discard earlier results instead of resuming")
+    parser.add_argument('--processes', type=int, default=None, help="Parsing processes (default: CPU count)")
+    parser.add_argument('--api-concurrency', type=int, default=DEFAULT_API_CONCURRENCY,
+                        help="Maximum concurrent OpenAI calls (OPENAI_RPM/OPENAI_TPM still apply)")
+    parser.add_argument('--model', default="gpt-4")
+    parser.add_argument('--first-pass-model',
+                        help="Cheaper model asked first; uncertain answers are escalated to --model "
+                             "(default: ANALYSIS_FIRST_PASS_MODEL)")
+    parser.add_argument('--min-confidence', type=float,
+                        help="First-pass answers below this confidence are escalated "
+                             "(default: ANALYSIS_ESCALATION_CONFIDENCE or 0.8)")
+    parser.add_argument('--no-cache', action='store_true', help="Do not use the verdict cache or the similarity index")
+    parser.add_argument('--summary', help="Also write the final summary JSON here")
+    args = parser.parse_args(argv)
+
+    from dotenv import load_dotenv
+    load_dotenv()
+    logging.basicConfig(level=os.getenv('LOG_LEVEL', 'INFO').upper(),
+                        format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+
+    sources = read_sources(args.sources, args.manifest)
+    if not sources:
+        parser.error("no sources given")
+    eips = [eip.strip() for eip in args.eips.split(',') if eip.strip()]
+
+    cache = None
+    if not args.no_cache and os.getenv('VERDICT_CACHE_ENABLED', '1') != '0':
+        cache = VerdictCache(path=os.getenv('VERDICT_CACHE_PATH', DEFAULT_CACHE_PATH))
+    similarity = None
+    if not args.no_cache and os.getenv('SIMILARITY_INDEX_ENABLED', '1') != '0':
+        similarity = SimilarityIndex(
+            path=os.getenv('SIMILARITY_INDEX_PATH', DEFAULT_SIMILARITY_PATH),
+            reuse_threshold=float(os.getenv('SIMILARITY_REUSE_THRESHOLD', str(DEFAULT_REUSE_THRESHOLD))),
+            provisional_threshold=float(
+                os.getenv('SIMILARITY_PROVISIONAL_THRESHOLD', str(DEFAULT_PROVISIONAL_THRESHOLD))
+            )
+        )
+    analyzer = SmartContractAnalyzer(
+        api_key=os.getenv('OPENAI_API_KEY'),
+        model=args.model,
+        cache=cache,
+        batch_eips=os.getenv('ANALYSIS_BATCH_EIPS', '1') != '0',
+        minimize=os.getenv('PROMPT_MINIMIZE', '1') != '0',
+        token_budget=int(os.getenv('PROMPT_TOKEN_BUDGET', '6000')),
+        first_pass_model=args.first_pass_model or os.getenv('ANALYSIS_FIRST_PASS_MODEL', ''),
+        min_confidence=args.min_confidence if args.min_confidence is not None else float(
+            os.getenv('ANALYSIS_ESCALATION_CONFIDENCE', str(DEFAULT_MIN_CONFIDENCE))
+        ),
+        similarity=similarity
+    )
+
+    done = set() if args.restart else completed_files(args.output, eips)
+    if done:
+        logger.info("Resuming: %d files already completed in %s", len(done), args.output)
+    with open(args.output, 'w' if args.restart else 'a', encoding='utf-8') as output:
+        run = BatchRun(analyzer, eips, output, done, args.processes, args.api_concurrency)
+        summary = run.run(sources)
+
+    text = json.dumps(summary, indent=2)
+    if args.summary:
+        with open(args.summary, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+    print(text)
+    return 1 if summary['source_failures'] or summary['file_failures'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,382 @@
+import argparse
+import json
+import os
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, List, Optional, Set, Tuple
+
+from analyzer.keccak import keccak256
+from analyzer.solidity_parser import ContractDecl, Signature
+from analyzer.static_classifier import StaticClassifier, eip_families, normalize_eip
+
+DEFAULT_INDEX_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'eip_interfaces.json')
+
+# OpenZeppelin contracts whose names do not reveal every indexed interface they implement
+_OZ_EXTRA_INTERFACES = {
+    'Ownable': {'ERC173'},
+    'Ownable2Step': {'ERC173'},
+    'OwnableUpgradeable': {'ERC173'},
+    'Ownable2StepUpgradeable': {'ERC173'},
+    'ERC20Permit': {'ERC2612'},
+    'ERC20PermitUpgradeable': {'ERC2612'},
+    'ERC721Royalty': {'ERC2981'},
+    'ERC721RoyaltyUpgradeable': {'ERC2981'},
+}
+
+_ELEMENTARY_RE = re.compile(r'address|bool|string|bytes(?:[1-9]|[12]\d|3[0-2])?|u?int\d*|u?fixed(?:\d+x\d+)?')
+_TYPE_ALIASES = {'uint': 'uint256', 'int': 'int256', 'byte': 'bytes1', 'fixed': 'fixed128x18', 'ufixed': 'ufixed128x18'}
+# Visibilities that put a function in the ABI; functions without one are public before Solidity 0.5
+_VISIBLE = ('external', 'public', '')
+
+
+def selector(signature: str) -> str:
+    """
+    4-byte function selector of a canonical signature, e.g. transfer(address,uint256) -> 0xa9059cbb.
+    """
+    return '0x' + _digest(signature)[:8]
+
+
+def event_topic(signature: str) -> str:
+    """
+    Topic 0 of a non-anonymous event with the given canonical signature.
+    """
+    return '0x' + _digest(signature)
+
+
+@lru_cache(maxsize=4096)
+def _digest(signature: str) -> str:
+    return keccak256(signature.encode('ascii')).hex()
+
+
+def canonical_type(raw: str, types: Dict[str, str] = None, depth: int = 0) -> str:
+    """
+    ABI type of a Solidity type as written: `uint` -> `uint256`, contracts and interfaces ->
+    `address`, enums -> `uint8`, structs -> a tuple of their members and user-defined value
+    types -> their underlying type. `types` maps user-defined names to their parsed definitions.
+    """
+    types = types or {}
+    base, bracket, dimensions = raw.partition('[')
+    suffix = bracket + dimensions
+    base = _TYPE_ALIASES.get(base, base)
+    definition = types.get(base)
+    if _ELEMENTARY_RE.fullmatch(base) or base == 'function' or not base:
+        pass
+    elif definition == 'enum':
+        base = 'uint8'
+    elif definition is not None and depth < 8:
+        if definition.startswith('struct('):
+            members = definition[len('struct('):-1]
+            base = '(' + ','.join(canonical_type(m, types, depth + 1) for m in members.split(',') if m) + ')'
+        else:
+            base = canonical_type(definition, types, depth + 1)
+    else:
+        base = 'address'
+    return base + suffix
+
+
+def canonical_signature(signature: Signature, types: Dict[str, str] = None) -> str:
+    return f"{signature.name}({','.join(canonical_type(p, types) for p in signature.params)})"
+
+
+@dataclass(frozen=True)
+class IndexedFunction:
+    signature: str
+    selector: str
+    # Comma-separated canonical return types; empty when the function returns nothing
+    returns: str = ''
+
+    @property
+    def name(self) -> str:
+        return self.signature.split('(', 1)[0]
+
+
+@dataclass
+class EIPInterface:
+    name: str
+    extends: List[str]
+    functions: List[IndexedFunction]
+    optional_functions: List[IndexedFunction]
+    # Canonical event signature -> topic
+    events: Dict[str, str]
+    interface_id: str = ''
+
+
+class InterfaceIndex:
+    """
+    Required and optional functions (with selectors) and events (with topics) of common EIPs,
+    loaded from `analyzer/data/eip_interfaces.json`.
+    """
+
+    def __init__(self, interfaces: Dict[str, EIPInterface] = None):
+        self.interfaces = interfaces or {}
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_INDEX_PATH) -> 'InterfaceIndex':
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        interfaces = {}
+        for name, spec in data.get('interfaces', {}).items():
+            interfaces[name] = EIPInterface(
+                name=name,
+                extends=spec.get('extends', []),
+                functions=[IndexedFunction(**entry) for entry in spec.get('functions', [])],
+                optional_functions=[IndexedFunction(**entry) for entry in spec.get('optional_functions', [])],
+                events={entry['signature']: entry['topic'] for entry in spec.get('events', [])},
+                interface_id=spec.get('interface_id', ''),
+            )
+        return cls(interfaces)
+
+    def get(self, eip: str) -> Optional[EIPInterface]:
+        return self.interfaces.get(normalize_eip(eip) or eip)
+
+    def closure(self, eip: str) -> List[EIPInterface]:
+        """
+        The interface of `eip` followed by every interface it extends, transitively.
+        """
+        found = []
+        pending = [eip]
+        while pending:
+            interface = self.get(pending.pop(0))
+            if interface is not None and interface not in found:
+                found.append(interface)
+                pending.extend(interface.extends)
+        return found
+
+    def functions(self, eip: str, optional: bool = False) -> List[IndexedFunction]:
+        """
+        Required functions of `eip` and the interfaces it extends, plus optional ones if asked.
+        """
+        entries = {}
+        for interface in self.closure(eip):
+            for entry in interface.functions + (interface.optional_functions if optional else []):
+                entries.setdefault(entry.selector, entry)
+        return list(entries.values())
+
+    def events(self, eip: str) -> Dict[str, str]:
+        events = {}
+        for interface in self.closure(eip):
+            events.update(interface.events)
+        return events
+
+
+@lru_cache(maxsize=4)
+def load_index(path: str = DEFAULT_INDEX_PATH) -> InterfaceIndex:
+    return InterfaceIndex.load(path)
+
+
+def rebuild_index(path: str = DEFAULT_INDEX_PATH) -> int:
+    """
+    Recompute the selectors, event topics and ERC-165 interface ids stored in the index file
+    from its signatures. Returns the number of interfaces.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    for spec in data['interfaces'].values():
+        interface_id = 0
+        for entry in spec.get('functions', []):
+            entry['selector'] = selector(entry['signature'])
+            interface_id ^= int(entry['selector'], 16)
+        for entry in spec.get('optional_functions', []):
+            entry['selector'] = selector(entry['signature'])
+        for entry in spec.get('events', []):
+            entry['topic'] = event_topic(entry['signature'])
+        spec['interface_id'] = f'0x{interface_id:08x}'
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=1, sort_keys=True)
+        f.write('\n')
+    load_index.cache_clear()
+    return len(data['interfaces'])
+
+
+@dataclass
+class ConformanceReport:
+    """
+    How one contract's public interface compares with an EIP's. `mismatched` pairs an expected
+    function or event with the same-named declarations whose parameter or return types differ.
+    """
+    eip: str
+    contract: str
+    missing: List[Dict[str, str]] = field(default_factory=list)
+    mismatched: List[Dict] = field(default_factory=list)
+    extra: List[Dict[str, str]] = field(default_factory=list)
+    missing_events: List[Dict[str, str]] = field(default_factory=list)
+    # Bases that could not be found in the upload, which may provide what is missing
+    unresolved_bases: List[str] = field(default_factory=list)
+
+    @property
+    def complies(self) -> bool:
+        return not (self.missing or self.mismatched or self.missing_events)
+
+    def score(self) -> int:
+        return len(self.missing) + len(self.mismatched) + len(self.missing_events)
+
+    def to_dict(self) -> Dict:
+        return {
+            'contract': self.contract,
+            'complies': self.complies,
+            'missing': self.missing,
+            'mismatched': self.mismatched,
+            'extra': self.extra,
+            'missing_events': self.missing_events,
+            'unresolved_bases': self.unresolved_bases,
+        }
+
+
+class _PublicInterface:
+    def __init__(self):
+        # Selector -> (canonical signature, canonical returns or None when unknown)
+        self.functions: Dict[str, Tuple[str, Optional[str]]] = {}
+        # Event name -> canonical signatures
+        self.events: Dict[str, Set[str]] = {}
+        self.unresolved: Set[str] = set()
+
+    def merge(self, other: '_PublicInterface') -> None:
+        for key, value in other.functions.items():
+            self.functions.setdefault(key, value)
+        for name, signatures in other.events.items():
+            self.events.setdefault(name, set()).update(signatures)
+        self.unresolved |= other.unresolved
+
+
+class ConformanceChecker:
+    """
+    Compare the public and external functions and the events of every contract, including
+    inherited ones, with the EIP interface index. Works on the files already parsed by a
+    StaticClassifier, so checking a whole project is one pass of set lookups.
+    """
+
+    def __init__(self, classifier: StaticClassifier, index: InterfaceIndex = None):
+        self.classifier = classifier
+        self.index = index or load_index()
+        self.types: Dict[str, str] = {}
+        for unit in classifier.units.values():
+            if unit is not None:
+                for name, definition in unit.types.items():
+                    self.types.setdefault(name, definition)
+        self._resolved: Dict[Tuple[str, str], _PublicInterface] = {}
+
+    @classmethod
+    def from_sources(cls, solidity_files: Dict[str, str], index: InterfaceIndex = None) -> 'ConformanceChecker':
+        return cls(StaticClassifier(solidity_files), index)
+
+    def check(self, filename: str, eips: List[str]) -> Dict[str, Dict]:
+        """
+        Return {eip: report dict} for each indexed EIP, for the contract of `filename` that
+        conforms best (the last declared one on ties). Files declaring no contract get no reports.
+        """
+        unit = self.classifier.units.get(filename)
+        if unit is None:
+            return {}
+        contracts = [c for c in unit.contracts if c.kind == 'contract']
+        reports = {}
+        for eip in eips:
+            if self.index.get(eip) is None:
+                continue
+            candidates = [self.report(contract.name, filename, eip) for contract in contracts]
+            if candidates:
+                best = min(reversed(candidates), key=ConformanceReport.score)
+                reports[eip] = best.to_dict()
+        return reports
+
+    def report(self, contract: str, filename: str, eip: str) -> ConformanceReport:
+        interface = self._interface(contract, filename, set())
+        report = ConformanceReport(eip=eip, contract=contract, unresolved_bases=sorted(interface.unresolved))
+
+        required = self.index.functions(eip)
+        allowed = {entry.selector for entry in self.index.functions(eip, optional=True)}
+        unmatched_by_name: Dict[str, List[str]] = {}
+        for selector_, (signature, _) in interface.functions.items():
+            if selector_ not in allowed:
+                unmatched_by_name.setdefault(signature.split('(', 1)[0], []).append(signature)
+                report.extra.append({'signature': signature, 'selector': selector_})
+
+        for entry in required:
+            found = interface.functions.get(entry.selector)
+            if found is None:
+                others = sorted(unmatched_by_name.get(entry.name, []))
+                if others:
+                    report.mismatched.append({'expected': entry.signature, 'found': others})
+                else:
+                    report.missing.append({'signature': entry.signature, 'selector': entry.selector})
+            elif found[1] is not None and found[1] != entry.returns:
+                report.mismatched.append({
+                    'expected': _with_returns(entry.signature, entry.returns),
+                    'found': [_with_returns(found[0], found[1])],
+                })
+
+        for signature, topic in self.index.events(eip).items():
+            declared = interface.events.get(signature.split('(', 1)[0], set())
+            if signature in declared:
+                continue
+            if declared:
+                report.mismatched.append({'expected': f'event {signature}',
+                                          'found': [f'event {other}' for other in sorted(declared)]})
+            else:
+                report.missing_events.append({'signature': signature, 'topic': topic})
+
+        report.extra.sort(key=lambda item: item['signature'])
+        return report
+
+    def _interface(self, name: str, filename: str, seen: Set[Tuple[str, str]]) -> _PublicInterface:
+        declared = self.classifier.lookup(name, filename)
+        if declared is None:
+            interface = _PublicInterface()
+            self._external_interface(name, filename, interface)
+            return interface
+        return self._declared_interface(*declared, seen)
+
+    def _declared_interface(self, declared_in: str, contract: ContractDecl,
+                            seen: Set[Tuple[str, str]]) -> _PublicInterface:
+        key = (declared_in, contract.name)
+        if key in self._resolved:
+            return self._resolved[key]
+
+        interface = _PublicInterface()
+        if key in seen:
+            return interface
+        seen.add(key)
+
+        # Own declarations take precedence over (overridden) base ones
+        for signature in contract.signatures:
+            if signature.visibility in _VISIBLE:
+                canonical = canonical_signature(signature, self.types)
+                returns = ','.join(canonical_type(r, self.types) for r in signature.returns)
+                # Struct getters return the members, which the getter signature does not record
+                known = None if returns.startswith('(') and len(signature.returns) == 1 else returns
+                interface.functions.setdefault(selector(canonical), (canonical, known))
+        for event in contract.events:
+            interface.events.setdefault(event.name, set()).add(canonical_signature(event, self.types))
+        for base in contract.bases:
+            interface.merge(self._interface(base, declared_in, seen))
+
+        self._resolved[key] = interface
+        return interface
+
+    def _external_interface(self, name: str, filename: str, interface: _PublicInterface) -> None:
+        """
+        Fill in an OpenZeppelin base that is imported but not part of the upload from the index.
+        """
+        original = self.classifier.openzeppelin_name(name, filename)
+        if original is None:
+            interface.unresolved.add(name)
+            return
+        is_interface = original.startswith('I') and original[1:2].isupper()
+        # Interfaces only declare the required functions; implementations add the optional metadata
+        optional = not is_interface or 'Metadata' in original
+        for eip in sorted(eip_families(original) | _OZ_EXTRA_INTERFACES.get(original, set())):
+            for entry in self.index.functions(eip, optional=optional):
+                interface.functions.setdefault(entry.selector, (entry.signature, entry.returns))
+            for signature in self.index.events(eip):
+                interface.events.setdefault(signature.split('(', 1)[0], set()).add(signature)
+
+
+def _with_returns(signature: str, returns: str) -> str:
+    return f'{signature} returns ({returns})' if returns else signature
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Recompute selectors, topics and interface ids in the EIP interface index.")
+    parser.add_argument('--index', default=DEFAULT_INDEX_PATH, help="Index file to update")
+    args = parser.parse_args()
+    print(f"Rebuilt {rebuild_index(args.index)} interfaces in {args.index}")
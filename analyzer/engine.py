@@ -0,0 +1,210 @@
+import contextvars
+import os
+import queue
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+from analyzer import metrics
+from analyzer.eip_interfaces import ConformanceChecker
+from analyzer.similarity import SimilarMatch
+from analyzer.smart_contract_analyzer import SmartContractAnalyzer, conformance_signals, stream_tokens
+from analyzer.static_classifier import StaticClassifier
+
+DEFAULT_MAX_WORKERS = 8
+
+
+class TokenDelta(NamedTuple):
+    """
+    Fragment of a streamed LLM answer about `eips` of `filename`.
+    """
+    filename: str
+    eips: List[str]
+    text: str
+
+
+class Provisional(NamedTuple):
+    """
+    Verdicts of a similar, previously analyzed contract shown for `filename` until the LLM decides.
+    """
+    filename: str
+    compliance: Dict[str, str]
+    similar: Dict
+
+
+class AnalysisEngine:
+    """
+    Fan out (file, EIP) compliance checks over a bounded thread pool.
+    """
+
+    def __init__(self, analyzer: SmartContractAnalyzer, max_workers: int = None):
+        """
+        Initialize the engine. `max_workers` caps the number of in-flight
+        OpenAI calls and defaults to the ANALYSIS_MAX_WORKERS env variable.
+        """
+        self.analyzer = analyzer
+        self.max_workers = max_workers or int(os.getenv('ANALYSIS_MAX_WORKERS', DEFAULT_MAX_WORKERS))
+        if self.max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+
+    def run(self, solidity_files: Dict[str, str], selected_eips: List[str],
+            context_files: Dict[str, str] = None) -> Dict:
+        """
+        Analyze every file for every selected EIP and return results keyed by filename,
+        in the same shape the /analyze route has always returned.
+        """
+        completed = dict(self.iter_results(solidity_files, selected_eips, context_files))
+        return {filename: completed[filename] for filename in solidity_files}
+
+    def iter_results(self, solidity_files: Dict[str, str], selected_eips: List[str],
+                     context_files: Dict[str, str] = None, heartbeat_interval: float = None,
+                     stream: bool = False,
+                     provisional: bool = False) -> Iterator[Union[None, Tuple[str, Dict], TokenDelta, Provisional]]:
+        """
+        Yield (filename, result) pairs in completion order as soon as every EIP of a file is decided.
+
+        Verdicts the static classifier can decide from imports and inheritance are filled in
+        directly, as are those a near-duplicate of the file was already analyzed for (see
+        SmartContractAnalyzer.similar_verdicts); only the remaining ambiguous (file, EIP) pairs
+        are sent to the LLM. Results also carry a
+        `functions` report comparing the file's public interface with the indexed EIP interfaces
+        (see ConformanceChecker). `context_files` are extra sources (e.g. vendored libraries)
+        used to resolve inheritance but not analyzed.
+        When `heartbeat_interval` is set, None is yielded whenever no file finished for that long.
+        With `stream`, LLM answers are streamed and TokenDelta items are yielded as they arrive.
+        With `provisional`, a Provisional item is yielded for files whose near-duplicate match is
+        too distant (or differs in imports or inheritance) for its verdicts to be reused.
+        """
+        with metrics.span('static_index'):
+            classifier = StaticClassifier({**(context_files or {}), **solidity_files})
+            conformance = ConformanceChecker(classifier)
+        ready = queue.Queue()
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        outstanding = 0
+
+        try:
+            for filename, code in solidity_files.items():
+                try:
+                    with metrics.span('import_parsing'):
+                        oz_imports = self.analyzer.analyze_oz_imports(code)
+                    on_token = self._token_sink(ready, filename) if stream else None
+                    with metrics.span('function_conformance'):
+                        functions = conformance.check(filename, selected_eips)
+                    decided, futures, similar = self._submit(
+                        executor, classifier, filename, code, oz_imports, selected_eips, on_token,
+                        conformance_signals(functions)
+                    )
+                except Exception as e:
+                    ready.put((filename, {'error': f'Error analyzing file: {str(e)}'}))
+                    outstanding += 1
+                    continue
+
+                outstanding += 1
+                extra = {}
+                if functions:
+                    extra['functions'] = functions
+                if similar is not None:
+                    extra['similar'] = similar.summary()
+                    if provisional and futures and not similar.reusable:
+                        ready.put(Provisional(filename, similar.verdicts, similar.summary()))
+                if futures and self.analyzer.minimize:
+                    extra['prompt_stats'] = self.analyzer.prepare_source(code).stats
+                self._collect_when_done(ready, filename, oz_imports, selected_eips, decided, futures, extra)
+
+            while outstanding:
+                try:
+                    item = ready.get(timeout=heartbeat_interval)
+                except queue.Empty:
+                    yield None
+                    continue
+                if not isinstance(item, (TokenDelta, Provisional)):
+                    outstanding -= 1
+                yield item
+        finally:
+            # Stop queued LLM calls if the consumer goes away (e.g. a closed stream)
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    @staticmethod
+    def _token_sink(ready: queue.Queue, filename: str) -> Callable[[List[str], str], None]:
+        return lambda eips, text: ready.put(TokenDelta(filename, list(eips), text))
+
+    @staticmethod
+    def _collect_when_done(ready: queue.Queue, filename: str, oz_imports: List[str], selected_eips: List[str],
+                           decided: Dict, futures: List[Future], extra: Dict) -> None:
+        """
+        Push the file's combined result (plus any `extra` fields) onto `ready` once its last future completes.
+        """
+        remaining = [len(futures)]
+        lock = threading.Lock()
+
+        def finish():
+            try:
+                compliance = dict(decided)
+                for future in futures:
+                    compliance.update(future.result())
+                result = {
+                    'oz_modules': oz_imports,
+                    'compliance': {eip: compliance[eip] for eip in selected_eips},
+                    **extra
+                }
+            except Exception as e:
+                result = {'error': f'Error analyzing file: {str(e)}'}
+            ready.put((filename, result))
+
+        def on_done(_future):
+            with lock:
+                remaining[0] -= 1
+                last = remaining[0] == 0
+            if last:
+                finish()
+
+        if not futures:
+            finish()
+        for future in futures:
+            future.add_done_callback(on_done)
+
+    def _submit(self, executor: ThreadPoolExecutor, classifier: StaticClassifier, filename: str,
+                code: str, oz_imports: List[str], selected_eips: List[str],
+                on_token: Callable[[List[str], str], None] = None,
+                signals: Dict[str, bool] = None) -> Tuple[Dict, List[Future], Optional[SimilarMatch]]:
+        """
+        Resolve what the static classifier and a reusable near-duplicate match can and submit the
+        rest as LLM tasks, either one batched task per file or one task per EIP. Every future
+        resolves to {eip: verdict}. Also returns the near-duplicate match, if any.
+        With `on_token`, the tasks stream their LLM answers to it. `signals` are the file's
+        function-conformance results, which first-pass model answers are checked against.
+        """
+        static_verdicts = {}
+        ambiguous = []
+        with metrics.span('static_classification'):
+            for eip in selected_eips:
+                verdict = classifier.classify(filename, eip)
+                if verdict is None:
+                    ambiguous.append(eip)
+                else:
+                    static_verdicts[eip] = verdict
+        metrics.VERDICTS.inc(len(static_verdicts), source='static')
+
+        decided = dict(static_verdicts)
+        similar = self.analyzer.similar_verdicts(code, ambiguous)
+        if similar is not None and similar.reusable:
+            decided.update(similar.verdicts)
+            ambiguous = [eip for eip in ambiguous if eip not in similar.verdicts]
+
+        # Each task runs in a copy of the caller's context so its spans reach the request's timings
+        def submit(fn, *args):
+            if on_token is not None:
+                return executor.submit(contextvars.copy_context().run, _streamed, on_token, fn, *args)
+            return executor.submit(contextvars.copy_context().run, fn, *args)
+
+        if self.analyzer.batch_eips and len(ambiguous) > 1:
+            futures = [submit(self.analyzer.check_eip_compliance_batch, code, oz_imports, ambiguous, signals)]
+        else:
+            futures = [submit(self.analyzer.check_eip_compliance, code, oz_imports, [eip], signals)
+                       for eip in ambiguous]
+        return decided, futures, similar
+
+
+def _streamed(on_token: Callable[[List[str], str], None], fn: Callable, *args):
+    with stream_tokens(on_token):
+        return fn(*args)
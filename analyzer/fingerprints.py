@@ -0,0 +1,117 @@
+import argparse
+import hashlib
+import json
+import os
+from typing import Dict, Optional
+
+DEFAULT_INDEX_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'oz_fingerprints.json')
+
+# Directories of a library checkout that hold tooling or dependencies rather than its sources
+_SKIPPED_DIRECTORIES = {'.git', 'node_modules', 'lib', 'test', 'scripts', 'certora', 'fv'}
+
+
+def normalized_hash(code: str) -> str:
+    """
+    Hash source text with line endings and trailing whitespace normalized, so the same
+    library file matches regardless of how it was checked out.
+    """
+    lines = code.replace('\r\n', '\n').replace('\r', '\n').split('\n')
+    normalized = '\n'.join(line.rstrip() for line in lines).strip('\n')
+    return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+
+class FingerprintIndex:
+    """
+    Lookup table from normalized content hash to a known library file, e.g.
+    "@openzeppelin/contracts@4.9.6:token/ERC20/ERC20.sol".
+    """
+
+    def __init__(self, hashes: Dict[str, str] = None, releases=None):
+        self.hashes = hashes or {}
+        self.releases = list(releases or [])
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_INDEX_PATH) -> 'FingerprintIndex':
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return cls()
+        return cls(data.get('hashes', {}), data.get('releases', []))
+
+    def save(self, path: str = DEFAULT_INDEX_PATH) -> None:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'version': 1, 'releases': self.releases, 'hashes': self.hashes}, f, indent=1, sort_keys=True)
+            f.write('\n')
+
+    def match(self, code: str) -> Optional[str]:
+        """
+        Return the known library file `code` is identical to, or None.
+        """
+        if not self.hashes:
+            return None
+        return self.hashes.get(normalized_hash(code))
+
+    def add_release(self, label: str, root: str) -> int:
+        """
+        Fingerprint every .sol file below `root` (a checkout or unpacked release) under `label`.
+        A checkout's tests, scripts and dependencies are skipped.
+        """
+        added = 0
+        for directory, subdirectories, files in os.walk(root):
+            subdirectories[:] = sorted(d for d in subdirectories if d not in _SKIPPED_DIRECTORIES)
+            for name in sorted(files):
+                if not name.endswith('.sol'):
+                    continue
+                path = os.path.join(directory, name)
+                with open(path, 'r', encoding='utf-8') as f:
+                    digest = normalized_hash(f.read())
+                relative = os.path.relpath(path, root).replace(os.sep, '/')
+                self.hashes.setdefault(digest, f"{label}:{relative}")
+                added += 1
+        if label not in self.releases:
+            self.releases.append(label)
+        return added
+
+
+def release_label(checkout: str) -> str:
+    """
+    `<name>@<version>` from the package.json of a library checkout, e.g. @openzeppelin/contracts@4.9.6.
+    """
+    for candidate in (os.path.join(checkout, 'contracts', 'package.json'), os.path.join(checkout, 'package.json')):
+        try:
+            with open(candidate, 'r', encoding='utf-8') as f:
+                package = json.load(f)
+        except (FileNotFoundError, ValueError):
+            continue
+        if package.get('name') and package.get('version'):
+            return f"{package['name']}@{package['version']}"
+    raise ValueError(f"No package.json with a name and version in {checkout}; pass --label")
+
+
+def build(checkout: str, label: str = None, path: str = DEFAULT_INDEX_PATH) -> int:
+    """
+    Add the sources of a library checkout to the index at `path`. Returns the number of files.
+    """
+    label = label or release_label(checkout)
+    sources = os.path.join(checkout, 'contracts')
+    index = FingerprintIndex.load(path)
+    count = index.add_release(label, sources if os.path.isdir(sources) else checkout)
+    index.save(path)
+    return count
+
+
+if __name__ == '__main__':
+    # Example: git clone -b v4.9.6 https://github.com/OpenZeppelin/openzeppelin-contracts
+    #          python -m analyzer.fingerprints build openzeppelin-contracts
+    parser = argparse.ArgumentParser(description="Maintain the vendored-file fingerprint index.")
+    commands = parser.add_subparsers(dest='command', required=True)
+    build_parser = commands.add_parser('build', help="Add a library checkout, e.g. openzeppelin-contracts at a tag")
+    build_parser.add_argument('checkout', help="Checkout or unpacked release (its contracts/ directory if present)")
+    build_parser.add_argument('--label', help="Release label (default: name@version from package.json)")
+    build_parser.add_argument('--index', default=DEFAULT_INDEX_PATH, help="Index file to update")
+    args = parser.parse_args()
+
+    label = args.label or release_label(args.checkout)
+    count = build(args.checkout, label, args.index)
+    print(f"Fingerprinted {count} files from {label} into {args.index}")
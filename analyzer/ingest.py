@@ -0,0 +1,225 @@
+import hashlib
+import os
+import re
+import zipfile
+from dataclasses import dataclass, field
+from typing import BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from analyzer.fingerprints import FingerprintIndex
+
+DEFAULT_MAX_TOTAL_BYTES = 50 * 1024 * 1024
+DEFAULT_MAX_FILE_BYTES = 2 * 1024 * 1024
+DEFAULT_MAX_FILES = 5000
+DEFAULT_MAX_COMPRESSION_RATIO = 100
+
+READ_CHUNK_BYTES = 64 * 1024
+
+# Dependency trees installed by npm/yarn, Remix and Foundry/Hardhat setups
+_VENDORED_PATH_RE = re.compile(
+    r'(?:^|/)(?:node_modules|\.deps|bower_components)/'
+    r'|(?:^|/)@openzeppelin/'
+    r'|(?:^|/)lib/(?:forge-std|ds-test|openzeppelin-contracts(?:-upgradeable)?|solmate|solady|chainlink)/'
+    r'|(?:^|/)lib/[^/]+/(?:src|contracts|lib)/',
+    re.I
+)
+
+_fingerprints = None
+
+
+def default_fingerprints() -> FingerprintIndex:
+    global _fingerprints
+    if _fingerprints is None:
+        _fingerprints = FingerprintIndex.load()
+    return _fingerprints
+
+
+@dataclass
+class IngestLimits:
+    max_total_bytes: int = DEFAULT_MAX_TOTAL_BYTES
+    max_file_bytes: int = DEFAULT_MAX_FILE_BYTES
+    max_files: int = DEFAULT_MAX_FILES
+    max_compression_ratio: float = DEFAULT_MAX_COMPRESSION_RATIO
+
+    @classmethod
+    def from_env(cls) -> 'IngestLimits':
+        return cls(
+            max_total_bytes=int(os.getenv('UPLOAD_MAX_TOTAL_BYTES', DEFAULT_MAX_TOTAL_BYTES)),
+            max_file_bytes=int(os.getenv('UPLOAD_MAX_FILE_BYTES', DEFAULT_MAX_FILE_BYTES)),
+            max_files=int(os.getenv('UPLOAD_MAX_FILES', DEFAULT_MAX_FILES)),
+            max_compression_ratio=float(os.getenv('UPLOAD_MAX_COMPRESSION_RATIO', DEFAULT_MAX_COMPRESSION_RATIO)),
+        )
+
+
+@dataclass
+class IngestedFile:
+    path: str
+    code: str
+    sha256: str
+    # Why the file is treated as a vendored dependency, or None for project files
+    vendored: Optional[str] = None
+
+
+@dataclass
+class IngestReport:
+    files: int = 0
+    bytes: int = 0
+    vendored: Dict[str, str] = field(default_factory=dict)
+    duplicates: Dict[str, str] = field(default_factory=dict)
+    skipped: Dict[str, str] = field(default_factory=dict)
+    truncated: bool = False
+
+    def summary(self) -> Dict:
+        """
+        JSON-friendly summary for API responses.
+        """
+        return {
+            'files': self.files,
+            'bytes': self.bytes,
+            'vendored_files': len(self.vendored),
+            'duplicate_files': self.duplicates,
+            'skipped_files': self.skipped,
+            'truncated': self.truncated,
+        }
+
+
+def vendored_reason(path: str, code: str, fingerprints: FingerprintIndex = None) -> Optional[str]:
+    """
+    Return why `path` looks like a vendored dependency, 'path' (by its location) or
+    'fingerprint' (its content is a known library file), else None.
+    """
+    if _VENDORED_PATH_RE.search(path.replace('\\', '/')):
+        return 'path'
+    if (fingerprints or default_fingerprints()).match(code):
+        return 'fingerprint'
+    return None
+
+
+def iter_solidity_files(zip_file, limits: IngestLimits = None, report: IngestReport = None,
+                        fingerprints: FingerprintIndex = None) -> Iterator[IngestedFile]:
+    """
+    Lazily yield the .sol files of a ZIP, enforcing per-file, total and compression-ratio
+    limits and skipping byte-identical duplicates. Vendored files are yielded flagged.
+    """
+    limits = limits or IngestLimits()
+    report = report if report is not None else IngestReport()
+
+    with zipfile.ZipFile(zip_file, 'r') as zip_ref:
+        entries = (
+            # Declared sizes can lie, so the byte cap is enforced while reading as well
+            (info.filename, info.file_size, info.compress_size,
+             lambda info=info: _read_capped(zip_ref.open(info), limits.max_file_bytes))
+            for info in zip_ref.infolist() if not info.is_dir()
+        )
+        yield from _ingest(entries, limits, report, fingerprints)
+
+
+def iter_solidity_directory(root: str, limits: IngestLimits = None, report: IngestReport = None,
+                            fingerprints: FingerprintIndex = None) -> Iterator[IngestedFile]:
+    """
+    Same as iter_solidity_files for a checked-out project directory; paths are relative to `root`.
+    """
+    limits = limits or IngestLimits()
+    report = report if report is not None else IngestReport()
+
+    def entries():
+        for directory, subdirectories, names in os.walk(root):
+            subdirectories[:] = sorted(d for d in subdirectories if d != '.git')
+            for name in sorted(n for n in names if n.endswith('.sol')):
+                path = os.path.join(directory, name)
+                relative = os.path.relpath(path, root).replace(os.sep, '/')
+                read = lambda path=path: _read_capped(open(path, 'rb'), limits.max_file_bytes)
+                yield relative, os.path.getsize(path), 0, read
+
+    yield from _ingest(entries(), limits, report, fingerprints)
+
+
+def load_solidity_files(zip_file, limits: IngestLimits = None,
+                        fingerprints: FingerprintIndex = None) -> Tuple[Dict[str, str], Dict[str, str], IngestReport]:
+    """
+    Split an upload into (project files to analyze, vendored files used only as context, report).
+    """
+    report = IngestReport()
+    return (*_split(iter_solidity_files(zip_file, limits, report, fingerprints)), report)
+
+
+def load_solidity_directory(root: str, limits: IngestLimits = None, fingerprints: FingerprintIndex = None
+                            ) -> Tuple[Dict[str, str], Dict[str, str], IngestReport]:
+    """
+    Same as load_solidity_files for a checked-out project directory; paths are relative to `root`.
+    """
+    report = IngestReport()
+    return (*_split(iter_solidity_directory(root, limits, report, fingerprints)), report)
+
+
+def _split(ingested: Iterable[IngestedFile]) -> Tuple[Dict[str, str], Dict[str, str]]:
+    project_files = {}
+    vendored_files = {}
+    for file in ingested:
+        target = vendored_files if file.vendored else project_files
+        target[file.path] = file.code
+    return project_files, vendored_files
+
+
+def _ingest(entries: Iterable[Tuple[str, int, int, Callable[[], Optional[bytes]]]], limits: IngestLimits,
+            report: IngestReport, fingerprints: FingerprintIndex = None) -> Iterator[IngestedFile]:
+    """
+    Checks shared by every upload format, applied to (path, size, compressed size or 0, read)
+    entries in order; `read` returns None once the file turns out larger than the per-file cap.
+    """
+    seen: Dict[str, str] = {}
+    for name, size, compressed_size, read in entries:
+        if not name.endswith('.sol') or _is_metadata(name):
+            continue
+
+        if report.files >= limits.max_files or report.bytes + size > limits.max_total_bytes:
+            report.truncated = True
+            report.skipped[name] = 'upload limit reached'
+            break
+        if size > limits.max_file_bytes:
+            report.skipped[name] = 'file too large'
+            continue
+        if compressed_size and size / compressed_size > limits.max_compression_ratio:
+            report.skipped[name] = 'suspicious compression ratio'
+            continue
+
+        data = read()
+        if data is None:
+            report.skipped[name] = 'file too large'
+            continue
+        try:
+            code = data.decode('utf-8')
+        except UnicodeDecodeError:
+            report.skipped[name] = 'not valid UTF-8'
+            continue
+
+        digest = hashlib.sha256(data).hexdigest()
+        if digest in seen:
+            report.duplicates[name] = seen[digest]
+            continue
+        seen[digest] = name
+
+        report.files += 1
+        report.bytes += len(data)
+        reason = vendored_reason(name, code, fingerprints)
+        if reason:
+            report.vendored[name] = reason
+        yield IngestedFile(path=name, code=code, sha256=digest, vendored=reason)
+
+
+def _is_metadata(name: str) -> bool:
+    return name.startswith('__MACOSX/') or os.path.basename(name).startswith('._')
+
+
+def _read_capped(f: BinaryIO, max_bytes: int) -> Optional[bytes]:
+    chunks: List[bytes] = []
+    size = 0
+    with f:
+        while True:
+            chunk = f.read(READ_CHUNK_BYTES)
+            if not chunk:
+                break
+            size += len(chunk)
+            if size > max_bytes:
+                return None
+            chunks.append(chunk)
+    return b''.join(chunks)
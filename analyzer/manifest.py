@@ -0,0 +1,191 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Set
+
+from analyzer.solidity_parser import parse_source, resolve_import, suffix_index
+
+DEFAULT_MANIFEST_PATH = os.path.join('.cache', 'manifests.sqlite3')
+
+
+def content_hash(code: str) -> str:
+    return hashlib.sha256(code.encode('utf-8')).hexdigest()
+
+
+def import_graph(files: Dict[str, str], known_paths: Iterable[str] = ()) -> Dict[str, Set[str]]:
+    """
+    Map each file to the files of the same upload it imports. Relative imports resolve against
+    the importing file; other paths (remappings such as `@openzeppelin/...` or `src/...`) match
+    any uploaded file whose path ends with them. Imports may also resolve to `known_paths`,
+    e.g. files that were removed since the previous upload.
+    """
+    by_suffix = suffix_index(set(files) | set(known_paths))
+
+    graph = {}
+    for path, code in files.items():
+        targets = set()
+        for directive in parse_source(code).imports:
+            targets.update(resolve_import(path, directive.path, by_suffix))
+        targets.discard(path)
+        graph[path] = targets
+    return graph
+
+
+def dependents(graph: Dict[str, Set[str]], roots: Set[str]) -> Set[str]:
+    """
+    Files that import any of `roots`, directly or transitively (excluding the roots themselves).
+    """
+    importers: Dict[str, Set[str]] = {}
+    for path, imported in graph.items():
+        for target in imported:
+            importers.setdefault(target, set()).add(path)
+
+    found: Set[str] = set()
+    pending = list(roots)
+    while pending:
+        for importer in importers.get(pending.pop(), ()):
+            if importer not in found and importer not in roots:
+                found.add(importer)
+                pending.append(importer)
+    return found
+
+
+@dataclass
+class IncrementalPlan:
+    # Project files whose stored results are still valid, with those results
+    reused: Dict[str, Dict] = field(default_factory=dict)
+    # Project files to analyze again, each with the reason
+    recompute: Dict[str, str] = field(default_factory=dict)
+    # Unchanged files whose earlier verdicts are stale because an import changed
+    invalidated: Set[str] = field(default_factory=set)
+    # Paths present in the previous upload but not in this one
+    removed: List[str] = field(default_factory=list)
+
+    def summary(self, project_id: str) -> Dict:
+        """
+        JSON-friendly description for API responses.
+        """
+        return {
+            'project_id': project_id,
+            'reused': sorted(self.reused),
+            'recomputed': dict(sorted(self.recompute.items())),
+            'removed': sorted(self.removed),
+        }
+
+
+class ManifestStore:
+    """
+    SQLite store of each project's last analyzed upload: path -> content hash -> result.
+    """
+
+    def __init__(self, path: str = DEFAULT_MANIFEST_PATH):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS manifest_files ("
+            "project_id TEXT NOT NULL, path TEXT NOT NULL, sha256 TEXT NOT NULL, "
+            "version TEXT NOT NULL, result TEXT, updated_at REAL NOT NULL, "
+            "PRIMARY KEY (project_id, path))"
+        )
+        self._db.commit()
+
+    def load(self, project_id: str) -> Dict[str, Dict]:
+        """
+        Return {path: {'sha256', 'version', 'result'}} for the project's previous upload.
+        `result` is None for context files and for files whose analysis failed.
+        """
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT path, sha256, version, result FROM manifest_files WHERE project_id = ?", (project_id,)
+            ).fetchall()
+        return {
+            path: {'sha256': sha256, 'version': version, 'result': json.loads(result) if result else None}
+            for path, sha256, version, result in rows
+        }
+
+    def plan(self, project_id: str, files: Dict[str, str], context_files: Dict[str, str],
+             eips: List[str], version: str) -> IncrementalPlan:
+        """
+        Decide which project files can reuse their stored result. A file is recomputed when it is
+        new, its content changed, its stored result lacks a selected EIP, failed, or was produced by
+        another analyzer `version`, or when it imports (transitively) a file that changed or vanished.
+        """
+        previous = self.load(project_id)
+        current = {**context_files, **files}
+        plan = IncrementalPlan(removed=[path for path in previous if path not in current])
+
+        changed = set(plan.removed)
+        for path, code in current.items():
+            entry = previous.get(path)
+            if entry is None or entry['sha256'] != content_hash(code):
+                changed.add(path)
+
+        affected = dependents(import_graph(current, known_paths=plan.removed), changed)
+
+        for path in files:
+            entry = previous.get(path)
+            if entry is None:
+                plan.recompute[path] = 'new'
+            elif path in changed:
+                plan.recompute[path] = 'changed'
+            elif path in affected:
+                plan.recompute[path] = 'dependency changed'
+                plan.invalidated.add(path)
+            elif entry['version'] != version:
+                plan.recompute[path] = 'analyzer changed'
+            elif not _reusable(entry['result'], eips):
+                plan.recompute[path] = 'missing verdicts'
+            else:
+                result = dict(entry['result'])
+                result['compliance'] = {eip: result['compliance'][eip] for eip in eips}
+                plan.reused[path] = result
+        return plan
+
+    def save(self, project_id: str, files: Dict[str, str], context_files: Dict[str, str],
+             results: Dict[str, Dict], version: str, invalidated: Iterable[str] = ()) -> None:
+        """
+        Replace the project's manifest with this upload. Stored verdicts of unchanged files are
+        merged so EIPs checked by earlier uploads stay available, except for `invalidated` paths
+        (e.g. files whose dependencies changed); failed results are not stored.
+        """
+        invalidated = set(invalidated)
+        previous = self.load(project_id)
+        now = time.time()
+        rows = []
+        for path, code in {**context_files, **files}.items():
+            digest = content_hash(code)
+            result = results.get(path) if path in files else None
+            if result is not None and not _reusable(result, list(result.get('compliance', {}))):
+                result = None
+            entry = previous.get(path)
+            if (result is not None and entry and entry['result'] and entry['sha256'] == digest
+                    and entry['version'] == version and path not in invalidated):
+                result = {**result, 'compliance': {**entry['result']['compliance'], **result['compliance']}}
+            rows.append((project_id, path, digest, version, json.dumps(result) if result else None, now))
+
+        with self._lock:
+            self._db.execute("DELETE FROM manifest_files WHERE project_id = ?", (project_id,))
+            self._db.executemany(
+                "INSERT INTO manifest_files (project_id, path, sha256, version, result, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)", rows
+            )
+            self._db.commit()
+
+    def delete(self, project_id: str) -> None:
+        with self._lock:
+            self._db.execute("DELETE FROM manifest_files WHERE project_id = ?", (project_id,))
+            self._db.commit()
+
+
+def _reusable(result: Optional[Dict], eips: List[str]) -> bool:
+    if not result or 'error' in result:
+        return False
+    compliance = result.get('compliance', {})
+    return all(eip in compliance and not compliance[eip].startswith('❌ Error') for eip in eips)
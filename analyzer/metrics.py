@@ -0,0 +1,249 @@
+import contextvars
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+# Seconds; covers sub-millisecond parsing up to multi-minute SolidityScan calls
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+class _Metric:
+    kind = ''
+
+    def __init__(self, name: str, help_text: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, '')) for name in self.labels)
+
+    def render(self) -> List[str]:
+        return [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} {self.kind}'] + self._samples()
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def __init__(self, name: str, help_text: str, labels: Tuple[str, ...] = ()):
+        super().__init__(name, help_text, labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f'{self.name}{_format_labels(self.labels, key)} {value}' for key, value in items]
+
+
+class Gauge(_Metric):
+    """
+    Gauge read from `callback` at scrape time; the callback returns {label values: value}
+    or a single number for an unlabelled gauge.
+    """
+    kind = 'gauge'
+
+    def __init__(self, name: str, help_text: str, callback: Callable, labels: Tuple[str, ...] = ()):
+        super().__init__(name, help_text, labels)
+        self.callback = callback
+
+    def _samples(self) -> List[str]:
+        try:
+            values = self.callback()
+        except Exception:
+            return []
+        if not isinstance(values, dict):
+            values = {(): values}
+        return [f'{self.name}{_format_labels(self.labels, key)} {value}' for key, value in sorted(values.items())]
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, name: str, help_text: str, labels: Tuple[str, ...] = (), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts (+Inf last), sum, count]
+        self._series: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = sorted((key, ([*series[0]], series[1], series[2])) for key, series in self._series.items())
+        lines = []
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                le = 'le="{}"'.format('+Inf' if bound == float('inf') else repr(bound))
+                lines.append(f'{self.name}_bucket{_format_labels(self.labels, key, le)} {cumulative}')
+            lines.append(f'{self.name}_sum{_format_labels(self.labels, key)} {total}')
+            lines.append(f'{self.name}_count{_format_labels(self.labels, key)} {count}')
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        """
+        Register `metric`, replacing any previous metric of the same name.
+        """
+        with self._lock:
+            self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        """
+        Prometheus text exposition format (version 0.0.4).
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return '\n'.join(line for metric in metrics for line in metric.render()) + '\n'
+
+
+REGISTRY = Registry()
+
+STAGE_SECONDS = REGISTRY.register(Histogram(
+    'compliantelligent_stage_seconds', 'Time spent per pipeline stage.', ('stage',)
+))
+LLM_TOKENS = REGISTRY.register(Counter(
+    'compliantelligent_llm_tokens_total', 'OpenAI tokens reported by the API.', ('model', 'kind')
+))
+LLM_REQUESTS = REGISTRY.register(Counter(
+    'compliantelligent_llm_requests_total', 'OpenAI chat completion attempts by outcome.', ('model', 'outcome')
+))
+LLM_RETRIES = REGISTRY.register(Counter(
+    'compliantelligent_llm_retries_total', 'OpenAI calls retried after a rate-limit or unavailable error.', ('reason',)
+))
+VERDICTS = REGISTRY.register(Counter(
+    'compliantelligent_verdicts_total', 'EIP verdicts by how they were decided.', ('source',)
+))
+SOLIDITYSCAN_REQUESTS = REGISTRY.register(Counter(
+    'compliantelligent_solidityscan_requests_total', 'SolidityScan API calls by HTTP status.', ('status',)
+))
+
+
+_current_timings: contextvars.ContextVar = contextvars.ContextVar('request_timings', default=None)
+
+
+class RequestTimings:
+    """
+    Per-request breakdown of stage timings and counters (e.g. tokens), safe to update from
+    worker threads that were started with a copy of the request's context.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self._stages: Dict[str, List[float]] = {}
+        self._counters: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def add(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            stats = self._stages.setdefault(stage, [0, 0.0, 0.0])
+            stats[0] += 1
+            stats[1] += seconds
+            stats[2] = max(stats[2], seconds)
+
+    def count(self, name: str, amount: float = 1) -> None:
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    def summary(self) -> Dict:
+        """
+        JSON-friendly breakdown. Stage totals from parallel workers can exceed the wall time.
+        """
+        with self._lock:
+            return {
+                'wall_seconds': round(time.perf_counter() - self.started, 4),
+                'stages': {
+                    stage: {'count': count, 'total_seconds': round(total, 4), 'max_seconds': round(longest, 4)}
+                    for stage, (count, total, longest) in sorted(self._stages.items())
+                },
+                'counters': dict(sorted(self._counters.items())),
+            }
+
+
+def current_timings() -> Optional[RequestTimings]:
+    return _current_timings.get()
+
+
+@contextmanager
+def track_timings(timings: RequestTimings = None) -> Iterator[RequestTimings]:
+    """
+    Make `timings` (or a new RequestTimings) collect every span and counter recorded in this
+    context, including worker tasks submitted with a copy of it.
+    """
+    timings = timings or RequestTimings()
+    token = _current_timings.set(timings)
+    try:
+        yield timings
+    finally:
+        try:
+            _current_timings.reset(token)
+        except ValueError:
+            # A streaming generator may be closed from a different context; nothing to restore
+            pass
+
+
+@contextmanager
+def span(stage: str) -> Iterator[None]:
+    """
+    Time a block into the stage histogram and the current request's breakdown.
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        STAGE_SECONDS.observe(elapsed, stage=stage)
+        timings = _current_timings.get()
+        if timings is not None:
+            timings.add(stage, elapsed)
+
+
+def count(name: str, amount: float = 1) -> None:
+    """
+    Add to a counter of the current request's breakdown, if one is being tracked.
+    """
+    timings = _current_timings.get()
+    if timings is not None:
+        timings.count(name, amount)
@@ -0,0 +1,336 @@
+import hashlib
+import math
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from analyzer.solidity_parser import CONTRACT_KINDS, Token, tokenize
+
+try:
+    import tiktoken
+except ImportError:  # optional; token counts fall back to a characters-per-token estimate
+    tiktoken = None
+
+# Bump when the minimized output changes, so cached verdicts are not reused across versions
+MINIMIZER_VERSION = 2
+
+DEFAULT_TOKEN_BUDGET = 6000
+CHARS_PER_TOKEN = 4
+# Prepared sources kept per process, bounded by count and by the characters of their chunks
+PREPARED_CACHE_ENTRIES = 256
+PREPARED_CACHE_CHARS = 16 * 1024 * 1024
+
+_VISIBLE = {'public', 'external'}
+_DROPPED_MEMBERS = {'modifier', 'fallback', 'receive'}
+
+
+def count_tokens(text: str, model: str = "gpt-4") -> int:
+    """
+    Count prompt tokens with tiktoken when installed, otherwise estimate them.
+    """
+    if tiktoken is not None:
+        return len(_encoding(model).encode(text))
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+@lru_cache(maxsize=8)
+def _encoding(model: str):
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("cl100k_base")
+
+
+@dataclass
+class PreparedSource:
+    chunks: List[str]
+    stats: Dict = field(default_factory=dict)
+
+
+def minimize_source(code: str) -> str:
+    """
+    Strip comments, whitespace and function bodies, keeping only what an EIP question needs:
+    pragmas, imports, contract headers with inheritance, state variables, events, errors,
+    type definitions and public/external function signatures.
+    """
+    preamble, contracts = _minimized_units(code)
+    return '\n'.join(preamble + [line for lines in contracts for line in lines])
+
+
+class _PreparedCache:
+    """
+    LRU of prepared sources keyed by content hash, so the sources themselves are not retained
+    and memory stays bounded by `max_chars` of chunk text.
+    """
+
+    def __init__(self, max_entries: int = PREPARED_CACHE_ENTRIES, max_chars: int = PREPARED_CACHE_CHARS):
+        self.max_entries = max_entries
+        self.max_chars = max_chars
+        self._entries: 'OrderedDict[Tuple, Tuple[PreparedSource, int]]' = OrderedDict()
+        self._chars = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple) -> Optional[PreparedSource]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, key: Tuple, prepared: PreparedSource) -> None:
+        size = sum(len(chunk) for chunk in prepared.chunks)
+        if size > self.max_chars:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._chars -= self._entries.pop(key)[1]
+            self._entries[key] = (prepared, size)
+            self._chars += size
+            while len(self._entries) > self.max_entries or self._chars > self.max_chars:
+                self._chars -= self._entries.popitem(last=False)[1][1]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._chars = 0
+
+
+_prepared = _PreparedCache()
+
+
+def prepare_source(code: str, token_budget: int = DEFAULT_TOKEN_BUDGET, model: str = "gpt-4") -> PreparedSource:
+    """
+    Minimize `code` and split it into chunks of at most `token_budget` tokens. Every chunk
+    repeats the pragmas and imports so it can be judged on its own. Results are cached per
+    content hash, budget and model.
+    """
+    key = (hashlib.sha256(code.encode('utf-8')).hexdigest(), token_budget, model)
+    prepared = _prepared.get(key)
+    if prepared is None:
+        prepared = _prepare(code, token_budget, model)
+        _prepared.put(key, prepared)
+    return prepared
+
+
+def _prepare(code: str, token_budget: int, model: str) -> PreparedSource:
+    preamble, contracts = _minimized_units(code)
+    minimized = '\n'.join(preamble + [line for lines in contracts for line in lines])
+    if not minimized.strip() or len(minimized) >= len(code):
+        # Nothing recognisable to keep, or nothing gained; send the source as-is
+        minimized = code
+        if count_tokens(code, model) <= token_budget:
+            chunks = [code]
+        else:
+            # No contracts to split on, so split the raw source by lines
+            chunks = _split_lines(code.splitlines(), token_budget, model)
+    elif count_tokens(minimized, model) <= token_budget:
+        chunks = [minimized]
+    else:
+        chunks = _split(preamble, contracts, token_budget, model)
+
+    original_bytes = len(code.encode('utf-8'))
+    minimized_bytes = len(minimized.encode('utf-8'))
+    original_tokens = count_tokens(code, model)
+    minimized_tokens = count_tokens(minimized, model)
+    return PreparedSource(chunks=chunks, stats={
+        'original_bytes': original_bytes,
+        'minimized_bytes': minimized_bytes,
+        'bytes_saved': original_bytes - minimized_bytes,
+        'original_tokens': original_tokens,
+        'minimized_tokens': minimized_tokens,
+        'tokens_saved': original_tokens - minimized_tokens,
+        'chunks': len(chunks),
+    })
+
+
+def _split(preamble: List[str], contracts: List[List[str]], token_budget: int, model: str) -> List[str]:
+    preamble_tokens = sum(count_tokens(line, model) for line in preamble)
+    budget = max(token_budget - preamble_tokens, 1)
+
+    pieces: List[List[str]] = []
+    for lines in contracts:
+        if sum(count_tokens(line, model) for line in lines) <= budget:
+            pieces.append(lines)
+            continue
+        # Split an oversized contract by members, repeating its header in each piece
+        header, members, footer = lines[0], lines[1:-1], lines[-1]
+        fixed = count_tokens(header, model) + count_tokens(footer, model)
+        current, used = [], fixed
+        for member in members:
+            cost = count_tokens(member, model)
+            if current and used + cost > budget:
+                pieces.append([header] + current + [footer])
+                current, used = [], fixed
+            current.append(member)
+            used += cost
+        pieces.append([header] + current + [footer])
+
+    chunks, current, used = [], [], 0
+    for piece in pieces:
+        cost = sum(count_tokens(line, model) for line in piece)
+        if current and used + cost > budget:
+            chunks.append('\n'.join(preamble + current))
+            current, used = [], 0
+        current.extend(piece)
+        used += cost
+    if current or not chunks:
+        chunks.append('\n'.join(preamble + current))
+    return chunks
+
+
+def _split_lines(lines: List[str], token_budget: int, model: str) -> List[str]:
+    """
+    Greedily pack whole lines into chunks of at most `token_budget` tokens; a single line
+    longer than that is cut into pieces of about the budget's size.
+    """
+    pieces = []
+    width = max(token_budget * CHARS_PER_TOKEN, 1)
+    for line in lines:
+        if count_tokens(line, model) <= token_budget:
+            pieces.append(line)
+        else:
+            pieces.extend(line[i:i + width] for i in range(0, len(line), width))
+
+    chunks, current, used = [], [], 0
+    for piece in pieces:
+        cost = count_tokens(piece, model) + 1
+        if current and used + cost > token_budget:
+            chunks.append('\n'.join(current))
+            current, used = [], 0
+        current.append(piece)
+        used += cost
+    if current or not chunks:
+        chunks.append('\n'.join(current))
+    return chunks
+
+
+def _minimized_units(code: str) -> Tuple[List[str], List[List[str]]]:
+    """
+    Return (preamble lines, one list of lines per contract) of the minimized source.
+    """
+    tokens = tokenize(code)
+    preamble: List[str] = []
+    contracts: List[List[str]] = []
+    i = 0
+    while i < len(tokens):
+        value = tokens[i].value
+        if value in ('pragma', 'import'):
+            # Version expressions such as ^0.8.20 read best exactly as written
+            end = _statement_end(tokens, i)
+            preamble.append(' '.join(code[tokens[i].start:tokens[end].end].split()))
+            i = end + 1
+        elif value in CONTRACT_KINDS or (value == 'abstract' and i + 1 < len(tokens)
+                                         and tokens[i + 1].value in CONTRACT_KINDS):
+            lines, i = _minimize_contract(tokens, i)
+            contracts.append(lines)
+        elif value == 'function':
+            # Free functions never decide compliance
+            i = _member_end(tokens, i) + 1
+        else:
+            end = _member_end(tokens, i)
+            preamble.append(_render(tokens[i:end + 1]))
+            i = end + 1
+    return preamble, contracts
+
+
+def _minimize_contract(tokens: List[Token], i: int) -> Tuple[List[str], int]:
+    body_start = i
+    while body_start < len(tokens) and tokens[body_start].value != '{':
+        body_start += 1
+    kind = tokens[i + 1].value if tokens[i].value == 'abstract' else tokens[i].value
+    lines = [_render(tokens[i:body_start + 1])]
+
+    j = body_start + 1
+    while j < len(tokens) and tokens[j].value != '}':
+        end = _member_end(tokens, j)
+        member = tokens[j:end + 1]
+        rendered = _minimize_member(member, kind)
+        if rendered:
+            lines.append('    ' + rendered)
+        j = end + 1
+    lines.append('}')
+    return lines, j + 1
+
+
+def _minimize_member(member: List[Token], contract_kind: str) -> str:
+    first = member[0].value
+    if first in _DROPPED_MEMBERS:
+        return ''
+    if first in ('function', 'constructor'):
+        header = _header(member)
+        if first == 'function' and contract_kind != 'interface' and not _VISIBLE & {t.value for t in header}:
+            return ''
+        return _render(header) + ';'
+    return _render(member)
+
+
+def _header(member: List[Token]) -> List[Token]:
+    """
+    Tokens of a function declaration up to (not including) its body.
+    """
+    depth = 0
+    for index, token in enumerate(member):
+        if token.value == '(':
+            depth += 1
+        elif token.value == ')':
+            depth -= 1
+        elif depth == 0 and token.value in ('{', ';'):
+            return member[:index]
+    return member
+
+
+def _statement_end(tokens: List[Token], i: int) -> int:
+    while i < len(tokens) and tokens[i].value != ';':
+        i += 1
+    return min(i, len(tokens) - 1)
+
+
+def _member_end(tokens: List[Token], i: int) -> int:
+    """
+    Index of the `;` or closing `}` ending the declaration that starts at `i`.
+    """
+    paren_depth = 0
+    j = i
+    while j < len(tokens):
+        value = tokens[j].value
+        if value in ('(', '['):
+            paren_depth += 1
+        elif value in (')', ']'):
+            paren_depth -= 1
+        elif paren_depth == 0 and value == ';':
+            return j
+        elif paren_depth == 0 and value == '{':
+            depth = 0
+            for k in range(j, len(tokens)):
+                if tokens[k].value == '{':
+                    depth += 1
+                elif tokens[k].value == '}':
+                    depth -= 1
+                    if depth == 0:
+                        return k
+            return len(tokens) - 1
+        elif paren_depth == 0 and value == '}':
+            # Stray closing brace; let the caller consume it
+            return j - 1 if j > i else j
+        j += 1
+    return len(tokens) - 1
+
+
+def _render(tokens: List[Token]) -> str:
+    parts = []
+    previous = None
+    for token in tokens:
+        if previous is not None and not _glued(previous, token):
+            parts.append(' ')
+        parts.append(token.value)
+        previous = token
+    return ''.join(parts)
+
+
+def _glued(previous: Token, token: Token) -> bool:
+    if token.value in (',', ';', ')', ']', '.') or previous.value in ('(', '[', '.'):
+        return True
+    return token.value in ('(', '[') and (previous.kind == 'ident' or previous.value in (')', ']'))
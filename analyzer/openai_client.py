@@ -0,0 +1,269 @@
+import logging
+import os
+import random
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+import openai
+
+from analyzer import metrics
+from analyzer.minimizer import count_tokens
+
+logger = logging.getLogger(__name__)
+
+# Completion tokens assumed for a request that does not set max_tokens
+DEFAULT_COMPLETION_ESTIMATE = 500
+
+# After a 429 the allowed rates shrink by this factor and recover slowly on success
+BACKOFF_RATE_FACTOR = 0.8
+RECOVERY_RATE_FACTOR = 1.02
+MIN_RATE_FRACTION = 0.1
+
+
+class TokenBucket:
+    """
+    Token bucket refilled continuously at `per_minute` units per minute.
+    """
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def time_until(self, amount: float, now: float) -> float:
+        """
+        Seconds until `amount` units are available (amount is clamped to the capacity).
+        """
+        self._refill(now)
+        missing = min(amount, self.capacity) - self.level
+        return max(missing / self.rate, 0.0)
+
+    def consume(self, amount: float, now: float) -> None:
+        self._refill(now)
+        self.level -= min(amount, self.capacity)
+
+    def adjust(self, delta: float) -> None:
+        """
+        Correct a previous estimate once the real usage is known; the level may go negative.
+        """
+        self.level -= delta
+
+
+class RateLimitedChatClient:
+    """
+    Thread-safe wrapper around openai.ChatCompletion.create that keeps requests and
+    estimated tokens per minute under quota, queues callers first-come first-served and
+    retries rate-limit errors with jittered exponential backoff.
+    """
+
+    def __init__(self, requests_per_minute: float = None, tokens_per_minute: float = None,
+                 max_retries: int = 8, base_delay: float = 1.0, max_delay: float = 60.0):
+        """
+        Leave `requests_per_minute` or `tokens_per_minute` unset to not limit that dimension.
+        """
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+        self._limits = {'requests': requests_per_minute, 'tokens': tokens_per_minute}
+        self._buckets: Dict[str, TokenBucket] = {
+            name: TokenBucket(limit) for name, limit in self._limits.items() if limit
+        }
+        self._lock = threading.Lock()
+        self._turn = threading.Condition(self._lock)
+        self._next_ticket = 0
+        self._serving = 0
+        self._blocked_until = 0.0
+
+        self.requests = 0
+        self.retries = 0
+        self.rate_limited = 0
+
+    @property
+    def queue_depth(self) -> int:
+        """
+        Number of callers waiting for (or holding) the head of the queue.
+        """
+        with self._lock:
+            return self._next_ticket - self._serving
+
+    def create(self, on_delta: Callable[[str], None] = None, **kwargs):
+        """
+        Same arguments and return value as openai.ChatCompletion.create. With `on_delta`, the
+        completion is streamed: each content fragment is passed to `on_delta` as it arrives, and
+        the assembled response is returned in the non-streaming shape.
+        """
+        model = kwargs.get('model')
+        estimate = self.estimate_tokens(kwargs.get('messages', []), kwargs.get('max_tokens'), model)
+        attempt = 0
+        while True:
+            with metrics.span('llm_queue_wait'):
+                self._acquire(estimate)
+            try:
+                with metrics.span('llm_call'):
+                    if on_delta is None:
+                        response = openai.ChatCompletion.create(**kwargs)
+                    else:
+                        response = self._stream(kwargs, on_delta)
+            except (openai.error.RateLimitError, openai.error.ServiceUnavailableError) as e:
+                reason = 'rate_limited' if isinstance(e, openai.error.RateLimitError) else 'unavailable'
+                metrics.LLM_REQUESTS.inc(model=model, outcome=reason)
+                if attempt >= self.max_retries:
+                    logger.error("OpenAI %s after %d retries: %s", reason, attempt, e)
+                    raise
+                metrics.LLM_RETRIES.inc(reason=reason)
+                metrics.count('llm_retries')
+                self._back_off(e, attempt)
+                attempt += 1
+                continue
+            except Exception:
+                metrics.LLM_REQUESTS.inc(model=model, outcome='error')
+                raise
+
+            metrics.LLM_REQUESTS.inc(model=model, outcome='ok')
+            self._record_success(response, estimate, model)
+            return response
+
+    @staticmethod
+    def _stream(kwargs: Dict, on_delta: Callable[[str], None]) -> Dict:
+        parts = []
+        try:
+            for chunk in openai.ChatCompletion.create(stream=True, **kwargs):
+                choices = chunk.get('choices') or [{}]
+                text = (choices[0].get('delta') or {}).get('content')
+                if text:
+                    parts.append(text)
+                    on_delta(text)
+        except (openai.error.RateLimitError, openai.error.ServiceUnavailableError) as e:
+            if parts:
+                # Fragments already reached the caller; a retry would repeat them
+                raise openai.error.APIError(f"Stream interrupted: {e}") from e
+            raise
+
+        # Streamed completions carry no usage, so it is counted locally
+        content = ''.join(parts)
+        model = kwargs.get('model') or "gpt-4"
+        prompt_tokens = sum(count_tokens(message.get('content') or '', model) for message in kwargs.get('messages', []))
+        completion_tokens = count_tokens(content, model)
+        return {
+            'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': content}}],
+            'usage': {
+                'prompt_tokens': prompt_tokens,
+                'completion_tokens': completion_tokens,
+                'total_tokens': prompt_tokens + completion_tokens,
+            },
+        }
+
+    @staticmethod
+    def estimate_tokens(messages: List[Dict], max_tokens: Optional[int] = None, model: str = None) -> int:
+        prompt = sum(count_tokens(message.get('content') or '', model or "gpt-4") for message in messages)
+        return prompt + (max_tokens or DEFAULT_COMPLETION_ESTIMATE)
+
+    def _acquire(self, tokens: int) -> None:
+        """
+        Wait for this caller's turn, then until both buckets can cover the request.
+        """
+        with self._turn:
+            ticket = self._next_ticket
+            self._next_ticket += 1
+            while ticket != self._serving:
+                self._turn.wait()
+
+        try:
+            while True:
+                with self._lock:
+                    now = time.monotonic()
+                    wait = self._blocked_until - now
+                    if 'requests' in self._buckets:
+                        wait = max(wait, self._buckets['requests'].time_until(1, now))
+                    if 'tokens' in self._buckets:
+                        wait = max(wait, self._buckets['tokens'].time_until(tokens, now))
+                    if wait <= 0:
+                        if 'requests' in self._buckets:
+                            self._buckets['requests'].consume(1, now)
+                        if 'tokens' in self._buckets:
+                            self._buckets['tokens'].consume(tokens, now)
+                        self.requests += 1
+                        return
+                time.sleep(wait)
+        finally:
+            with self._turn:
+                self._serving += 1
+                self._turn.notify_all()
+
+    def _back_off(self, error: Exception, attempt: int) -> None:
+        """
+        Pause every caller until the server's retry-after (or a jittered backoff) passes,
+        and lower the allowed rates.
+        """
+        delay = self._retry_after(error)
+        if delay is None:
+            delay = random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+        with self._lock:
+            self.retries += 1
+            if isinstance(error, openai.error.RateLimitError):
+                self.rate_limited += 1
+                self._scale_rates(BACKOFF_RATE_FACTOR)
+            self._blocked_until = max(self._blocked_until, time.monotonic() + delay)
+        logger.warning("OpenAI %s (attempt %d), pausing requests for %.1fs",
+                       type(error).__name__, attempt + 1, delay)
+
+    @staticmethod
+    def _retry_after(error: Exception) -> Optional[float]:
+        headers = getattr(error, 'headers', None) or {}
+        for name in ('retry-after-ms', 'Retry-After-Ms'):
+            if headers.get(name):
+                try:
+                    return float(headers[name]) / 1000.0
+                except (TypeError, ValueError):
+                    pass
+        for name in ('retry-after', 'Retry-After'):
+            if headers.get(name):
+                try:
+                    return float(headers[name])
+                except (TypeError, ValueError):
+                    pass
+        return None
+
+    def _record_success(self, response, estimate: int, model: str = None) -> None:
+        usage = response.get('usage') if hasattr(response, 'get') else None
+        if usage:
+            for kind in ('prompt', 'completion'):
+                tokens = usage.get(f'{kind}_tokens') or 0
+                metrics.LLM_TOKENS.inc(tokens, model=model, kind=kind)
+                metrics.count(f'{kind}_tokens', tokens)
+        with self._lock:
+            if usage and 'tokens' in self._buckets:
+                self._buckets['tokens'].adjust(usage.get('total_tokens', estimate) - estimate)
+            self._scale_rates(RECOVERY_RATE_FACTOR)
+
+    def _scale_rates(self, factor: float) -> None:
+        for name, bucket in self._buckets.items():
+            configured = self._limits[name]
+            bucket.capacity = min(configured, max(configured * MIN_RATE_FRACTION, bucket.capacity * factor))
+            bucket.rate = bucket.capacity / 60.0
+
+
+_shared_client = None
+_shared_client_lock = threading.Lock()
+
+
+def get_shared_client() -> RateLimitedChatClient:
+    """
+    Process-wide client configured from OPENAI_RPM, OPENAI_TPM and OPENAI_MAX_RETRIES.
+    """
+    global _shared_client
+    with _shared_client_lock:
+        if _shared_client is None:
+            _shared_client = RateLimitedChatClient(
+                requests_per_minute=float(os.getenv('OPENAI_RPM', '0')) or None,
+                tokens_per_minute=float(os.getenv('OPENAI_TPM', '0')) or None,
+                max_retries=int(os.getenv('OPENAI_MAX_RETRIES', '8'))
+            )
+        return _shared_client
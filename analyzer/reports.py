@@ -0,0 +1,404 @@
+"""
+Report exporters that write analysis results incrementally.
+
+Every writer takes per-file results one at a time and writes them straight to a text stream
+(a file, a StringIO or a response generator via iter_report), so memory use does not grow with
+the number of files. Runs are kept as JSON Lines artifacts by ReportStore and converted to the
+other formats when downloaded:
+
+    python -m analyzer.reports results.jsonl --format sarif --output results.sarif
+"""
+import argparse
+import csv
+import html
+import io
+import json
+import os
+import re
+import sys
+import time
+import uuid
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+DEFAULT_REPORT_DIR = os.path.join('.cache', 'reports')
+DEFAULT_TTL_SECONDS = 7 * 24 * 60 * 60
+DEFAULT_PAGE_SIZE = 100
+# Response chunks are flushed once this many characters are buffered
+CHUNK_CHARS = 64 * 1024
+
+SARIF_SCHEMA = 'https://json.schemastore.org/sarif-2.1.0.json'
+TOOL_URI = 'https://github.com/shanzson/Compliantelligent'
+ERROR_RULE = 'analysis-error'
+
+_REPORT_ID_RE = re.compile(r'[0-9a-f]{32}')
+
+
+def verdict_status(verdict: str) -> str:
+    """
+    `compliant`, `non_compliant` or `error` for a verdict string.
+    """
+    if verdict.startswith('✅'):
+        return 'compliant'
+    if verdict.startswith('❌ Error'):
+        return 'error'
+    return 'non_compliant'
+
+
+class ReportWriter:
+    """
+    Base class: begin() once, add() per file, end() once. Only the result being added is held.
+    """
+    extension = 'txt'
+    mimetype = 'text/plain'
+
+    def __init__(self, out: TextIO, eips: List[str] = None):
+        self.out = out
+        self.eips = eips
+        self.count = 0
+
+    def begin(self) -> None:
+        pass
+
+    def add(self, filename: str, result: Dict) -> None:
+        self._write_result(filename, result)
+        self.count += 1
+
+    def end(self, summary: Dict = None) -> None:
+        pass
+
+    def _write_result(self, filename: str, result: Dict) -> None:
+        raise NotImplementedError
+
+
+class JsonLinesReport(ReportWriter):
+    """
+    One JSON object per file: the result with its `file` name.
+    """
+    extension = 'jsonl'
+    mimetype = 'application/x-ndjson'
+
+    def _write_result(self, filename: str, result: Dict) -> None:
+        self.out.write(json.dumps({'file': filename, **result}) + '\n')
+
+
+class CsvReport(ReportWriter):
+    """
+    One row per (file, EIP) with the verdict's status and the functions the conformance
+    check found missing; files that failed entirely get one `error` row.
+    """
+    extension = 'csv'
+    mimetype = 'text/csv'
+    columns = ['file', 'eip', 'status', 'verdict', 'missing_functions']
+
+    def begin(self) -> None:
+        self._csv = csv.writer(self.out)
+        self._csv.writerow(self.columns)
+
+    def _write_result(self, filename: str, result: Dict) -> None:
+        if 'error' in result:
+            self._csv.writerow([filename, '', 'error', result['error'], ''])
+            return
+        functions = result.get('functions', {})
+        for eip, verdict in result['compliance'].items():
+            missing = [item['signature'] for item in functions.get(eip, {}).get('missing', [])]
+            self._csv.writerow([filename, eip, verdict_status(verdict), verdict, ';'.join(missing)])
+
+
+class SarifReport(ReportWriter):
+    """
+    SARIF 2.1.0 log for CI code-scanning ingestion: one rule per EIP and one result per
+    non-compliant or failed check, located at the file. The document is written as a prefix,
+    the results as they arrive and a closing suffix, so it is never built in memory.
+    """
+    extension = 'sarif'
+    mimetype = 'application/sarif+json'
+
+    def begin(self) -> None:
+        rules = [{
+            'id': eip,
+            'name': f'{eip}Compliance',
+            'shortDescription': {'text': f'Contract does not comply with {eip}'},
+        } for eip in self.eips or []]
+        rules.append({
+            'id': ERROR_RULE,
+            'name': 'AnalysisError',
+            'shortDescription': {'text': 'Compliance analysis failed'},
+        })
+        driver = {'name': 'Compliantelligent', 'informationUri': TOOL_URI, 'rules': rules}
+        header = json.dumps({'$schema': SARIF_SCHEMA, 'version': '2.1.0'})
+        self.out.write(header[:-1] + ', "runs": [{"tool": ' + json.dumps({'driver': driver}) + ', "results": [')
+        self._first = True
+
+    def _write_result(self, filename: str, result: Dict) -> None:
+        if 'error' in result:
+            self._emit(ERROR_RULE, 'warning', result['error'], filename)
+            return
+        for eip, verdict in result['compliance'].items():
+            status = verdict_status(verdict)
+            if status == 'non_compliant':
+                self._emit(eip, 'error', verdict, filename)
+            elif status == 'error':
+                self._emit(ERROR_RULE, 'warning', verdict, filename)
+
+    def end(self, summary: Dict = None) -> None:
+        self.out.write(']}]}\n')
+
+    def _emit(self, rule: str, level: str, message: str, filename: str) -> None:
+        entry = {
+            'ruleId': rule,
+            'level': level,
+            'message': {'text': message},
+            'locations': [{'physicalLocation': {'artifactLocation': {'uri': filename}}}],
+        }
+        self.out.write(('' if self._first else ',') + json.dumps(entry))
+        self._first = False
+
+
+class HtmlReport(ReportWriter):
+    """
+    Standalone HTML report. With `page_size`, only the files of `page` (1-based) are written,
+    followed by links built with `page_url` when the `total` number of files is known.
+    """
+    extension = 'html'
+    mimetype = 'text/html'
+
+    def __init__(self, out: TextIO, eips: List[str] = None, page: int = 1, page_size: int = None,
+                 total: int = None, page_url: Callable[[int], str] = None):
+        super().__init__(out, eips)
+        self.page = page
+        self.page_size = page_size
+        self.total = total
+        self.page_url = page_url
+
+    def begin(self) -> None:
+        title = 'Smart Contract Analysis Report'
+        if self.page_size and self.total is not None:
+            title += f' - page {self.page} of {self._pages()}'
+        self.out.write(
+            '<!DOCTYPE html>\n<html><head><meta charset="utf-8">'
+            f'<title>{html.escape(title)}</title>'
+            '<style>body{font-family:sans-serif;margin:2em}table{border-collapse:collapse;margin-bottom:1.5em}'
+            'td,th{border:1px solid #ccc;padding:4px 8px;text-align:left}.compliant{color:#137333}'
+            '.non_compliant,.error{color:#b3261e}</style></head><body>\n'
+            f'<h1>{html.escape(title)}</h1>\n'
+        )
+
+    def add(self, filename: str, result: Dict) -> None:
+        if self.page_size is None or (self.page - 1) * self.page_size <= self.count < self.page * self.page_size:
+            self._write_result(filename, result)
+        self.count += 1
+
+    def _write_result(self, filename: str, result: Dict) -> None:
+        self.out.write(f'<h2>{html.escape(filename)}</h2>\n')
+        if 'error' in result:
+            self.out.write(f'<p class="error">Error: {html.escape(result["error"])}</p>\n')
+            return
+        modules = result.get('oz_modules') or ['None']
+        self.out.write(f'<p>OpenZeppelin Imports: {"<br>".join(html.escape(m) for m in modules)}</p>\n')
+        self.out.write('<table><tr><th>EIP</th><th>Verdict</th></tr>')
+        for eip, verdict in result['compliance'].items():
+            self.out.write(f'<tr><td>{html.escape(eip)}</td>'
+                           f'<td class="{verdict_status(verdict)}">{html.escape(verdict)}</td></tr>')
+        self.out.write('</table>\n')
+
+    def end(self, summary: Dict = None) -> None:
+        if self.page_size and self.total is not None and self.page_url is not None:
+            links = []
+            if self.page > 1:
+                links.append(f'<a href="{html.escape(self.page_url(self.page - 1))}">Previous</a>')
+            if self.page < self._pages():
+                links.append(f'<a href="{html.escape(self.page_url(self.page + 1))}">Next</a>')
+            self.out.write(f'<p>{" | ".join(links)}</p>\n')
+        if summary:
+            self.out.write(f'<p>Analyzed {summary.get("completed", self.count)} of {summary.get("total", self.count)} '
+                           f'files ({summary.get("errors", 0)} with errors).</p>\n')
+        self.out.write('</body></html>\n')
+
+    def _pages(self) -> int:
+        return max(1, -(-self.total // self.page_size))
+
+
+class TextReport(ReportWriter):
+    """
+    The plain-text report of SmartContractAnalyzer.generate_report.
+    """
+
+    def begin(self) -> None:
+        self.out.write("Smart Contract Analysis Report\n")
+        self.out.write("===========================\n\n")
+
+    def _write_result(self, filename: str, result: Dict) -> None:
+        self.out.write(f"{filename}\n")
+        if 'error' in result:
+            self.out.write(f"- Error: {result['error']}\n\n")
+            return
+        self.out.write(f"- OpenZeppelin Imports: {', '.join(result.get('oz_modules', ['No OpenZeppelin imports found']))}\n")
+        self.out.write("- EIP Compliance:\n")
+        for eip, status in result['compliance'].items():
+            self.out.write(f"  - {eip}: {status}\n")
+
+        if "solidityscan_results" in result:
+            self.out.write("- SolidityScan Results:\n")
+            for issue in result["solidityscan_results"].get("issues", []):
+                self.out.write(f"  - {issue['severity']}: {issue['description']}\n")
+
+        self.out.write("\n")
+
+
+REPORT_FORMATS = {
+    'jsonl': JsonLinesReport,
+    'csv': CsvReport,
+    'sarif': SarifReport,
+    'html': HtmlReport,
+    'text': TextReport,
+}
+
+
+def write_report(results: Iterable[Tuple[str, Dict]], fmt: str, out: TextIO, eips: List[str] = None,
+                 summary: Dict = None, **options) -> int:
+    """
+    Write (filename, result) pairs to `out` in `fmt` and return the number of files written.
+    """
+    writer = REPORT_FORMATS[fmt](out, eips, **options)
+    writer.begin()
+    for filename, result in results:
+        writer.add(filename, result)
+    writer.end(summary)
+    return writer.count
+
+
+def iter_report(results: Iterable[Tuple[str, Dict]], fmt: str, eips: List[str] = None,
+                summary: Dict = None, **options) -> Iterator[str]:
+    """
+    Like write_report, but yields the report in chunks of about CHUNK_CHARS, e.g. for a streamed response.
+    """
+    buffer = io.StringIO()
+
+    def drain() -> str:
+        chunk = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return chunk
+
+    writer = REPORT_FORMATS[fmt](buffer, eips, **options)
+    writer.begin()
+    for filename, result in results:
+        writer.add(filename, result)
+        if buffer.tell() >= CHUNK_CHARS:
+            yield drain()
+    writer.end(summary)
+    yield drain()
+
+
+def read_results(path: str) -> Iterator[Tuple[str, Dict]]:
+    """
+    (filename, result) pairs from a JSON Lines file, e.g. a report artifact or batch output.
+    Lines without a `file` (such as summaries) are skipped.
+    """
+    with open(path, encoding='utf-8') as handle:
+        for line in handle:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            filename = record.pop('file', None)
+            if filename is not None:
+                yield filename, record
+
+
+class ReportArtifact:
+    """
+    A report being recorded: results are appended to a JSON Lines file as they arrive and
+    the report becomes downloadable once finish() writes its metadata.
+    """
+
+    def __init__(self, directory: str, report_id: str, eips: List[str]):
+        self.id = report_id
+        self.eips = eips
+        self._directory = directory
+        self._partial = os.path.join(directory, f'{report_id}.jsonl.part')
+        self._handle = open(self._partial, 'w', encoding='utf-8')
+        self._writer = JsonLinesReport(self._handle, eips)
+        self._created_at = time.time()
+
+    def add(self, filename: str, result: Dict) -> None:
+        self._writer.add(filename, result)
+
+    def finish(self, summary: Dict = None) -> None:
+        self._handle.close()
+        os.replace(self._partial, os.path.join(self._directory, f'{self.id}.jsonl'))
+        meta = {'id': self.id, 'eips': self.eips, 'files': self._writer.count,
+                'created_at': self._created_at, 'summary': summary}
+        with open(os.path.join(self._directory, f'{self.id}.json'), 'w', encoding='utf-8') as handle:
+            json.dump(meta, handle)
+
+    def discard(self) -> None:
+        if not self._handle.closed:
+            self._handle.close()
+            os.remove(self._partial)
+
+
+class ReportStore:
+    """
+    Directory of report artifacts, each kept for `ttl_seconds` after it was created.
+    """
+
+    def __init__(self, directory: str = DEFAULT_REPORT_DIR, ttl_seconds: float = DEFAULT_TTL_SECONDS):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.ttl_seconds = ttl_seconds
+
+    def create(self, eips: List[str]) -> ReportArtifact:
+        self._prune()
+        return ReportArtifact(self.directory, uuid.uuid4().hex, eips)
+
+    def load(self, report_id: str) -> Optional[Dict]:
+        """
+        Metadata of a finished report (`eips`, number of `files`, `summary`), or None.
+        """
+        if not _REPORT_ID_RE.fullmatch(report_id):
+            return None
+        try:
+            with open(os.path.join(self.directory, f'{report_id}.json'), encoding='utf-8') as handle:
+                meta = json.load(handle)
+        except FileNotFoundError:
+            return None
+        if time.time() - meta['created_at'] > self.ttl_seconds:
+            return None
+        return meta
+
+    def results(self, report_id: str) -> Iterator[Tuple[str, Dict]]:
+        return read_results(os.path.join(self.directory, f'{report_id}.jsonl'))
+
+    def _prune(self) -> None:
+        cutoff = time.time() - self.ttl_seconds
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+            except OSError:
+                pass
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Convert JSON Lines analysis results into a report.")
+    parser.add_argument('results', help="JSON Lines results, e.g. a downloaded report or batch output")
+    parser.add_argument('--format', choices=sorted(REPORT_FORMATS), default='sarif')
+    parser.add_argument('--eips', help="Comma-separated EIPs to declare as SARIF rules (default: those in the results)")
+    parser.add_argument('--output', help="Report file (default: standard output)")
+    args = parser.parse_args(argv)
+
+    eips = [eip.strip() for eip in args.eips.split(',') if eip.strip()] if args.eips else None
+    if eips is None and args.format == 'sarif':
+        # A first pass over the file collects the rules without keeping the results
+        eips = sorted({eip for _, result in read_results(args.results) for eip in result.get('compliance', {})})
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8', newline='') as out:
+            write_report(read_results(args.results), args.format, out, eips)
+    else:
+        write_report(read_results(args.results), args.format, sys.stdout, eips)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,309 @@
+import hashlib
+import json
+import logging
+import os
+import random
+import sqlite3
+import threading
+import time
+from array import array
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from analyzer import metrics
+from analyzer.eip_interfaces import canonical_signature, canonical_type, load_index
+from analyzer.solidity_parser import parse_source, tokenize
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INDEX_PATH = os.path.join('.cache', 'similarity.sqlite3')
+DEFAULT_REUSE_THRESHOLD = 0.9
+DEFAULT_PROVISIONAL_THRESHOLD = 0.7
+# Near-identical contracts share one entry, so clusters of forks do not grow the index
+MERGE_THRESHOLD = 0.97
+
+SHINGLE_SIZE = 5
+NUM_PERMUTATIONS = 128
+BANDS = 32
+ROWS = NUM_PERMUTATIONS // BANDS
+# Most recent entries read per matching band; keeps lookups flat however large a cluster grows
+BUCKET_FANOUT = 8
+MAX_CANDIDATES = 8
+# One statement probing every band, each limited to its BUCKET_FANOUT most recent entries
+_BAND_QUERY = ' UNION ALL '.join(
+    f'SELECT * FROM (SELECT contract_id FROM buckets WHERE bucket = ? ORDER BY contract_id DESC LIMIT {BUCKET_FANOUT})'
+    for _ in range(BANDS)
+)
+
+SIMILARITY_LOOKUPS = metrics.REGISTRY.register(metrics.Counter(
+    'compliantelligent_similarity_lookups_total', 'Near-duplicate verdict lookups by outcome.', ('outcome',)
+))
+
+_MASKS = [random.Random(20240601 + i).getrandbits(64) for i in range(NUM_PERMUTATIONS)]
+_MAX_HASH = (1 << 64) - 1
+
+# Identifiers kept verbatim when normalizing; every other name becomes ID so renames do not count
+_KEPT_IDENTIFIERS = {
+    'pragma', 'solidity', 'import', 'as', 'from', 'contract', 'interface', 'library', 'abstract', 'is',
+    'function', 'modifier', 'event', 'error', 'struct', 'enum', 'mapping', 'constructor', 'fallback',
+    'receive', 'returns', 'return', 'if', 'else', 'for', 'while', 'do', 'break', 'continue', 'emit',
+    'revert', 'require', 'assert', 'new', 'delete', 'try', 'catch', 'using', 'type', 'unchecked',
+    'public', 'external', 'internal', 'private', 'view', 'pure', 'payable', 'virtual', 'override',
+    'constant', 'immutable', 'memory', 'storage', 'calldata', 'indexed', 'anonymous', 'true', 'false',
+    'address', 'bool', 'string', 'bytes', 'byte', 'uint', 'int', 'msg', 'sender', 'value', 'block',
+    'timestamp', 'number', 'tx', 'origin', 'this', 'super', 'keccak256', 'abi', 'encode', 'encodePacked',
+}
+
+
+def normalized_tokens(code: str) -> List[str]:
+    """
+    Tokens with comments dropped, literals replaced by NUM/STR and identifiers replaced by ID,
+    except keywords, elementary types, globals and the function and event names of indexed EIPs.
+    """
+    kept = _kept_identifiers()
+    normalized = []
+    for token in tokenize(code):
+        if token.kind == 'ident':
+            value = token.value
+            if value in kept or value.startswith(('uint', 'int', 'bytes')) and value[-1:].isdigit():
+                normalized.append(value)
+            else:
+                normalized.append('ID')
+        elif token.kind == 'number':
+            normalized.append('NUM')
+        elif token.kind == 'string':
+            normalized.append('STR')
+        else:
+            normalized.append(token.value)
+    return normalized
+
+
+_kept_cache: Optional[set] = None
+
+
+def _kept_identifiers() -> set:
+    global _kept_cache
+    if _kept_cache is None:
+        names = set(_KEPT_IDENTIFIERS)
+        index = load_index()
+        for interface in index.interfaces.values():
+            for entry in interface.functions + interface.optional_functions:
+                names.add(entry.name)
+            names.update(signature.split('(', 1)[0] for signature in interface.events)
+        _kept_cache = names
+    return _kept_cache
+
+
+def minhash(code: str) -> Optional[array]:
+    """
+    MinHash signature of the contract's normalized token shingles, or None for empty sources.
+    """
+    tokens = normalized_tokens(code)
+    if not tokens:
+        return None
+    width = min(SHINGLE_SIZE, len(tokens))
+    hashes = {
+        int.from_bytes(hashlib.blake2b(' '.join(tokens[i:i + width]).encode('utf-8'), digest_size=8).digest(), 'big')
+        for i in range(len(tokens) - width + 1)
+    }
+    return array('Q', [min(value ^ mask for value in hashes) for mask in _MASKS])
+
+
+def estimated_similarity(first: array, second: array) -> float:
+    """
+    Estimated Jaccard similarity of the shingle sets behind two signatures.
+    """
+    return sum(1 for a, b in zip(first, second) if a == b) / NUM_PERMUTATIONS
+
+
+def band_buckets(signature: array) -> List[int]:
+    buckets = []
+    for band in range(BANDS):
+        rows = signature[band * ROWS:(band + 1) * ROWS]
+        digest = hashlib.blake2b(bytes([band]) + rows.tobytes(), digest_size=8).digest()
+        buckets.append(int.from_bytes(digest, 'big', signed=True))
+    return buckets
+
+
+def structure_key(code: str) -> str:
+    """
+    Hash of what a verdict depends on besides the code's wording: import paths, each contract's
+    kind and bases (local bases by position, since forks rename them) and the ABI signatures
+    and events declared in the file. Contract names, constants and ordering are left out.
+    """
+    unit = parse_source(code)
+    local = {contract.name for contract in unit.contracts}
+    contracts = []
+    for contract in unit.contracts:
+        contracts.append([
+            contract.kind,
+            contract.is_abstract,
+            ['<local>' if base in local else base for base in contract.bases],
+            sorted(_abi_entry(s, unit.types) for s in contract.signatures if s.visibility in ('external', 'public', '')),
+            sorted(canonical_signature(e, unit.types) for e in contract.events),
+        ])
+    payload = {'imports': sorted(directive.path for directive in unit.imports), 'contracts': sorted(contracts, key=json.dumps)}
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def _abi_entry(signature, types: Dict[str, str]) -> str:
+    returns = ','.join(canonical_type(r, types) for r in signature.returns)
+    return f'{canonical_signature(signature, types)}:{returns}'
+
+
+@dataclass
+class SimilarMatch:
+    """
+    The closest previously analyzed contract with verdicts for some of the requested EIPs.
+    """
+    content_hash: str
+    similarity: float
+    same_structure: bool
+    verdicts: Dict[str, str]
+    reusable: bool
+
+    def summary(self) -> Dict:
+        return {
+            'content_hash': self.content_hash,
+            'similarity': round(self.similarity, 3),
+            'same_structure': self.same_structure,
+            'reusable': self.reusable,
+            'eips': sorted(self.verdicts),
+        }
+
+
+class SimilarityIndex:
+    """
+    Persistent MinHash/LSH index of analyzed contracts and their verdicts, for reusing verdicts
+    across lightly modified forks. Entries at least `reuse_threshold` similar with the same
+    structure (see structure_key) are reusable; down to `provisional_threshold` they are only
+    returned as provisional matches. Verdicts are kept per `scope` (model and prompt version).
+    """
+
+    def __init__(self, path: str = DEFAULT_INDEX_PATH, reuse_threshold: float = DEFAULT_REUSE_THRESHOLD,
+                 provisional_threshold: float = DEFAULT_PROVISIONAL_THRESHOLD):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.reuse_threshold = reuse_threshold
+        self.provisional_threshold = min(provisional_threshold, reuse_threshold)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript(
+            "CREATE TABLE IF NOT EXISTS contracts ("
+            "id INTEGER PRIMARY KEY, content_hash TEXT NOT NULL UNIQUE, structure TEXT NOT NULL, "
+            "signature BLOB NOT NULL, added_at REAL NOT NULL);"
+            "CREATE TABLE IF NOT EXISTS buckets ("
+            "bucket INTEGER NOT NULL, contract_id INTEGER NOT NULL, PRIMARY KEY (bucket, contract_id)) WITHOUT ROWID;"
+            "CREATE TABLE IF NOT EXISTS verdicts ("
+            "contract_id INTEGER NOT NULL, scope TEXT NOT NULL, eip TEXT NOT NULL, verdict TEXT NOT NULL, "
+            "PRIMARY KEY (contract_id, scope, eip)) WITHOUT ROWID;"
+        )
+        self._db.commit()
+
+    def query(self, code: str, eips: List[str], scope: str) -> Optional[SimilarMatch]:
+        """
+        Return the most similar indexed contract (other than `code` itself) that has verdicts for
+        any of `eips` under `scope`, if it is at least `provisional_threshold` similar.
+        """
+        signature = minhash(code)
+        if signature is None:
+            return None
+        content_hash = hashlib.sha256(code.encode('utf-8')).hexdigest()
+        with metrics.span('similarity_lookup'):
+            with self._lock:
+                candidates = self._candidates(signature, exclude_hash=content_hash)
+                if not candidates:
+                    return None
+                verdicts = self._verdicts([candidate[0] for candidate in candidates], eips, scope)
+
+        best = None
+        for contract_id, candidate_hash, structure, similarity in candidates:
+            if contract_id in verdicts and similarity >= self.provisional_threshold:
+                if best is None or similarity > best[3]:
+                    best = (contract_id, candidate_hash, structure, similarity)
+        if best is None:
+            return None
+
+        contract_id, candidate_hash, structure, similarity = best
+        same_structure = structure == structure_key(code)
+        return SimilarMatch(
+            content_hash=candidate_hash,
+            similarity=similarity,
+            same_structure=same_structure,
+            verdicts=verdicts[contract_id],
+            reusable=same_structure and similarity >= self.reuse_threshold,
+        )
+
+    def add(self, code: str, verdicts: Dict[str, str], scope: str) -> None:
+        """
+        Record verdicts for `code`. A near-identical indexed contract with the same structure
+        receives the verdicts instead of a new entry being added.
+        """
+        signature = minhash(code)
+        if signature is None or not verdicts:
+            return
+        content_hash = hashlib.sha256(code.encode('utf-8')).hexdigest()
+        structure = structure_key(code)
+        with metrics.span('similarity_index'), self._lock:
+            row = self._db.execute("SELECT id FROM contracts WHERE content_hash = ?", (content_hash,)).fetchone()
+            contract_id = row[0] if row else None
+            if contract_id is None:
+                for candidate_id, _, candidate_structure, similarity in self._candidates(signature):
+                    if similarity >= MERGE_THRESHOLD and candidate_structure == structure:
+                        contract_id = candidate_id
+                        break
+            if contract_id is None:
+                contract_id = self._db.execute(
+                    "INSERT INTO contracts (content_hash, structure, signature, added_at) VALUES (?, ?, ?, ?)",
+                    (content_hash, structure, signature.tobytes(), time.time())
+                ).lastrowid
+                self._db.executemany(
+                    "INSERT OR IGNORE INTO buckets (bucket, contract_id) VALUES (?, ?)",
+                    [(bucket, contract_id) for bucket in band_buckets(signature)]
+                )
+            self._db.executemany(
+                "INSERT OR IGNORE INTO verdicts (contract_id, scope, eip, verdict) VALUES (?, ?, ?, ?)",
+                [(contract_id, scope, eip, verdict) for eip, verdict in verdicts.items()]
+            )
+            self._db.commit()
+
+    def size(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM contracts").fetchone()[0]
+
+    def _candidates(self, signature: array, exclude_hash: str = None) -> List[Tuple[int, str, str, float]]:
+        """
+        (id, content_hash, structure, similarity) of the entries sharing the most LSH bands with
+        `signature`, most similar first. Callers hold the lock.
+        """
+        hits: Dict[int, int] = {}
+        for (contract_id,) in self._db.execute(_BAND_QUERY, band_buckets(signature)):
+            hits[contract_id] = hits.get(contract_id, 0) + 1
+        if not hits:
+            return []
+        ids = sorted(hits, key=hits.get, reverse=True)[:MAX_CANDIDATES]
+        rows = self._db.execute(
+            f"SELECT id, content_hash, structure, signature FROM contracts WHERE id IN ({','.join('?' * len(ids))})",
+            ids
+        ).fetchall()
+        candidates = []
+        for contract_id, content_hash, structure, blob in rows:
+            if content_hash == exclude_hash:
+                continue
+            stored = array('Q')
+            stored.frombytes(blob)
+            candidates.append((contract_id, content_hash, structure, estimated_similarity(signature, stored)))
+        candidates.sort(key=lambda candidate: candidate[3], reverse=True)
+        return candidates
+
+    def _verdicts(self, ids: List[int], eips: List[str], scope: str) -> Dict[int, Dict[str, str]]:
+        rows = self._db.execute(
+            f"SELECT contract_id, eip, verdict FROM verdicts WHERE scope = ? "
+            f"AND contract_id IN ({','.join('?' * len(ids))}) AND eip IN ({','.join('?' * len(eips))})",
+            [scope, *ids, *eips]
+        ).fetchall()
+        found: Dict[int, Dict[str, str]] = {}
+        for contract_id, eip, verdict in rows:
+            found.setdefault(contract_id, {})[eip] = verdict
+        return found
@@ -0,0 +1,226 @@
+import copy
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import CancelledError, Future
+from contextlib import ExitStack
+from typing import Any, Callable, Dict, List, Optional
+
+from analyzer import metrics
+
+try:
+    import fcntl
+except ImportError:  # no flock (e.g. Windows); coalescing then stays within one process
+    fcntl = None
+
+DEFAULT_LOCK_STRIPES = 1024
+# Outcomes only need to outlive the processes already waiting on them
+DEFAULT_OUTCOME_TTL_SECONDS = 60
+
+FLIGHTS = metrics.REGISTRY.register(metrics.Counter(
+    'compliantelligent_singleflight_total',
+    'Work items by whether they ran, joined an in-flight run in this process, or took another process\'s outcome.',
+    ('scope', 'outcome')
+))
+
+
+class FlightError(RuntimeError):
+    """
+    Failure of a computation that ran in another process, replayed to the processes waiting on it.
+    """
+
+
+class _OutcomeStore:
+    """
+    Short-lived SQLite record of finished computations, read by processes that waited on a lock.
+    """
+
+    def __init__(self, path: str, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS flight_outcomes ("
+            "key TEXT PRIMARY KEY, ok INTEGER NOT NULL, payload TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+        self._db.commit()
+
+    def get(self, key: str, since: float) -> Optional[tuple]:
+        """
+        Return (ok, payload) for `key` if it finished at or after `since`, else None.
+        """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT ok, payload FROM flight_outcomes WHERE key = ? AND created_at >= ?", (key, since)
+            ).fetchone()
+        if row is None:
+            return None
+        return bool(row[0]), json.loads(row[1])
+
+    def put(self, outcomes: Dict[str, tuple]) -> None:
+        now = time.time()
+        with self._lock:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO flight_outcomes (key, ok, payload, created_at) VALUES (?, ?, ?, ?)",
+                [(key, int(ok), json.dumps(payload), now) for key, (ok, payload) in outcomes.items()]
+            )
+            self._db.execute("DELETE FROM flight_outcomes WHERE created_at <= ?", (now - self.ttl_seconds,))
+            self._db.commit()
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent identical work. Callers asking for a key that is already being computed
+    wait for that computation and get its result or its exception instead of starting another.
+
+    With `directory` set (and flock available), the same holds across processes sharing the
+    directory: the leader holds a lock file while computing and records the outcome, which
+    processes blocked on the lock pick up. Results must be JSON-serializable in that case.
+    """
+
+    def __init__(self, directory: str = None, scope: str = 'task', stripes: int = DEFAULT_LOCK_STRIPES,
+                 outcome_ttl_seconds: float = DEFAULT_OUTCOME_TTL_SECONDS):
+        self.scope = scope
+        self.stripes = stripes
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, Future] = {}
+
+        self.directory = directory if fcntl is not None else None
+        self._outcomes = None
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+            self._outcomes = _OutcomeStore(os.path.join(self.directory, 'outcomes.sqlite3'), outcome_ttl_seconds)
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        """
+        Return fn(), or the result of an identical in-flight call of `key`.
+        """
+        return self.do_many([key], lambda keys: {key: fn()})[key]
+
+    def do_many(self, keys: List[str], compute: Callable[[List[str]], Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Resolve several keys at once. `compute(missing)` is called with the keys nobody else is
+        computing and must return a result for each of them; keys already in flight are awaited.
+        If `compute` raises, the exception reaches this caller and everyone waiting on its keys.
+        Callers that joined another's computation get their own copy of its result.
+        """
+        while True:
+            leading, following = self._claim(keys)
+            if leading:
+                self._lead(leading, compute)
+
+            results = {}
+            retry = False
+            for key in keys:
+                future = leading.get(key) or following[key]
+                try:
+                    result = future.result()
+                    results[key] = result if key in leading else copy.deepcopy(result)
+                except CancelledError:
+                    if key in leading:
+                        raise
+                    # The leader was cancelled rather than failing; compute it afresh
+                    retry = True
+            if not retry:
+                return results
+
+    def _claim(self, keys: List[str]):
+        leading: Dict[str, Future] = {}
+        following: Dict[str, Future] = {}
+        with self._lock:
+            for key in dict.fromkeys(keys):
+                future = self._inflight.get(key)
+                if future is None:
+                    future = self._inflight[key] = Future()
+                    future.set_running_or_notify_cancel()
+                    leading[key] = future
+                else:
+                    following[key] = future
+        if following:
+            FLIGHTS.inc(len(following), scope=self.scope, outcome='coalesced')
+        return leading, following
+
+    def _lead(self, leading: Dict[str, Future], compute: Callable) -> None:
+        keys = list(leading)
+        # Only outcomes finished while this caller waited count; older ones are not a cache
+        since = time.time()
+        try:
+            with ExitStack() as stack:
+                if self.directory:
+                    for stripe in sorted({self._stripe(key) for key in keys}):
+                        stack.enter_context(self._file_lock(stripe))
+                results = self._compute_or_replay(keys, compute, since)
+        except BaseException as e:
+            self._finish(leading, error=e)
+            if not isinstance(e, Exception):
+                raise
+            return
+        self._finish(leading, results=results)
+
+    def _compute_or_replay(self, keys: List[str], compute: Callable, since: float) -> Dict[str, Any]:
+        results: Dict[str, Any] = {}
+        missing = []
+        for key in keys:
+            outcome = self._outcomes.get(key, since) if self._outcomes else None
+            if outcome is None:
+                missing.append(key)
+                continue
+            ok, payload = outcome
+            FLIGHTS.inc(scope=self.scope, outcome='shared')
+            if not ok:
+                raise FlightError(payload)
+            results[key] = payload
+
+        if missing:
+            FLIGHTS.inc(len(missing), scope=self.scope, outcome='leader')
+            try:
+                computed = compute(missing)
+            except Exception as e:
+                if self._outcomes:
+                    self._outcomes.put({key: (False, f'{type(e).__name__}: {e}') for key in missing})
+                raise
+            if self._outcomes:
+                self._outcomes.put({key: (True, computed[key]) for key in missing})
+            results.update(computed)
+        return results
+
+    def _finish(self, leading: Dict[str, Future], results: Dict[str, Any] = None,
+                error: BaseException = None) -> None:
+        with self._lock:
+            for key in leading:
+                self._inflight.pop(key, None)
+        for key, future in leading.items():
+            if error is not None:
+                future.set_exception(error)
+            elif key in results:
+                future.set_result(results[key])
+            else:
+                future.set_exception(KeyError(f'compute() returned no result for {key}'))
+
+    def _stripe(self, key: str) -> int:
+        return int(hashlib.sha256(key.encode('utf-8')).hexdigest()[:8], 16) % self.stripes
+
+    def _file_lock(self, stripe: int):
+        path = os.path.join(self.directory, f'{self.scope}-{stripe}.lock')
+        return _FileLock(path)
+
+
+class _FileLock:
+    def __init__(self, path: str):
+        self.path = path
+        self._file = None
+
+    def __enter__(self):
+        self._file = open(self.path, 'a+')
+        fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        try:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+        finally:
+            self._file.close()
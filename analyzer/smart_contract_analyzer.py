@@ -1,13 +1,156 @@
+import contextvars
+import hashlib
+import io
+import logging
+import threading
+import time
 import openai
-from typing import List, Dict
+from contextlib import contextmanager, nullcontext
+from typing import Callable, List, Dict, Optional, TextIO, Tuple
+from analyzer import metrics
+from analyzer.eip_interfaces import ConformanceChecker
+from analyzer.openai_client import RateLimitedChatClient, get_shared_client
+from analyzer.minimizer import DEFAULT_TOKEN_BUDGET, MINIMIZER_VERSION, PreparedSource, prepare_source
+from analyzer.reports import write_report
+from analyzer.similarity import SIMILARITY_LOOKUPS, SimilarityIndex, SimilarMatch
+from analyzer.singleflight import SingleFlight
+from analyzer.solidity_parser import parse_source
+from analyzer.static_classifier import is_openzeppelin_path
+from analyzer.verdict_cache import VerdictCache
+from analyzer.verdict_parser import (
+    extract_reason, format_verdict, merge_chunk_verdicts, parse_batch_response, parse_scored_response, parse_verdict
+)
 # from solidityscan import SolidityScan
 ## SECRET_KEY=popeyethesailorman
 ## API_KEY=scooblovessnacks
 
+logger = logging.getLogger(__name__)
+
+SYSTEM_PROMPT = "You are an AI assistant analyzing Solidity smart contracts."
+
+EIP_PROMPT_TEMPLATE = """Analyze this Solidity contract carefully for {eip} compliance. Answer these questions in sequence:
+
+                    1. Are any OpenZeppelin contracts being imported? List them.
+                    2. Specifically, is any OpenZeppelin {eip} related contract being imported? This includes any contract from OpenZeppelin's token/{eip} directory.
+                    3. If yes to #2, analyze whether the contract inherits from the {eip} standard (implements it) or just interacts with {eip} contracts.
+
+                    Important: There are many valid import paths for OpenZeppelin contracts. Check for any import containing 'openzeppelin' and '{eip_lower}', even if it's not the standard path.
+                    
+                    Contract code:
+                    {contract_code}
+                    
+                    Provide your analysis in a clear format stating whether the contract Complies or Does not comply with {eip}, followed by your reasoning."""
+
+BATCH_PROMPT_TEMPLATE = """Analyze this Solidity contract carefully for compliance with each of these standards: {eips}.
+For every standard, answer these questions in sequence:
+
+1. Is any OpenZeppelin contract related to the standard being imported? This includes any contract from OpenZeppelin's token/<standard> directory, under any valid import path containing 'openzeppelin'.
+2. If yes, does the contract inherit from the standard (implements it) or just interact with contracts of that standard?
+
+A contract complies only if it inherits or implements the standard.
+
+Contract code:
+{contract_code}
+
+Respond with JSON only, without any other text, using exactly this schema:
+{{"results": [{{"eip": "<standard>", "verdict": "complies" or "does_not_comply", "reasoning": "<one or two sentences>"}}]}}
+Include exactly one entry for each of: {eips}."""
+
+FIRST_PASS_PROMPT_TEMPLATE = """Analyze this Solidity contract for compliance with each of these standards: {eips}.
+A contract complies only if it inherits or implements the standard; importing or calling contracts of that standard is not enough.
+
+Contract code:
+{contract_code}
+
+Respond with JSON only, without any other text, using exactly this schema:
+{{"results": [{{"eip": "<standard>", "verdict": "complies" or "does_not_comply", "confidence": <number between 0 and 1>, "reasoning": "<one sentence>"}}]}}
+Give a low confidence whenever the answer depends on code that is not shown or on a judgement call.
+Include exactly one entry for each of: {eips}."""
+
+# Changes whenever any prompt text changes, so cached verdicts from older prompts are never reused
+PROMPT_VERSION = hashlib.sha256(
+    (SYSTEM_PROMPT + EIP_PROMPT_TEMPLATE + BATCH_PROMPT_TEMPLATE).encode('utf-8')
+).hexdigest()[:12]
+FIRST_PASS_PROMPT_VERSION = hashlib.sha256(FIRST_PASS_PROMPT_TEMPLATE.encode('utf-8')).hexdigest()[:8]
+
+# First-pass answers below this confidence are escalated to the main model
+DEFAULT_MIN_CONFIDENCE = 0.8
+CASCADE_OUTCOMES = ('accepted', 'low_confidence', 'disagreement', 'unanswered', 'error')
+
+CASCADE_DECISIONS = metrics.REGISTRY.register(metrics.Counter(
+    'compliantelligent_cascade_decisions_total',
+    'First-pass model verdicts accepted, or escalated to the main model by reason.', ('decision',)
+))
+
+# Streamed fragments are forwarded at most this often per LLM call, so clients are not flooded
+TOKEN_FLUSH_SECONDS = 0.1
+
+_token_sink: contextvars.ContextVar = contextvars.ContextVar('token_sink', default=None)
+
+
+@contextmanager
+def stream_tokens(sink: Callable[[List[str], str], None]):
+    """
+    Stream LLM calls made in this context and pass their output to sink(eips, text) as it
+    arrives. Verdicts are still parsed from the complete answer and cached as usual.
+    """
+    token = _token_sink.set(sink)
+    try:
+        yield
+    finally:
+        _token_sink.reset(token)
+
+
+class _DeltaBuffer:
+    def __init__(self, sink: Callable[[List[str], str], None], eips: List[str]):
+        self.sink = sink
+        self.eips = eips
+        self._parts: List[str] = []
+        self._flushed_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def add(self, text: str) -> None:
+        with self._lock:
+            self._parts.append(text)
+            due = time.monotonic() - self._flushed_at >= TOKEN_FLUSH_SECONDS
+        if due:
+            self.flush()
+
+    def flush(self) -> None:
+        with self._lock:
+            text = ''.join(self._parts)
+            self._parts = []
+            self._flushed_at = time.monotonic()
+        if text:
+            self.sink(self.eips, text)
+
+
+def conformance_signals(reports: Dict[str, Dict]) -> Dict[str, bool]:
+    """
+    {eip: complies} from check_functions()-style reports, leaving out EIPs whose report is
+    inconclusive because some base contracts could not be resolved.
+    """
+    return {eip: report['complies'] for eip, report in reports.items() if not report.get('unresolved_bases')}
+
+
 class SmartContractAnalyzer:
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, model: str = "gpt-4", cache: VerdictCache = None, batch_eips: bool = True,
+                 minimize: bool = True, token_budget: int = DEFAULT_TOKEN_BUDGET,
+                 client: RateLimitedChatClient = None, flights: SingleFlight = None,
+                 first_pass_model: str = None, min_confidence: float = DEFAULT_MIN_CONFIDENCE,
+                 similarity: SimilarityIndex = None):
         """
         Initialize the SmartContractAnalyzer with the provided API key.
+        An optional VerdictCache short-circuits repeated EIP compliance checks, and
+        `batch_eips` asks about all selected EIPs of a contract in a single request.
+        With `minimize`, prompts carry only the declarations relevant to the EIP question,
+        split into chunks of at most `token_budget` tokens. OpenAI calls go through `client`,
+        by default the process-wide rate-limited client. With `flights`, concurrent requests
+        for the same (contract, EIP) share one LLM call. With `first_pass_model`, a cheaper model
+        answers first with a confidence per EIP, and only answers below `min_confidence` or
+        contradicting the local function-conformance check are asked again with `model`.
+        LLM verdicts are recorded in the optional `similarity` index so that near-duplicate
+        contracts can reuse them (see similar_verdicts).
         """
         if not api_key:
             raise ValueError("API key must be provided")
@@ -15,9 +158,16 @@ class SmartContractAnalyzer:
         # Set the API key for this instance and globally for OpenAI
         self.api_key = api_key
         openai.api_key = self.api_key  # Set globally
-
-        # Debugging: Print the API key being used
-        print(f"Initializing with API key: {self.api_key}")
+        self.model = model
+        self.cache = cache
+        self.batch_eips = batch_eips
+        self.minimize = minimize
+        self.token_budget = token_budget
+        self.client = client or get_shared_client()
+        self.flights = flights
+        self.first_pass_model = first_pass_model or None
+        self.min_confidence = min_confidence
+        self.similarity = similarity
 
     def analyze_contract(self, contract_code: str, selected_eips: List[str]) -> Dict:
         """
@@ -38,122 +188,343 @@ class SmartContractAnalyzer:
             'solidityscan_results': solidityscan_results,
         }
 
-    def analyze_oz_imports(self, contract_code: str) -> List[str]:
+    @staticmethod
+    def analyze_oz_imports(contract_code: str) -> List[str]:
         """
         Extract OpenZeppelin imports from the smart contract code.
         """
         try:
-            # Look for lines starting with "import" and containing "openzeppelin"
+            # Parse import directives (including multi-line ones) and keep the OpenZeppelin ones
             import_lines = [
-                line.strip()
-                for line in contract_code.splitlines()
-                if line.strip().startswith("import") and "openzeppelin" in line.lower()
+                directive.text
+                for directive in parse_source(contract_code).imports
+                if is_openzeppelin_path(directive.path)
             ]
             return import_lines if import_lines else ["No OpenZeppelin imports found."]
         except Exception as e:
             return [f"Error parsing OpenZeppelin imports: {str(e)}"]
 
-    def check_eip_compliance(self, contract_code: str, oz_imports: List[str], selected_eips: List[str]) -> Dict:
+    def check_eip_compliance(self, contract_code: str, oz_imports: List[str], selected_eips: List[str],
+                             signals: Dict[str, bool] = None) -> Dict:
         """
-        Check EIP compliance using GPT-4 analysis.
+        Check EIP compliance using GPT-4 analysis. `signals` ({eip: complies} from a
+        project-wide function-conformance check) are what first-pass answers are compared
+        against; by default they are computed from `contract_code` alone.
         """
+        if self.batch_eips and len(selected_eips) > 1:
+            return self.check_eip_compliance_batch(contract_code, oz_imports, selected_eips, signals)
+
         results = {}
         
         for eip in selected_eips:
+            results[eip] = self.check_single_eip(contract_code, oz_imports, eip, signals)
+
+        return results
+
+    def check_eip_compliance_batch(self, contract_code: str, oz_imports: List[str], selected_eips: List[str],
+                                   signals: Dict[str, bool] = None) -> Dict:
+        """
+        Check all selected EIPs with one GPT-4 request (per chunk) that answers in JSON.
+        EIPs missing from a malformed answer fall back to one request each.
+        """
+        results = {}
+        missing = []
+        for eip in selected_eips:
+            cached = self._cached_verdict(contract_code, eip)
+            if cached is not None:
+                results[eip] = cached
+            else:
+                missing.append(eip)
+
+        if missing:
             try:
-                messages = [
-                    {"role": "system", "content": "You are an AI assistant analyzing Solidity smart contracts."},
-                    {
-                        "role": "user",
-                        "content": f"""Analyze this Solidity contract carefully for {eip} compliance. Answer these questions in sequence:
-
-                        1. Are any OpenZeppelin contracts being imported? List them.
-                        2. Specifically, is any OpenZeppelin {eip} related contract being imported? This includes any contract from OpenZeppelin's token/{eip} directory.
-                        3. If yes to #2, analyze whether the contract inherits from the {eip} standard (implements it) or just interacts with {eip} contracts.
-
-                        Important: There are many valid import paths for OpenZeppelin contracts. Check for any import containing 'openzeppelin' and '{eip.lower()}', even if it's not the standard path.
-                        
-                        Contract code:
-                        {contract_code}
-                        
-                        Provide your analysis in a clear format stating whether the contract Complies or Does not comply with {eip}, followed by your reasoning."""
-                    }
-                ]
-
-                response = openai.ChatCompletion.create(
-                    model="gpt-4",
-                    messages=messages,
-                    temperature=0
-                )
-
-                analysis = response['choices'][0]['message']['content'].strip()
-                
-                # Check the analysis for compliance
-                compliant = "Complies" in analysis
-                
-                if compliant:
-                    results[eip] = f"✅ Complies with {eip}"
-                else:
-                    # Extract the reason for non-compliance
-                    reason = analysis.split("Reason:")[1].split(".")[0].strip() if "Reason:" in analysis else analysis
-                    results[eip] = f"❌ Does not comply with {eip}. Reason: {reason}"
+                results.update(self._coalesced(contract_code, missing, signals))
+            except Exception as e:
+                logger.warning("Batch analysis of %s failed: %s", ", ".join(missing), e)
+                metrics.VERDICTS.inc(len(missing), source='error')
+                for eip in missing:
+                    results[eip] = f"❌ Error during {eip} analysis: {str(e)}"
+
+        return {eip: results[eip] for eip in selected_eips}
+
+    def check_single_eip(self, contract_code: str, oz_imports: List[str], eip: str,
+                         signals: Dict[str, bool] = None) -> str:
+        """
+        Ask GPT-4 about a single EIP and return the formatted verdict string.
+        Verdicts are served from the cache when the same contract was checked before.
+        """
+        cached = self._cached_verdict(contract_code, eip)
+        if cached is not None:
+            return cached
+
+        try:
+            return self._coalesced(contract_code, [eip], signals)[eip]
+        except Exception as e:
+            # Errors are never cached so the next request retries
+            logger.warning("%s analysis failed: %s", eip, e)
+            metrics.VERDICTS.inc(source='error')
+            return f"❌ Error during {eip} analysis: {str(e)}"
+
+    def _coalesced(self, contract_code: str, eips: List[str], signals: Dict[str, bool] = None) -> Dict[str, str]:
+        """
+        Compute verdicts for `eips`, joining identical (contract, EIP) work already in flight
+        in this or (with a shared directory) another process instead of repeating it.
+        """
+        if self.flights is None:
+            return self._compute_verdicts(contract_code, eips, signals)
+
+        eip_by_key = {self._cache_key(contract_code, eip): eip for eip in eips}
+
+        def compute(keys):
+            verdicts = self._compute_verdicts(contract_code, [eip_by_key[key] for key in keys], signals)
+            return {key: verdicts[eip_by_key[key]] for key in keys}
+
+        results = self.flights.do_many(list(eip_by_key), compute)
+        return {eip: results[key] for key, eip in eip_by_key.items()}
+
+    def _compute_verdicts(self, contract_code: str, eips: List[str], signals: Dict[str, bool] = None) -> Dict[str, str]:
+        """
+        Ask the LLM about `eips` and cache the verdicts. With a first-pass model, its confident
+        answers that agree with `signals` are kept and only the rest reach the main model.
+        """
+        sources = self._prompt_sources(contract_code)
+        answers = {}
+        remaining = eips
+        if self.first_pass_model:
+            if signals is None:
+                signals = self._local_signals(contract_code, eips)
+            answers = self._first_pass(sources, eips, signals)
+            remaining = [eip for eip in eips if eip not in answers]
+        if remaining:
+            with metrics.span('cascade_escalation') if self.first_pass_model else nullcontext():
+                answers.update(self._ask_model(sources, remaining))
 
+        verdicts = {eip: format_verdict(eip, *answers[eip]) for eip in eips}
+        metrics.VERDICTS.inc(len(verdicts), source='llm')
+        if self.cache is not None:
+            for eip, verdict in verdicts.items():
+                self.cache.set(self._cache_key(contract_code, eip), verdict)
+        if self.similarity is not None:
+            try:
+                self.similarity.add(contract_code, verdicts, self._similarity_scope)
             except Exception as e:
-                results[eip] = f"❌ Error during {eip} analysis: {str(e)}"
+                logger.warning("Could not index verdicts for similarity lookups: %s", e)
+        return verdicts
 
-        return results
+    def similar_verdicts(self, contract_code: str, eips: List[str]) -> Optional[SimilarMatch]:
+        """
+        Verdicts about `eips` of the most similar contract analyzed before with the same model and
+        prompts, or None. Callers use the verdicts of a `reusable` match instead of asking the LLM
+        and may show the others as provisional answers until the LLM has decided.
+        """
+        if self.similarity is None or not eips:
+            return None
+        try:
+            match = self.similarity.query(contract_code, eips, self._similarity_scope)
+        except Exception as e:
+            logger.warning("Similarity lookup failed: %s", e)
+            return None
+        SIMILARITY_LOOKUPS.inc(outcome='miss' if match is None else 'reused' if match.reusable else 'provisional')
+        if match is not None and match.reusable:
+            metrics.VERDICTS.inc(len(match.verdicts), source='similar')
+        return match
 
-    def run_solidityscan_scan(self, contract_code: str) -> Dict:
+    def _ask_model(self, sources: List[str], eips: List[str]) -> Dict[str, Tuple[bool, str]]:
         """
-        Run SolidityScan analysis on the provided contract code.
+        Ask the main model about `eips` (one JSON request per chunk when there are several; EIPs
+        missing from a malformed answer fall back to one request each) and merge the chunks.
+        """
+        if len(eips) == 1:
+            chunk_verdicts = {eips[0]: [self._ask_single(source, eips[0]) for source in sources]}
+        else:
+            chunk_verdicts = {eip: [] for eip in eips}
+            for source in sources:
+                parsed = self._ask_batch(source, eips)
+                for eip in eips:
+                    chunk_verdicts[eip].append(parsed[eip] if eip in parsed else self._ask_single(source, eip))
+        return {eip: merge_chunk_verdicts(chunk_verdicts[eip]) for eip in eips}
+
+    def _first_pass(self, sources: List[str], eips: List[str], signals: Dict[str, bool]) -> Dict[str, Tuple[bool, str]]:
+        """
+        Ask the first-pass model about `eips` and return the answers that can be kept: every
+        chunk answered with at least `min_confidence`, and no contradiction with `signals`.
         """
+        scored = {eip: [] for eip in eips}
         try:
-            scan = SolidityScan()
-            results = scan.scan(scan_type="code", code=contract_code)
-            return results
+            with metrics.span('cascade_first_pass'):
+                for source in sources:
+                    messages = [
+                        {"role": "system", "content": SYSTEM_PROMPT},
+                        {"role": "user",
+                         "content": FIRST_PASS_PROMPT_TEMPLATE.format(eips=", ".join(eips), contract_code=source)}
+                    ]
+                    response = self._complete(messages, eips, model=self.first_pass_model)
+                    for eip, answer in parse_scored_response(response['choices'][0]['message']['content'], eips).items():
+                        scored[eip].append(answer)
         except Exception as e:
-            return {"error": f"SolidityScan error: {str(e)}"}
+            # The main model still answers; only a failure there is reported as an error
+            logger.warning("First-pass model %s failed, escalating %s: %s", self.first_pass_model, ", ".join(eips), e)
+            self._route('error', len(eips))
+            return {}
+
+        accepted = {}
+        for eip in eips:
+            answers = scored[eip]
+            if len(answers) < len(sources):
+                self._route('unanswered')
+            elif any(confidence is None or confidence < self.min_confidence for _, _, confidence in answers):
+                self._route('low_confidence')
+            else:
+                compliant, reason = merge_chunk_verdicts([(compliant, reason) for compliant, reason, _ in answers])
+                if eip in signals and signals[eip] != compliant:
+                    self._route('disagreement')
+                else:
+                    self._route('accepted')
+                    accepted[eip] = (compliant, reason)
+        return accepted
+
+    def _local_signals(self, contract_code: str, eips: List[str]) -> Dict[str, bool]:
+        try:
+            return conformance_signals(self.check_functions(contract_code, eips))
+        except Exception as e:
+            logger.debug("Function conformance check failed: %s", e)
+            return {}
+
+    def cascade_stats(self) -> Optional[Dict]:
+        """
+        Process-wide first-pass routing decisions and requests per model tier, or None without a cascade.
+        """
+        if not self.first_pass_model:
+            return None
+        return {
+            'decisions': {decision: CASCADE_DECISIONS.value(decision=decision) for decision in CASCADE_OUTCOMES},
+            'requests': {
+                tier: metrics.LLM_REQUESTS.value(model=model, outcome='ok')
+                for tier, model in (('first_pass', self.first_pass_model), ('main', self.model))
+            },
+        }
 
-    def check_functions(self, contract_code: str, required_functions: List[str]) -> Dict:
+    @staticmethod
+    def _route(decision: str, amount: int = 1) -> None:
+        CASCADE_DECISIONS.inc(amount, decision=decision)
+        metrics.count(f'cascade_{decision}', amount)
+
+    def prepare_source(self, contract_code: str) -> PreparedSource:
         """
-        Check for required functions and compliance with standards.
+        Minimize and chunk the contract to fit the token budget (no-op when minimization is off).
         """
+        if not self.minimize:
+            return PreparedSource(chunks=[contract_code])
+        return prepare_source(contract_code, self.token_budget, self.model)
+
+    def _prompt_sources(self, contract_code: str) -> List[str]:
+        with metrics.span('prompt_preparation'):
+            chunks = self.prepare_source(contract_code).chunks
+        if len(chunks) == 1:
+            return chunks
+        return [
+            f"// Part {index} of {len(chunks)} of the contract source; comments and function bodies removed\n{chunk}"
+            for index, chunk in enumerate(chunks, start=1)
+        ]
+
+    def _ask_single(self, source: str, eip: str) -> Tuple[bool, str]:
         messages = [
-            {"role": "system", "content": "You are an AI assistant analyzing Solidity smart contracts."},
-            {"role": "user", "content": f"Analyze the following Solidity smart contract code and check if it implements the required functions {required_functions}. "
-                                        f"For each function:\n- Check if it exists\n- Verify correct parameters\n- Check if it follows standard implementation.\n\n{contract_code}"}
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {
+                "role": "user",
+                "content": EIP_PROMPT_TEMPLATE.format(eip=eip, eip_lower=eip.lower(), contract_code=source)
+            }
         ]
 
-        response = openai.ChatCompletion.create(
-            model="gpt-3.5-turbo",
-            messages=messages,
-            temperature=0
-        )
+        response = self._complete(messages, [eip])
+
+        analysis = response['choices'][0]['message']['content'].strip()
+        return parse_verdict(analysis), extract_reason(analysis)
+
+    def _ask_batch(self, source: str, eips: List[str]) -> Dict[str, Tuple[bool, str]]:
+        messages = [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {
+                "role": "user",
+                "content": BATCH_PROMPT_TEMPLATE.format(eips=", ".join(eips), contract_code=source)
+            }
+        ]
+
+        response = self._complete(messages, eips)
+
+        return parse_batch_response(response['choices'][0]['message']['content'], eips)
 
+    def _complete(self, messages: List[Dict], eips: List[str], model: str = None):
+        """
+        Run one chat completion with `model` (default: the main model), streamed to the
+        context's token sink (see stream_tokens) if any.
+        """
+        model = model or self.model
+        sink: Optional[Callable] = _token_sink.get()
+        if sink is None:
+            return self.client.create(model=model, messages=messages, temperature=0)
+
+        buffer = _DeltaBuffer(sink, eips)
         try:
-            return eval(response.choices[0]['message']['content'].strip())
-        except Exception as e:
-            return {"error": f"Error parsing compliance results: {str(e)}"}
+            return self.client.create(model=model, messages=messages, temperature=0, on_delta=buffer.add)
+        finally:
+            buffer.flush()
 
-    def generate_report(self, analysis_results: Dict) -> str:
+    @property
+    def prompt_version(self) -> str:
         """
-        Generate a simplified report based on analysis results.
+        Identifies the prompts, minimizer and cascade settings that verdicts are produced with.
         """
-        report = "Smart Contract Analysis Report\n"
-        report += "===========================\n\n"
+        version = PROMPT_VERSION
+        if self.minimize:
+            version = f"{version}.m{MINIMIZER_VERSION}.{self.token_budget}"
+        if self.first_pass_model:
+            version = f"{version}.c{FIRST_PASS_PROMPT_VERSION}.{self.first_pass_model}.{self.min_confidence:g}"
+        return version
 
-        for contract_name, data in analysis_results.items():
-            report += f"{contract_name}\n"
-            report += f"- OpenZeppelin Imports: {', '.join(data.get('oz_modules', ['No OpenZeppelin imports found']))}\n"
-            report += "- EIP Compliance:\n"
-            for eip, status in data['compliance'].items():
-                report += f"  - {eip}: {status}\n"
+    @property
+    def _similarity_scope(self) -> str:
+        return f"{self.model}:{self.prompt_version}"
 
-            if "solidityscan_results" in data:
-                report += "- SolidityScan Results:\n"
-                for issue in data["solidityscan_results"].get("issues", []):
-                    report += f"  - {issue['severity']}: {issue['description']}\n"
+    def _cache_key(self, contract_code: str, eip: str) -> str:
+        return VerdictCache.make_key(contract_code, eip, self.model, self.prompt_version)
 
-            report += "\n"
+    def _cached_verdict(self, contract_code: str, eip: str):
+        if self.cache is None:
+            return None
+        verdict = self.cache.get(self._cache_key(contract_code, eip))
+        if verdict is not None:
+            metrics.VERDICTS.inc(source='cache')
+        return verdict
 
-        return report
+    def run_solidityscan_scan(self, contract_code: str) -> Dict:
+        """
+        Run SolidityScan analysis on the provided contract code.
+        """
+        try:
+            scan = SolidityScan()
+            results = scan.scan(scan_type="code", code=contract_code)
+            return results
+        except Exception as e:
+            return {"error": f"SolidityScan error: {str(e)}"}
+
+    def check_functions(self, contract_code: str, eips: List[str], context_files: Dict[str, str] = None) -> Dict:
+        """
+        Check the contract's public and external functions and events, including inherited ones,
+        against the indexed interfaces of `eips` without calling the LLM. `context_files` are the
+        other sources of the project, used to resolve local base contracts. Returns
+        {eip: {'contract', 'complies', 'missing', 'mismatched', 'extra', 'missing_events',
+        'unresolved_bases'}} for each EIP in `analyzer/data/eip_interfaces.json`.
+        """
+        filename = '<contract>.sol'
+        checker = ConformanceChecker.from_sources({**(context_files or {}), filename: contract_code})
+        return checker.check(filename, eips)
+
+    def generate_report(self, analysis_results: Dict, out: TextIO = None) -> Optional[str]:
+        """
+        Generate a simplified report based on analysis results. The report is written to `out`
+        as each file is formatted, or returned as a string when no stream is given.
+        """
+        buffer = out if out is not None else io.StringIO()
+        write_report(analysis_results.items(), 'text', buffer)
+        return buffer.getvalue() if out is None else None
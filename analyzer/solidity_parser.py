@@ -0,0 +1,440 @@
+import posixpath
+import re
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+_TOKEN_RE = re.compile(r'''
+    (?P<ws>\s+)
+  | (?P<comment>//[^\n]*|/\*.*?(?:\*/|\Z))
+  | (?P<string>"(?:\\.|[^"\\\n])*"|'(?:\\.|[^'\\\n])*')
+  | (?P<ident>[A-Za-z_$][A-Za-z0-9_$]*)
+  | (?P<number>0[xX][0-9a-fA-F_]+|[0-9][0-9_]*(?:\.[0-9_]+)?(?:[eE]-?[0-9]+)?)
+  | (?P<operator>=>|==|!=|<=|>=|&&|\|\||\+\+|--|\+=|-=|\*=|/=|%=|\*\*|<<|>>|->)
+  | (?P<punct>.)
+''', re.S | re.X)
+
+CONTRACT_KINDS = ('contract', 'interface', 'library')
+
+# Statements at contract level that never declare a public state variable
+_NON_VARIABLE_KEYWORDS = {
+    'function', 'modifier', 'event', 'error', 'using', 'struct', 'enum',
+    'constructor', 'fallback', 'receive', 'type',
+}
+
+VISIBILITIES = ('external', 'public', 'internal', 'private')
+_TYPE_KEYWORDS = ('struct', 'enum', 'type')
+_DATA_LOCATIONS = {'memory', 'calldata', 'storage'}
+
+
+@dataclass
+class Token:
+    kind: str
+    value: str
+    start: int
+    end: int
+
+
+@dataclass
+class ImportDirective:
+    path: str
+    text: str
+    # Local name -> name exported by the imported file; empty for plain and wildcard imports
+    symbols: Dict[str, str] = field(default_factory=dict)
+    unit_alias: Optional[str] = None
+
+
+@dataclass
+class Signature:
+    """
+    A function, event or public state-variable getter with its types as written
+    (e.g. `uint`, `IERC20`, `uint[]`); `visibility` is empty when not declared.
+    """
+    name: str
+    params: List[str]
+    returns: List[str] = field(default_factory=list)
+    visibility: str = ''
+
+
+@dataclass
+class ContractDecl:
+    name: str
+    kind: str
+    is_abstract: bool
+    bases: List[str]
+    functions: Set[str]
+    public_variables: Set[str]
+    # Every identifier referenced inside the contract body
+    references: Set[str]
+    # (TypeName, member) pairs for casts such as IERC20(token).transfer
+    external_calls: List[Tuple[str, str]]
+    start: int
+    end: int
+    # Function headers and public state-variable getters, and event declarations
+    signatures: List[Signature] = field(default_factory=list)
+    events: List[Signature] = field(default_factory=list)
+
+
+@dataclass
+class SourceUnit:
+    imports: List[ImportDirective]
+    contracts: List[ContractDecl]
+    # User-defined type name -> `enum`, `struct(<member types>)` or a value type's underlying type,
+    # from file level and every contract body
+    types: Dict[str, str] = field(default_factory=dict)
+
+
+def tokenize(source: str, keep_comments: bool = False) -> List[Token]:
+    """
+    Split Solidity source into tokens, dropping whitespace and (by default) comments.
+    """
+    tokens = []
+    for match in _TOKEN_RE.finditer(source):
+        kind = match.lastgroup
+        if kind == 'ws' or (kind == 'comment' and not keep_comments):
+            continue
+        if kind == 'operator':
+            kind = 'punct'
+        tokens.append(Token(kind, match.group(), match.start(), match.end()))
+    return tokens
+
+
+def parse_source(source: str) -> SourceUnit:
+    """
+    Extract imports and contract/interface/library declarations from Solidity source.
+    """
+    tokens = tokenize(source)
+    imports = []
+    contracts = []
+    types = {}
+    i = 0
+    while i < len(tokens):
+        token = tokens[i]
+        if token.kind == 'ident' and token.value == 'import':
+            directive, i = _parse_import(source, tokens, i)
+            if directive is not None:
+                imports.append(directive)
+            continue
+        if token.kind == 'ident' and token.value in CONTRACT_KINDS:
+            contract, i = _parse_contract(tokens, i, types)
+            if contract is not None:
+                contracts.append(contract)
+            continue
+        if token.kind == 'ident' and token.value in _TYPE_KEYWORDS:
+            definition = _type_definition(tokens, i, len(tokens))
+            if definition is not None:
+                types.setdefault(*definition)
+        i += 1
+    return SourceUnit(imports=imports, contracts=contracts, types=types)
+
+
+def suffix_index(paths: Iterable[str]) -> Dict[str, List[str]]:
+    """
+    Map every trailing part of each path (`a/b/C.sol`, `b/C.sol`, `C.sol`) to the paths ending with it.
+    """
+    by_suffix: Dict[str, List[str]] = {}
+    for path in sorted(set(paths)):
+        parts = path.split('/')
+        for i in range(len(parts)):
+            by_suffix.setdefault('/'.join(parts[i:]), []).append(path)
+    return by_suffix
+
+
+def resolve_import(importer: str, path: str, by_suffix: Dict[str, List[str]]) -> List[str]:
+    """
+    Files of `by_suffix` that an import of `path` in `importer` may refer to. Relative imports
+    resolve against the importing file; other paths (remappings such as `@openzeppelin/...` or
+    `src/...`) match any file whose path ends with them.
+    """
+    if path.startswith('.'):
+        path = posixpath.normpath(posixpath.join(posixpath.dirname(importer), path))
+    return by_suffix.get(path.lstrip('/'), [])
+
+
+def _find(tokens: List[Token], start: int, value: str) -> int:
+    for i in range(start, len(tokens)):
+        if tokens[i].kind == 'punct' and tokens[i].value == value:
+            return i
+    return len(tokens)
+
+
+def _matching(tokens: List[Token], start: int, opening: str, closing: str) -> int:
+    """
+    Return the index of the token closing the bracket opened at `start`.
+    """
+    depth = 0
+    for i in range(start, len(tokens)):
+        if tokens[i].kind != 'punct':
+            continue
+        if tokens[i].value == opening:
+            depth += 1
+        elif tokens[i].value == closing:
+            depth -= 1
+            if depth == 0:
+                return i
+    return len(tokens) - 1
+
+
+def _parse_import(source: str, tokens: List[Token], i: int) -> Tuple[Optional[ImportDirective], int]:
+    end = _find(tokens, i, ';')
+    statement = tokens[i + 1:end]
+    text = ' '.join(source[tokens[i].start:tokens[min(end, len(tokens) - 1)].end].split())
+    paths = [t.value[1:-1] for t in statement if t.kind == 'string']
+    if not paths:
+        return None, end + 1
+
+    directive = ImportDirective(path=paths[0], text=text)
+    values = [t.value for t in statement]
+    if '{' in values:
+        close = values.index('}') if '}' in values else len(values)
+        names = values[values.index('{') + 1:close]
+        j = 0
+        while j < len(names):
+            name = names[j]
+            if name == ',':
+                j += 1
+                continue
+            if j + 2 < len(names) and names[j + 1] == 'as':
+                directive.symbols[names[j + 2]] = name
+                j += 3
+            else:
+                directive.symbols[name] = name
+                j += 1
+    elif 'as' in values:
+        alias_index = values.index('as') + 1
+        if alias_index < len(values) and statement[alias_index].kind == 'ident':
+            directive.unit_alias = values[alias_index]
+    return directive, end + 1
+
+
+def _parse_contract(tokens: List[Token], i: int, types: Dict[str, str]) -> Tuple[Optional[ContractDecl], int]:
+    kind = tokens[i].value
+    is_abstract = i > 0 and tokens[i - 1].value == 'abstract'
+    if i + 1 >= len(tokens) or tokens[i + 1].kind != 'ident':
+        return None, i + 1
+    name = tokens[i + 1].value
+
+    body_start = _find(tokens, i + 2, '{')
+    if body_start >= len(tokens):
+        return None, len(tokens)
+
+    bases = []
+    if tokens[i + 2].value == 'is':
+        j = i + 3
+        while j < body_start:
+            # A base is a (possibly qualified) name optionally followed by constructor arguments
+            qualified = []
+            while j < body_start and (tokens[j].kind == 'ident' or tokens[j].value == '.'):
+                if tokens[j].kind == 'ident':
+                    qualified.append(tokens[j].value)
+                j += 1
+            if qualified:
+                bases.append(qualified[-1])
+            if j < body_start and tokens[j].value == '(':
+                j = _matching(tokens, j, '(', ')') + 1
+            if j < body_start and tokens[j].value == ',':
+                j += 1
+            elif not qualified:
+                j += 1
+
+    body_end = _matching(tokens, body_start, '{', '}')
+    functions, public_variables, references, external_calls, signatures, events = _scan_body(
+        tokens, body_start + 1, body_end, types
+    )
+    contract = ContractDecl(
+        name=name,
+        kind=kind,
+        is_abstract=is_abstract,
+        bases=bases,
+        functions=functions,
+        public_variables=public_variables,
+        references=references,
+        external_calls=external_calls,
+        start=tokens[i - 1].start if is_abstract else tokens[i].start,
+        end=tokens[body_end].end,
+        signatures=signatures,
+        events=events,
+    )
+    return contract, body_end + 1
+
+
+def _scan_body(tokens: List[Token], start: int, end: int, types: Dict[str, str]):
+    functions = set()
+    public_variables = set()
+    references = set()
+    external_calls = []
+    signatures = []
+    events = []
+    depth = 0
+    statement = []
+
+    for j in range(start, end):
+        token = tokens[j]
+        if token.kind == 'ident':
+            references.add(token.value)
+            if token.value == 'function' and j + 1 < end and tokens[j + 1].kind == 'ident':
+                functions.add(tokens[j + 1].value)
+                if depth == 0:
+                    signatures.append(_function_signature(tokens, j, end))
+            elif depth == 0 and token.value == 'event' and j + 1 < end and tokens[j + 1].kind == 'ident':
+                events.append(Signature(tokens[j + 1].value, [_param_type(p) for p in _params(tokens, j + 2)[0]]))
+            elif depth == 0 and token.value in _TYPE_KEYWORDS and not statement:
+                definition = _type_definition(tokens, j, end)
+                if definition is not None:
+                    types.setdefault(*definition)
+            # Cast-and-call pattern: TypeName(expr).member
+            if token.value[:1].isupper() and j + 1 < end and tokens[j + 1].value == '(':
+                close = _matching(tokens, j + 1, '(', ')')
+                if close + 2 < end and tokens[close + 1].value == '.' and tokens[close + 2].kind == 'ident':
+                    external_calls.append((token.value, tokens[close + 2].value))
+
+        if token.kind == 'punct' and token.value == '{':
+            depth += 1
+            statement = []
+        elif token.kind == 'punct' and token.value == '}':
+            depth -= 1
+            statement = []
+        elif depth == 0:
+            if token.kind == 'punct' and token.value == ';':
+                variable = _public_variable_name(statement)
+                if variable:
+                    public_variables.add(variable)
+                    signatures.append(_getter_signature(statement, variable))
+                statement = []
+            else:
+                statement.append(token)
+
+    return functions, public_variables, references, external_calls, signatures, events
+
+
+def _public_variable_name(statement: List[Token]) -> Optional[str]:
+    if not statement or statement[0].value in _NON_VARIABLE_KEYWORDS:
+        return None
+    if not any(t.value == 'public' for t in statement):
+        return None
+    depth = 0
+    name = None
+    for token in statement:
+        if token.value == '(':
+            depth += 1
+        elif token.value == ')':
+            depth -= 1
+        elif token.value == '=' and depth == 0:
+            break
+        elif token.kind == 'ident' and depth == 0:
+            name = token.value
+    return name
+
+
+def _params(tokens: List[Token], start: int) -> Tuple[List[List[Token]], int]:
+    """
+    Split the parenthesized list opened at `start` on top-level commas; return the
+    non-empty groups and the index of the closing parenthesis.
+    """
+    if start >= len(tokens) or tokens[start].value != '(':
+        return [], start - 1
+    close = _matching(tokens, start, '(', ')')
+    groups = [[]]
+    depth = 0
+    for token in tokens[start + 1:close]:
+        if token.kind == 'punct' and token.value in '([':
+            depth += 1
+        elif token.kind == 'punct' and token.value in ')]':
+            depth -= 1
+        elif token.kind == 'punct' and token.value == ',' and depth == 0:
+            groups.append([])
+            continue
+        groups[-1].append(token)
+    return [group for group in groups if group], close
+
+
+def _param_type(tokens: List[Token]) -> str:
+    """
+    Return the type of a parameter or declaration as written, without data location or name,
+    e.g. `uint[] memory ids` -> `uint[]` and `Lib.Order calldata order` -> `Order`.
+    """
+    if not tokens:
+        return ''
+    if tokens[0].value in ('function', 'mapping'):
+        return tokens[0].value
+    i = 0
+    name = ''
+    while i < len(tokens) and (tokens[i].kind == 'ident' or tokens[i].value == '.'):
+        if tokens[i].kind == 'ident':
+            if name and tokens[i - 1].value != '.':
+                break
+            name = tokens[i].value
+        i += 1
+    if name == 'address' and i < len(tokens) and tokens[i].value == 'payable':
+        i += 1
+    while i < len(tokens) and tokens[i].value == '[':
+        close = _matching(tokens, i, '[', ']')
+        name += '[' + ''.join(t.value for t in tokens[i + 1:close]) + ']'
+        i = close + 1
+    return name
+
+
+def _function_signature(tokens: List[Token], i: int, end: int) -> Signature:
+    groups, close = _params(tokens, i + 2)
+    signature = Signature(tokens[i + 1].value, [_param_type(group) for group in groups])
+    k = close + 1
+    while k < end and tokens[k].value not in ('{', ';'):
+        value = tokens[k].value
+        if value in VISIBILITIES:
+            signature.visibility = value
+        elif value == 'returns':
+            returns, k = _params(tokens, k + 1)
+            signature.returns = [_param_type(group) for group in returns]
+        elif value == '(':
+            # Modifier or override arguments
+            k = _matching(tokens, k, '(', ')')
+        k += 1
+    return signature
+
+
+def _getter_signature(statement: List[Token], name: str) -> Signature:
+    """
+    Signature of the getter the compiler generates for a public state variable: one
+    parameter per mapping key and per array dimension, returning the value type.
+    """
+    params = []
+    declaration = statement
+    while declaration and declaration[0].value == 'mapping' and len(declaration) > 1:
+        close = _matching(declaration, 1, '(', ')')
+        inner = declaration[2:close]
+        arrow = next((k for k, t in enumerate(inner) if t.value == '=>'), len(inner))
+        params.append(_param_type(inner[:arrow]))
+        declaration = inner[arrow + 1:]
+    value = _param_type(declaration)
+    dimensions = value.count('[')
+    params.extend(['uint256'] * dimensions)
+    if dimensions:
+        value = value[:value.index('[')]
+    return Signature(name, params, [value], 'public')
+
+
+def _type_definition(tokens: List[Token], i: int, end: int) -> Optional[Tuple[str, str]]:
+    """
+    Read the struct, enum or user-defined value type declared at `i` as (name, definition).
+    """
+    keyword = tokens[i].value
+    if i + 2 >= end or tokens[i + 1].kind != 'ident':
+        return None
+    name = tokens[i + 1].value
+    if keyword == 'type':
+        if tokens[i + 2].value != 'is' or i + 3 >= end:
+            return None
+        return name, _param_type(tokens[i + 3:_find(tokens, i + 3, ';')])
+    if tokens[i + 2].value != '{':
+        return None
+    if keyword == 'enum':
+        return name, 'enum'
+    close = _matching(tokens, i + 2, '{', '}')
+    members = []
+    member = []
+    for token in tokens[i + 3:close]:
+        if token.value == ';':
+            members.append(_param_type(member))
+            member = []
+        else:
+            member.append(token)
+    return name, 'struct(' + ','.join(members) + ')'
@@ -0,0 +1,227 @@
+import os
+import re
+from typing import Dict, List, Optional, Set, Tuple
+
+from analyzer.solidity_parser import ContractDecl, SourceUnit, parse_source, resolve_import, suffix_index
+
+# Suffixes of OpenZeppelin helpers that mention an EIP but do not implement the token standard
+_HELPER_SUFFIXES = ('Holder', 'Receiver', 'Utils', 'Errors')
+
+# OpenZeppelin contracts whose names do not reveal every standard they implement
+_OZ_EXTRA_FAMILIES = {
+    'ERC4626': {'ERC20'},
+    'ERC4626Upgradeable': {'ERC20'},
+}
+
+# Functions that indicate a hand-rolled implementation of the standard
+_CORE_FUNCTIONS = {
+    'ERC20': {'totalSupply', 'balanceOf', 'transfer', 'transferFrom', 'approve', 'allowance'},
+    'ERC721': {'balanceOf', 'ownerOf', 'safeTransferFrom', 'transferFrom', 'approve',
+               'setApprovalForAll', 'getApproved', 'isApprovedForAll'},
+    'ERC1155': {'balanceOf', 'balanceOfBatch', 'safeTransferFrom', 'safeBatchTransferFrom',
+                'setApprovalForAll', 'isApprovedForAll'},
+}
+
+
+def normalize_eip(eip: str) -> Optional[str]:
+    """
+    Normalize "ERC-20", "eip20" or "ERC20" to "ERC20"; return None for anything else.
+    """
+    compact = re.sub(r'[^A-Z0-9]', '', eip.upper())
+    match = re.fullmatch(r'(?:ERC|EIP)(\d+)', compact)
+    return f"ERC{match.group(1)}" if match else None
+
+
+def is_openzeppelin_path(path: str) -> bool:
+    return 'openzeppelin' in path.lower()
+
+
+def eip_families(name: str) -> Set[str]:
+    """
+    Return the EIP families implemented by an OpenZeppelin contract or interface name.
+    """
+    families = set(_OZ_EXTRA_FAMILIES.get(name, ()))
+    match = re.match(r'I?(ERC\d+)', name)
+    if match and not name.endswith(_HELPER_SUFFIXES):
+        families.add(match.group(1))
+    return families
+
+
+class _Resolution:
+    def __init__(self):
+        # Families reached through concrete OpenZeppelin bases and through interfaces only
+        self.families: Set[str] = set()
+        self.interface_families: Set[str] = set()
+        self.functions: Set[str] = set()
+        self.unresolved: Set[str] = set()
+
+
+class StaticClassifier:
+    """
+    Decide EIP compliance from imports and inheritance alone, across every file of a project.
+    """
+
+    def __init__(self, solidity_files: Dict[str, str]):
+        """
+        Parse every file once and index contract declarations by (file, name).
+        """
+        self.units: Dict[str, Optional[SourceUnit]] = {}
+        self.declarations: Dict[Tuple[str, str], ContractDecl] = {}
+        # Contract name -> files declaring it, for names no import accounts for
+        self._declared_in: Dict[str, List[str]] = {}
+        for filename, code in solidity_files.items():
+            try:
+                unit = parse_source(code)
+            except Exception:
+                unit = None
+            self.units[filename] = unit
+            if unit is None:
+                continue
+            for contract in unit.contracts:
+                if (filename, contract.name) not in self.declarations:
+                    self.declarations[filename, contract.name] = contract
+                    self._declared_in.setdefault(contract.name, []).append(filename)
+        self._by_suffix = suffix_index(self.units)
+        self._resolved: Dict[Tuple[str, str], _Resolution] = {}
+
+    def lookup(self, name: str, filename: str) -> Optional[Tuple[str, ContractDecl]]:
+        """
+        Return (file, declaration) of the contract `name` refers to in `filename`: one declared in
+        the file itself, else one reached through its imports. Names imported from OpenZeppelin
+        files outside the upload are left to the caller; any other name falls back to the first
+        file declaring it.
+        """
+        found = self._lookup_imported(name, filename, set())
+        if found is not None or self.openzeppelin_name(name, filename) is not None:
+            return found
+        for declared_in in self._declared_in.get(name, ()):
+            return declared_in, self.declarations[declared_in, name]
+        return None
+
+    def _lookup_imported(self, name: str, filename: str,
+                         visited: Set[Tuple[str, str]]) -> Optional[Tuple[str, ContractDecl]]:
+        if (filename, name) in visited:
+            return None
+        visited.add((filename, name))
+        contract = self.declarations.get((filename, name))
+        if contract is not None:
+            return filename, contract
+        unit = self.units.get(filename)
+        if unit is None:
+            return None
+        for directive in unit.imports:
+            if directive.symbols and name not in directive.symbols:
+                continue
+            exported = directive.symbols.get(name, name)
+            for target in resolve_import(filename, directive.path, self._by_suffix):
+                found = self._lookup_imported(exported, target, visited)
+                if found is not None:
+                    return found
+        return None
+
+    def classify(self, filename: str, eip: str) -> Optional[str]:
+        """
+        Return a verdict string when the answer is unambiguous, otherwise None.
+        """
+        family = normalize_eip(eip)
+        unit = self.units.get(filename)
+        if family is None or unit is None:
+            return None
+
+        contracts = [c for c in unit.contracts if c.kind == 'contract']
+        if not contracts:
+            return f"❌ Does not comply with {eip}. Reason: The file declares no contracts, only interfaces or libraries."
+
+        undecided = False
+        for contract in contracts:
+            resolution = self._resolve_declared(filename, contract, set())
+            if family in resolution.families:
+                return f"✅ Complies with {eip}"
+            if family in resolution.interface_families:
+                if not contract.is_abstract:
+                    # A concrete contract only compiles when it implements every interface function
+                    return f"✅ Complies with {eip}"
+                undecided = True
+            if resolution.unresolved:
+                undecided = True
+            core = _CORE_FUNCTIONS.get(family)
+            if core is None or len(resolution.functions & core) * 2 >= len(core):
+                undecided = True
+
+        if undecided:
+            return None
+
+        related = sorted({
+            name for contract in contracts for name in contract.references if family in eip_families(name)
+        } | {
+            name for imp in unit.imports for name in imp.symbols if family in eip_families(name)
+        })
+        if related:
+            return (f"❌ Does not comply with {eip}. Reason: The contract only interacts with "
+                    f"{', '.join(related)} and does not inherit the {eip} standard.")
+        return f"❌ Does not comply with {eip}. Reason: The contract neither imports nor inherits {eip}."
+
+    def _resolve(self, name: str, filename: str, seen: Set[Tuple[str, str]]) -> _Resolution:
+        declared = self.lookup(name, filename)
+        if declared is None:
+            resolution = _Resolution()
+            self._resolve_external(name, filename, resolution)
+            return resolution
+        return self._resolve_declared(*declared, seen)
+
+    def _resolve_declared(self, declared_in: str, contract: ContractDecl,
+                          seen: Set[Tuple[str, str]]) -> _Resolution:
+        key = (declared_in, contract.name)
+        if key in self._resolved:
+            return self._resolved[key]
+
+        resolution = _Resolution()
+        if key in seen:
+            return resolution
+        seen.add(key)
+
+        resolution.functions |= contract.functions | contract.public_variables
+        if is_openzeppelin_path(declared_in):
+            # Vendored OpenZeppelin sources shipped inside the upload
+            resolution.families |= eip_families(contract.name)
+        for base in contract.bases:
+            base_resolution = self._resolve(base, declared_in, seen)
+            resolution.families |= base_resolution.families
+            resolution.interface_families |= base_resolution.interface_families
+            resolution.functions |= base_resolution.functions
+            resolution.unresolved |= base_resolution.unresolved
+
+        # Interfaces only promise the standard; concrete contracts must still implement it
+        if contract.kind == 'interface':
+            resolution.interface_families |= resolution.families
+            resolution.families = set()
+        self._resolved[key] = resolution
+        return resolution
+
+    def _resolve_external(self, name: str, filename: str, resolution: _Resolution) -> None:
+        original = self.openzeppelin_name(name, filename)
+        if original is None:
+            resolution.unresolved.add(name)
+            return
+        families = eip_families(original)
+        if original.startswith('I') and original[1:2].isupper():
+            resolution.interface_families |= families
+        else:
+            resolution.families |= families
+
+    def openzeppelin_name(self, name: str, filename: str) -> Optional[str]:
+        """
+        Return the exported name when `name` is imported from OpenZeppelin in `filename`.
+        """
+        unit = self.units.get(filename)
+        if unit is None:
+            return None
+        for directive in unit.imports:
+            if not is_openzeppelin_path(directive.path):
+                continue
+            if name in directive.symbols:
+                return directive.symbols[name]
+            stem = os.path.splitext(os.path.basename(directive.path))[0]
+            if not directive.symbols and stem == name:
+                return name
+        return None
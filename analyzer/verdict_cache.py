@@ -0,0 +1,158 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+DEFAULT_CACHE_PATH = os.path.join('.cache', 'verdicts.sqlite3')
+DEFAULT_MEMORY_ENTRIES = 1024
+DEFAULT_DISK_ENTRIES = 100000
+DEFAULT_TTL_SECONDS = 30 * 24 * 60 * 60
+
+# How many writes happen between size-based prunes of the disk tier
+PRUNE_INTERVAL = 100
+
+
+class VerdictCache:
+    """
+    Two-tier (in-memory LRU + SQLite) cache of EIP compliance verdicts.
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, max_memory_entries: int = DEFAULT_MEMORY_ENTRIES,
+                 max_disk_entries: int = DEFAULT_DISK_ENTRIES, ttl_seconds: float = DEFAULT_TTL_SECONDS):
+        """
+        Initialize the cache. Pass `path=None` to keep the cache in memory only.
+        """
+        self.path = path
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self.ttl_seconds = ttl_seconds
+
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()
+        self._writes_since_prune = 0
+        self.hits = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        self._db = None
+        if path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS verdicts ("
+                "key TEXT PRIMARY KEY, verdict TEXT NOT NULL, "
+                "created_at REAL NOT NULL, last_access REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS verdicts_last_access ON verdicts (last_access)")
+            self._db.commit()
+
+    @staticmethod
+    def make_key(contract_code: str, eip: str, model: str, prompt_version: str) -> str:
+        """
+        Build the content-addressed key for a (contract, EIP, model, prompt) combination.
+        """
+        digest = hashlib.sha256(contract_code.encode('utf-8')).hexdigest()
+        return f"{digest}:{eip}:{model}:{prompt_version}"
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Return the cached verdict for `key`, or None on a miss.
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                verdict, created_at = entry
+                if now - created_at <= self.ttl_seconds:
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                    self.memory_hits += 1
+                    return verdict
+                del self._memory[key]
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT verdict, created_at FROM verdicts WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    verdict, created_at = row
+                    if now - created_at <= self.ttl_seconds:
+                        self._db.execute("UPDATE verdicts SET last_access = ? WHERE key = ?", (now, key))
+                        self._db.commit()
+                        self._remember(key, verdict, created_at)
+                        self.hits += 1
+                        self.disk_hits += 1
+                        return verdict
+                    self._db.execute("DELETE FROM verdicts WHERE key = ?", (key,))
+                    self._db.commit()
+
+            self.misses += 1
+            return None
+
+    def set(self, key: str, verdict: str) -> None:
+        """
+        Store a verdict in both tiers.
+        """
+        now = time.time()
+        with self._lock:
+            self._remember(key, verdict, now)
+            if self._db is None:
+                return
+
+            self._db.execute(
+                "INSERT OR REPLACE INTO verdicts (key, verdict, created_at, last_access) VALUES (?, ?, ?, ?)",
+                (key, verdict, now, now)
+            )
+            self._writes_since_prune += 1
+            if self._writes_since_prune >= PRUNE_INTERVAL:
+                self._prune(now)
+            self._db.commit()
+
+    def clear(self) -> None:
+        """
+        Drop every cached verdict and reset the counters.
+        """
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM verdicts")
+                self._db.commit()
+            self.hits = self.memory_hits = self.disk_hits = self.misses = 0
+
+    def stats(self) -> Dict:
+        """
+        Return hit/miss counters and tier sizes.
+        """
+        with self._lock:
+            disk_entries = 0
+            if self._db is not None:
+                disk_entries = self._db.execute("SELECT COUNT(*) FROM verdicts").fetchone()[0]
+            return {
+                'hits': self.hits,
+                'memory_hits': self.memory_hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'memory_entries': len(self._memory),
+                'disk_entries': disk_entries,
+            }
+
+    def _remember(self, key: str, verdict: str, created_at: float) -> None:
+        self._memory[key] = (verdict, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def _prune(self, now: float) -> None:
+        self._writes_since_prune = 0
+        self._db.execute("DELETE FROM verdicts WHERE created_at < ?", (now - self.ttl_seconds,))
+        self._db.execute(
+            "DELETE FROM verdicts WHERE key IN ("
+            "SELECT key FROM verdicts ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+            (self.max_disk_entries,)
+        )
@@ -0,0 +1,149 @@
+import json
+import re
+from typing import Dict, List, Optional, Tuple
+
+from analyzer.static_classifier import normalize_eip
+
+_NEGATIVE_RE = re.compile(
+    r"\b(?:does\s+not|doesn['’]t|do\s+not)\s+comply\b|\bnot\s+(?:fully\s+)?compliant\b|\bnon[-\s]?compliant\b",
+    re.I
+)
+_POSITIVE_RE = re.compile(r"\bcomplies\b|\bis\s+compliant\b|\bfully\s+compliant\b", re.I)
+_VERDICT_LINE_RE = re.compile(
+    r"^[\W_]*(?:final\s+)?(?:verdict|conclusion|result|answer)[\W_]*[:\-]\s*(.+)$", re.I | re.M
+)
+_FENCE_RE = re.compile(r"```(?:json)?\s*(.*?)```", re.S | re.I)
+
+_CONFIDENCE_WORDS = {'very_high': 0.95, 'high': 0.9, 'medium': 0.6, 'moderate': 0.6, 'low': 0.3, 'very_low': 0.1}
+
+_POSITIVE_VALUES = {'complies', 'compliant', 'comply', 'yes', 'true', 'pass'}
+_NEGATIVE_VALUES = {'does_not_comply', 'not_compliant', 'non_compliant', 'noncompliant', 'no', 'false', 'fail'}
+
+
+def format_verdict(eip: str, compliant: bool, reason: str = "") -> str:
+    """
+    Render a verdict in the ✅/❌ format used throughout the reports.
+    """
+    if compliant:
+        return f"✅ Complies with {eip}"
+    return f"❌ Does not comply with {eip}. Reason: {reason}"
+
+
+def parse_verdict(analysis: str) -> bool:
+    """
+    Decide whether a free-text analysis concludes that the contract complies.
+    An explicit "Verdict:"/"Conclusion:" line wins; otherwise any negative phrase does.
+    """
+    for line in _VERDICT_LINE_RE.findall(analysis):
+        if _NEGATIVE_RE.search(line):
+            return False
+        if _POSITIVE_RE.search(line) or line.strip().lower().startswith('compl'):
+            return True
+    if _NEGATIVE_RE.search(analysis):
+        return False
+    return bool(_POSITIVE_RE.search(analysis))
+
+
+def extract_reason(analysis: str) -> str:
+    return analysis.split("Reason:")[1].split(".")[0].strip() if "Reason:" in analysis else analysis
+
+
+def merge_chunk_verdicts(verdicts: List[Tuple[bool, str]]) -> Tuple[bool, str]:
+    """
+    Combine per-chunk answers: a contract complies if any chunk shows it inherits or
+    implements the standard; otherwise the first chunk's reasoning is kept.
+    """
+    for compliant, reason in verdicts:
+        if compliant:
+            return True, reason
+    return False, verdicts[0][1] if verdicts else ""
+
+
+def parse_batch_response(text: str, eips: List[str]) -> Dict[str, Tuple[bool, str]]:
+    """
+    Parse a JSON batch answer into {eip: (compliant, reasoning)}.
+    EIPs missing from the answer, or with an unrecognised verdict, are left out.
+    """
+    return {eip: (compliant, reasoning) for eip, (compliant, reasoning, _) in parse_scored_response(text, eips).items()}
+
+
+def parse_scored_response(text: str, eips: List[str]) -> Dict[str, Tuple[bool, str, Optional[float]]]:
+    """
+    Parse a JSON batch answer into {eip: (compliant, reasoning, confidence)}. Confidence is
+    read from a `confidence` field as a 0-1 number, a percentage or high/medium/low, and is
+    None when absent or unreadable. EIPs missing from the answer are left out.
+    """
+    payload = _load_json(text)
+    if payload is None:
+        return {}
+
+    if isinstance(payload, dict) and isinstance(payload.get('results'), list):
+        entries = payload['results']
+    elif isinstance(payload, list):
+        entries = payload
+    elif isinstance(payload, dict):
+        entries = [dict(value, eip=key) for key, value in payload.items() if isinstance(value, dict)]
+    else:
+        return {}
+
+    wanted = {normalize_eip(eip) or eip: eip for eip in eips}
+    parsed = {}
+    for entry in entries:
+        if not isinstance(entry, dict):
+            continue
+        name = str(entry.get('eip') or entry.get('standard') or '')
+        eip = wanted.get(normalize_eip(name) or name)
+        compliant = _verdict_value(entry.get('verdict', entry.get('complies')))
+        if eip is None or compliant is None or eip in parsed:
+            continue
+        reasoning = str(entry.get('reasoning') or entry.get('reason') or '').strip()
+        parsed[eip] = (compliant, reasoning, _confidence_value(entry.get('confidence')))
+    return parsed
+
+
+def _load_json(text: str):
+    candidates = _FENCE_RE.findall(text) + [text]
+    for candidate in candidates:
+        candidate = candidate.strip()
+        for opening, closing in (('{', '}'), ('[', ']')):
+            start, end = candidate.find(opening), candidate.rfind(closing)
+            if start == -1 or end <= start:
+                continue
+            try:
+                return json.loads(candidate[start:end + 1])
+            except ValueError:
+                continue
+    return None
+
+
+def _verdict_value(value) -> Optional[bool]:
+    if isinstance(value, bool):
+        return value
+    if not isinstance(value, str):
+        return None
+    normalized = re.sub(r'[\s\-]+', '_', value.strip().lower())
+    if normalized in _NEGATIVE_VALUES:
+        return False
+    if normalized in _POSITIVE_VALUES:
+        return True
+    return None
+
+
+def _confidence_value(value) -> Optional[float]:
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, str):
+        text = value.strip().lower().rstrip('%')
+        word = re.sub(r'[\s\-]+', '_', text)
+        if word in _CONFIDENCE_WORDS:
+            return _CONFIDENCE_WORDS[word]
+        try:
+            value = float(text)
+        except ValueError:
+            return None
+    if not isinstance(value, (int, float)) or value < 0:
+        return None
+    # Answers on a 0-100 scale
+    if value > 1:
+        value = value / 100
+    return min(float(value), 1.0)
@@ -1,34 +1,108 @@
 import os
+import time
 import zipfile
 import json
+import hashlib
+import logging
+from functools import partial
 import requests  # Add this import
-from flask import Flask, request, jsonify, render_template, stream_with_context, Response
+from flask import Flask, request, jsonify, render_template, stream_with_context, Response, url_for
+from analyzer import metrics
+from analyzer.openai_client import get_shared_client
 from analyzer.smart_contract_analyzer import SmartContractAnalyzer
+from analyzer.engine import AnalysisEngine, Provisional, TokenDelta
+from analyzer.ingest import IngestLimits, load_solidity_files
+from analyzer.manifest import ManifestStore
+from analyzer.reports import REPORT_FORMATS, ReportStore, iter_report
+from analyzer.similarity import SimilarityIndex
+from analyzer.singleflight import SingleFlight
+from analyzer.verdict_cache import VerdictCache
 from dotenv import load_dotenv
 from solidityscan_runner import SolidityScanRunner  # Update import to use the class
+from solidityscan_jobs import (
+    FAILED, QUEUED, RUNNING, LocalSolidityScanClient, ScanJobQueue, ScanJobStore
+)
+from solidityscan_cache import CachedScanClient, ScanResultStore, is_allowed_project_url, resolve_commit
+from solidityscan_blocks import BlockScanner, BlockScanStore, parse_targets
+from solidityscan_http import get_shared_http_client
 
 # Load environment variables from .env file
 load_dotenv()
 
+# Leveled logging replaces the old debug prints; LOG_LEVEL=DEBUG shows request/response bodies
+logging.basicConfig(
+    level=os.getenv('LOG_LEVEL', 'INFO').upper(),
+    format='%(asctime)s %(levelname)s %(name)s: %(message)s'
+)
+logger = logging.getLogger(__name__)
+
 # Initialize API keys
 api_key = os.getenv('OPENAI_API_KEY')
 solidityscan_token = os.getenv('SOLIDITYSCAN_TOKEN')
 
+# Maximum number of concurrent OpenAI calls per /analyze request
+analysis_max_workers = int(os.getenv('ANALYSIS_MAX_WORKERS', '8'))
+
+# Strip comments/bodies from prompts and cap each prompt chunk at this many tokens
+prompt_minimize = os.getenv('PROMPT_MINIMIZE', '1') != '0'
+prompt_token_budget = int(os.getenv('PROMPT_TOKEN_BUDGET', '6000'))
+
+# Seconds of silence after which /analyze/stream sends a keep-alive event
+stream_heartbeat_seconds = float(os.getenv('STREAM_HEARTBEAT_SECONDS', '10'))
+
+# Ask about all selected EIPs of a file in one OpenAI request (set ANALYSIS_BATCH_EIPS=0 to disable)
+analysis_batch_eips = os.getenv('ANALYSIS_BATCH_EIPS', '1') != '0'
+
+# Cheaper model asked first; its low-confidence or contradicted answers are escalated to GPT-4
+analysis_first_pass_model = os.getenv('ANALYSIS_FIRST_PASS_MODEL', '')
+analysis_min_confidence = float(os.getenv('ANALYSIS_ESCALATION_CONFIDENCE', '0.8'))
+
+# Shared EIP verdict cache (set VERDICT_CACHE_ENABLED=0 to disable)
+verdict_cache = None
+if os.getenv('VERDICT_CACHE_ENABLED', '1') != '0':
+    verdict_cache = VerdictCache(
+        path=os.getenv('VERDICT_CACHE_PATH', os.path.join('.cache', 'verdicts.sqlite3')),
+        max_memory_entries=int(os.getenv('VERDICT_CACHE_MEMORY_ENTRIES', '1024')),
+        max_disk_entries=int(os.getenv('VERDICT_CACHE_MAX_ENTRIES', '100000')),
+        ttl_seconds=float(os.getenv('VERDICT_CACHE_TTL_SECONDS', str(30 * 24 * 60 * 60)))
+    )
+
+# Near-duplicate index: contracts this similar to an analyzed one with the same imports, inheritance
+# and ABI reuse its verdicts; less similar ones get them as provisional answers (SIMILARITY_INDEX_ENABLED=0 disables)
+similarity_index = None
+if os.getenv('SIMILARITY_INDEX_ENABLED', '1') != '0':
+    similarity_index = SimilarityIndex(
+        path=os.getenv('SIMILARITY_INDEX_PATH', os.path.join('.cache', 'similarity.sqlite3')),
+        reuse_threshold=float(os.getenv('SIMILARITY_REUSE_THRESHOLD', '0.9')),
+        provisional_threshold=float(os.getenv('SIMILARITY_PROVISIONAL_THRESHOLD', '0.7'))
+    )
+
+# Identical concurrent uploads and (contract, EIP) checks share one computation; the lock and
+# outcome files in SINGLEFLIGHT_DIR extend this across worker processes (empty = this process only)
+singleflight_dir = os.getenv('SINGLEFLIGHT_DIR', os.path.join('.cache', 'singleflight')) or None
+task_flights = SingleFlight(singleflight_dir, scope='task')
+upload_flights = SingleFlight(singleflight_dir, scope='upload')
+
+# Analysis runs kept as downloadable reports (see GET /reports/<report_id>)
+report_store = ReportStore(
+    os.getenv('REPORT_DIR', os.path.join('.cache', 'reports')),
+    ttl_seconds=float(os.getenv('REPORT_TTL_SECONDS', str(7 * 24 * 60 * 60)))
+)
+report_page_size = int(os.getenv('REPORT_HTML_PAGE_SIZE', '100'))
+
+# Per-project manifests for incremental re-analysis (used when a request passes project_id)
+manifests = ManifestStore(os.getenv('MANIFEST_PATH', os.path.join('.cache', 'manifests.sqlite3')))
+
 class SolidityScanAPI:
     def __init__(self, token: str = None):
         self.token = token or os.getenv('SOLIDITYSCAN_TOKEN', '')
         if not self.token:
             raise ValueError("SolidityScan token is required")
             
-        # Debug print token info
-        token_preview = f"{self.token[:10]}...{self.token[-10:]}" if len(self.token) > 20 else "..."
-        print("\nDebug: Token Information")
-        print("-----------------------")
-        print(f"Token length: {len(self.token)}")
-        print(f"Token preview: {token_preview}")
-        
         # Set up headers
-        self.base_url = 'https://api.solidityscan.com/private'
+        self.base_url = os.getenv('SOLIDITYSCAN_BASE_URL', 'https://api.solidityscan.com/private')
+        # Pooled connections, timeouts, retries and circuit breaker shared with every SolidityScan caller
+        self.http = get_shared_http_client()
         self.headers = {
             'accept': 'application/json, text/plain, */*',
             'accept-language': 'en-GB,en-US;q=0.9,en;q=0.8',
@@ -42,23 +116,22 @@ class SolidityScanAPI:
         }
 
     def _make_request(self, url: str, data: dict, retry_with_rescan: bool = True) -> dict:
-        print(f"\nDebug: Making request to {url}")
-        print(f"Request data: {json.dumps(data, indent=2)}")
+        logger.debug("SolidityScan request to %s: %s", url, data)
         
         try:
-            response = requests.post(url, headers=self.headers, json=data, timeout=600)
+            response = self.http.post(url, json=data, headers=self.headers, lane='projects')
             response_data = response.json() if response.text else {}
             
-            print(f"Response status: {response.status_code}")
-            print(f"Response data: {json.dumps(response_data, indent=2)}")
+            logger.info("SolidityScan responded %s for %s", response.status_code, data.get("project_url"))
+            logger.debug("SolidityScan response body: %.2000s", response.text)
 
-            # Handle duplicate project case
+            # SolidityScan knows the project but we hold no findings for it: rescan once to get them
             if (response.status_code == 403 and 
                 response_data.get("status") == "failed" and 
                 response_data.get("type") == "duplicate_project" and 
                 retry_with_rescan):
                 
-                print("\nDuplicate project detected, retrying with rescan=true")
+                logger.info("Duplicate project detected, retrying with rescan=true")
                 data["rescan"] = True
                 return self._make_request(url, data, retry_with_rescan=False)
             
@@ -79,7 +152,7 @@ class SolidityScanAPI:
             return response_data
 
         except requests.exceptions.RequestException as e:
-            print(f"Request error: {str(e)}")
+            logger.warning("SolidityScan request error: %s", e)
             return {
                 "status": "error",
                 "message": str(e),
@@ -88,8 +161,8 @@ class SolidityScanAPI:
 
     def scan_project(self, project_url: str, project_branch: str = "main", 
                     skip_file_paths: list = None, provider: str = "github", 
-                    project_name: str = None) -> dict:
-        """Start a project scan."""
+                    project_name: str = None, rescan: bool = False) -> dict:
+        """Start a project scan; `rescan` re-scans a project SolidityScan already knows."""
         try:
             url = f"{self.base_url}/api-project-scan/"
             data = {
@@ -98,13 +171,13 @@ class SolidityScanAPI:
                 "project_url": project_url,
                 "project_branch": project_branch,
                 "project_skip_files": skip_file_paths or [],
-                "rescan": False  # Initially set to False
+                "rescan": rescan
             }
 
-            return self._make_request(url, data)
+            return self._make_request(url, data, retry_with_rescan=not rescan)
             
         except Exception as e:
-            print(f"\nError in scan_project: {str(e)}")
+            logger.exception("Error in scan_project")
             return {
                 "status": "error",
                 "message": f"Scan failed: {str(e)}",
@@ -113,64 +186,317 @@ class SolidityScanAPI:
 
 # Initialize Flask app
 app = Flask(__name__)
+app.config['MAX_CONTENT_LENGTH'] = int(os.getenv('UPLOAD_MAX_BYTES', str(100 * 1024 * 1024)))
+
+# Byte, file-count and zip-bomb limits applied while reading uploaded ZIPs
+upload_limits = IngestLimits.from_env()
 
 # Initialize SolidityScan client
 scanner = SolidityScanAPI(solidityscan_token)
 
+# Findings per (provider, URL, branch, commit, skipped paths); unchanged branches are not rescanned
+scan_results = None
+if os.getenv('SOLIDITYSCAN_CACHE_ENABLED', '1') != '0':
+    scan_results = ScanResultStore(os.getenv('SOLIDITYSCAN_CACHE_PATH', os.path.join('.cache', 'scan_results.sqlite3')))
+scan_unverified_max_age = float(os.getenv('SOLIDITYSCAN_CACHE_UNVERIFIED_MAX_AGE', str(24 * 60 * 60)))
+# Project URLs must be https URLs on one of these hosts (they are resolved with git ls-remote)
+solidityscan_git_hosts = tuple(
+    host.strip().lower() for host in os.getenv('SOLIDITYSCAN_GIT_HOSTS', 'github.com,gitlab.com,bitbucket.org').split(',')
+    if host.strip()
+)
+
+def make_scan_client(token):
+    """Build the client scan jobs run against; SOLIDITYSCAN_BACKEND=local uses the in-process stand-in."""
+    if os.getenv('SOLIDITYSCAN_BACKEND') == 'local':
+        client = LocalSolidityScanClient(token)
+    else:
+        client = scanner if token == scanner.token else SolidityScanAPI(token)
+    if scan_results is None:
+        return client
+    return CachedScanClient(client, scan_results, unverified_max_age=scan_unverified_max_age,
+                            resolver=partial(resolve_commit, allowed_hosts=solidityscan_git_hosts))
+
+# Bulk scans of deployed contracts; results are cached per (chain, address)
+block_scanner = BlockScanner(
+    store=BlockScanStore(
+        os.getenv('BLOCK_SCAN_CACHE_PATH', os.path.join('.cache', 'block_scans.sqlite3')),
+        ttl_seconds=float(os.getenv('BLOCK_SCAN_CACHE_TTL_SECONDS', str(7 * 24 * 60 * 60)))
+    ),
+    max_workers=int(os.getenv('BLOCK_SCAN_MAX_WORKERS', '16'))
+)
+block_scan_max_targets = int(os.getenv('BLOCK_SCAN_MAX_TARGETS', '1000'))
+
+# Background queue for SolidityScan project scans
+scan_jobs = ScanJobQueue(
+    client_factory=make_scan_client,
+    store=ScanJobStore(os.getenv('SCAN_JOBS_PATH', os.path.join('.cache', 'scan_jobs.sqlite3'))),
+    default_token=scanner.token,
+    max_workers=int(os.getenv('SCAN_JOBS_MAX_WORKERS', '4')),
+    per_token_limit=int(os.getenv('SCAN_JOBS_PER_TOKEN_LIMIT', '2')),
+    lease_seconds=float(os.getenv('SCAN_JOBS_LEASE_SECONDS', '60'))
+)
+
+# Queue depths and cache counters are read when /metrics is scraped
+metrics.REGISTRY.register(metrics.Gauge(
+    'compliantelligent_llm_queue_depth', 'Callers waiting for the OpenAI rate limiter.',
+    lambda: get_shared_client().queue_depth
+))
+metrics.REGISTRY.register(metrics.Gauge(
+    'compliantelligent_scan_jobs_waiting', 'SolidityScan jobs waiting for a per-token slot.',
+    scan_jobs.queue_depth
+))
+metrics.REGISTRY.register(metrics.Gauge(
+    'compliantelligent_solidityscan_circuit_open', 'Whether the SolidityScan circuit breaker is open, per host.',
+    lambda: get_shared_http_client().circuit_states(), labels=('host',)
+))
+if verdict_cache is not None:
+    metrics.REGISTRY.register(metrics.Gauge(
+        'compliantelligent_verdict_cache_lookups', 'Verdict cache lookups since start by result.',
+        lambda: {(result,): verdict_cache.stats()[key]
+                 for result, key in (('memory_hit', 'memory_hits'), ('disk_hit', 'disk_hits'), ('miss', 'misses'))},
+        labels=('result',)
+    ))
+
+# Prometheus scrape endpoint
+@app.route('/metrics')
+def prometheus_metrics():
+    return Response(metrics.REGISTRY.render(), mimetype='text/plain; version=0.0.4')
+
 # Home route to serve the main page
 @app.route('/')
 def home():
     return render_template('index.html')
 
-# Analyze route to process the uploaded ZIP file
-@app.route('/analyze', methods=['POST'])
-def analyze():
-    try:
-        if 'zipFile' not in request.files:
-            return jsonify({'error': 'No file uploaded. Please upload a ZIP file.'}), 400
+def make_analyzer():
+    """Build a SmartContractAnalyzer configured from the environment."""
+    return SmartContractAnalyzer(
+        api_key=api_key,
+        cache=verdict_cache,
+        batch_eips=analysis_batch_eips,
+        minimize=prompt_minimize,
+        token_budget=prompt_token_budget,
+        flights=task_flights,
+        first_pass_model=analysis_first_pass_model,
+        min_confidence=analysis_min_confidence,
+        similarity=similarity_index
+    )
+
+def parse_analysis_upload():
+    """
+    Validate the upload form shared by /analyze and /analyze/stream.
+    Returns (upload, None) on success or (None, error_response). The upload holds the
+    project `files` to analyze, vendored `context_files`, the ingest `report`, `eips` and
+    the optional `project_id` used for incremental re-analysis.
+    """
+    if 'zipFile' not in request.files:
+        return None, (jsonify({'error': 'No file uploaded. Please upload a ZIP file.'}), 400)
 
-        zip_file = request.files['zipFile']
-        if not zip_file.filename.endswith('.zip'):
-            return jsonify({'error': 'Invalid file format. Please upload a ZIP file.'}), 400
+    zip_file = request.files['zipFile']
+    if not zip_file.filename.endswith('.zip'):
+        return None, (jsonify({'error': 'Invalid file format. Please upload a ZIP file.'}), 400)
 
-        eips = request.form.get('eips')
-        if not eips:
-            return jsonify({'error': 'No EIPs selected. Please select at least one EIP.'}), 400
+    eips = request.form.get('eips')
+    if not eips:
+        return None, (jsonify({'error': 'No EIPs selected. Please select at least one EIP.'}), 400)
 
-        eips = json.loads(eips)
-        if not isinstance(eips, list) or not eips:
-            return jsonify({'error': 'Invalid EIPs format. Please select valid EIPs.'}), 400
+    eips = json.loads(eips)
+    if not isinstance(eips, list) or not eips:
+        return None, (jsonify({'error': 'Invalid EIPs format. Please select valid EIPs.'}), 400)
 
-        solidity_files = extract_solidity_files(zip_file)
-        if not solidity_files:
-            return jsonify({'error': 'No Solidity (.sol) files found in the uploaded ZIP.'}), 400
+    digest = hashlib.sha256()
+    for chunk in iter(lambda: zip_file.stream.read(64 * 1024), b''):
+        digest.update(chunk)
+    zip_file.stream.seek(0)
 
-        analyzer = SmartContractAnalyzer(api_key=api_key)
-        analysis_results = {}
-        
-        for filename, code in solidity_files.items():
-            try:
-                result = analyzer.analyze_contract(contract_code=code, selected_eips=eips)
-                analysis_results[filename] = {
-                    'oz_modules': result.get('oz_modules', 'Unable to parse imports'),
-                    'compliance': result.get('compliance', {}),
-                }
-            except Exception as e:
-                analysis_results[filename] = {'error': f'Error analyzing file: {str(e)}'}
+    try:
+        with metrics.span('zip_extraction'):
+            solidity_files, context_files, report = load_solidity_files(zip_file, upload_limits)
+    except zipfile.BadZipFile:
+        return None, (jsonify({'error': 'The uploaded file is not a valid ZIP archive.'}), 400)
+
+    if not solidity_files:
+        message = 'No Solidity (.sol) files found in the uploaded ZIP.'
+        if context_files:
+            message = f'Only vendored dependency files ({len(context_files)}) were found in the uploaded ZIP.'
+        return None, (jsonify({'error': message}), 400)
+
+    return {
+        'files': solidity_files,
+        'context_files': context_files,
+        'report': report,
+        'eips': eips,
+        'project_id': request.form.get('project_id') or None,
+        'sha256': digest.hexdigest()
+    }, None
+
+def plan_incremental(upload, analyzer):
+    """
+    For uploads with a project_id, decide which files can reuse their results from the
+    project's manifest. Returns (plan, files to analyze, context files); the plan is None
+    without a project_id. Reused files stay available as context for inheritance resolution.
+    """
+    if not upload['project_id']:
+        return None, upload['files'], upload['context_files']
+
+    with metrics.span('manifest_planning'):
+        plan = manifests.plan(upload['project_id'], upload['files'], upload['context_files'],
+                              upload['eips'], manifest_version(analyzer))
+    to_analyze = {path: code for path, code in upload['files'].items() if path in plan.recompute}
+    reused = {path: code for path, code in upload['files'].items() if path not in plan.recompute}
+    return plan, to_analyze, {**upload['context_files'], **reused}
+
+def save_incremental(upload, analyzer, plan, results):
+    """Record this upload and its results as the project's new manifest."""
+    manifests.save(upload['project_id'], upload['files'], upload['context_files'], results,
+                   manifest_version(analyzer), invalidated=plan.invalidated)
+
+def save_report(eips, results):
+    """Store `results` as a downloadable report and return its id."""
+    artifact = report_store.create(eips)
+    try:
+        for filename, result in results.items():
+            artifact.add(filename, result)
+        errors = sum(1 for result in results.values() if 'error' in result)
+        artifact.finish({'total': len(results), 'completed': len(results), 'errors': errors})
+    finally:
+        artifact.discard()
+    return artifact.id
+
+def report_links(report_id):
+    """Download URLs of a stored report, one per export format."""
+    return {
+        'id': report_id,
+        'downloads': {fmt: url_for('download_report', report_id=report_id, format=fmt) for fmt in REPORT_FORMATS}
+    }
+
+def manifest_version(analyzer):
+    """Stored results are only reused while the model and prompts stay the same."""
+    return f"{analyzer.model}:{analyzer.prompt_version}"
+
+def wants_timings():
+    """True when the request asks for a per-stage timing breakdown (`timings=1`)."""
+    return request.values.get('timings', '').lower() in ('1', 'true', 'yes')
+
+def wants_token_stream():
+    """True when /analyze/stream should forward the model's answers as they are generated (`stream_tokens=1`)."""
+    return request.values.get('stream_tokens', '').lower() in ('1', 'true', 'yes')
 
-        return jsonify({
+# Analyze route to process the uploaded ZIP file
+@app.route('/analyze', methods=['POST'])
+def analyze():
+    try:
+        with metrics.track_timings() as timings:
+            upload, error = parse_analysis_upload()
+            if error:
+                return error
+
+            analyzer = make_analyzer()
+
+            def run_analysis():
+                engine = AnalysisEngine(analyzer, max_workers=analysis_max_workers)
+                plan, files, context_files = plan_incremental(upload, analyzer)
+                computed = engine.run(files, upload['eips'], context_files=context_files)
+
+                outcome = {'data': {
+                    filename: computed[filename] if filename in computed else plan.reused[filename]
+                    for filename in upload['files']
+                }}
+                if plan is not None:
+                    save_incremental(upload, analyzer, plan, outcome['data'])
+                    outcome['incremental'] = plan.summary(upload['project_id'])
+                outcome['report_id'] = save_report(upload['eips'], outcome['data'])
+                return outcome
+
+            # The same ZIP with the same EIPs (and project) uploaded concurrently is analyzed once
+            upload_key = json.dumps([upload['sha256'], sorted(upload['eips']), upload['project_id'],
+                                     manifest_version(analyzer)])
+            outcome = upload_flights.do(upload_key, run_analysis)
+
+        # The outcome is shared by every coalesced caller, so it is read but never modified
+        report_id = outcome.get('report_id')
+        response = {
             'message': 'Analysis completed successfully!',
-            'data': analysis_results
-        })
+            'ingest': upload['report'].summary(),
+            **{key: value for key, value in outcome.items() if key != 'report_id'}
+        }
+        if report_id:
+            response['report'] = report_links(report_id)
+        if wants_timings():
+            response['timings'] = timings.summary()
+        return jsonify(response)
+
+    except Exception as e:
+        logger.exception("Analysis failed")
+        return jsonify({'error': str(e)}), 500
+
+# Download a stored analysis report, converted to the requested format while it is sent
+@app.route('/reports/<report_id>', methods=['GET'])
+def download_report(report_id):
+    fmt = request.args.get('format', 'jsonl')
+    if fmt not in REPORT_FORMATS:
+        return jsonify({'error': f"Unknown format. Use one of: {', '.join(REPORT_FORMATS)}."}), 400
+    meta = report_store.load(report_id)
+    if meta is None:
+        return jsonify({'error': 'Report not found or expired.'}), 404
+
+    options = {}
+    headers = {}
+    if fmt == 'html':
+        try:
+            page = max(1, int(request.args.get('page', '1')))
+        except ValueError:
+            return jsonify({'error': 'Invalid page number.'}), 400
+        options = {
+            'page': page,
+            'page_size': report_page_size,
+            'total': meta['files'],
+            'page_url': lambda number: url_for('download_report', report_id=report_id, format='html', page=number)
+        }
+    else:
+        extension = REPORT_FORMATS[fmt].extension
+        headers['Content-Disposition'] = f'attachment; filename="compliance-report-{report_id[:8]}.{extension}"'
+
+    return Response(
+        stream_with_context(iter_report(report_store.results(report_id), fmt, eips=meta['eips'],
+                                        summary=meta.get('summary'), **options)),
+        mimetype=REPORT_FORMATS[fmt].mimetype,
+        headers=headers
+    )
+
+# Streaming variant of /analyze: one NDJSON event per file, in completion order
+@app.route('/analyze/stream', methods=['POST'])
+def analyze_stream():
+    try:
+        timings = metrics.RequestTimings()
+        with metrics.track_timings(timings):
+            upload, error = parse_analysis_upload()
+        if error:
+            return error
+
+        return Response(
+            stream_with_context(analyze_files_stream(
+                upload['files'], upload['eips'],
+                context_files=upload['context_files'], ingest_report=upload['report'],
+                timings=timings, include_timings=wants_timings(), upload=upload,
+                stream_tokens=wants_token_stream()
+            )),
+            mimetype='application/x-ndjson',
+            headers={
+                'Cache-Control': 'no-cache',
+                # Stop nginx-style proxies from buffering the stream
+                'X-Accel-Buffering': 'no'
+            }
+        )
 
     except Exception as e:
-        print(f"Error: {e}")
+        logger.exception("Streaming analysis failed")
         return jsonify({'error': str(e)}), 500
 
 @app.route('/solidityscan', methods=['POST'])
 def solidityscan():
     """
-    Perform SolidityScan analysis using the API.
+    Queue a SolidityScan project scan and return its job id immediately.
+    Poll GET /solidityscan/<job_id> for status and results.
     """
     try:
         # Get parameters from request
@@ -179,9 +505,14 @@ def solidityscan():
         provider = request.form.get('provider', 'github')
         project_name = request.form.get('project_name')
         skip_file_paths = request.form.get('skip_file_paths', '[]')
+        # Optional commit the branch is known to point at (otherwise resolved with git ls-remote)
+        commit_sha = request.form.get('commit_sha') or None
+        force = request.form.get('force', '').lower() in ('1', 'true', 'yes', 'on')
 
         if not project_url:
             return jsonify({'error': 'Project URL is required.'}), 400
+        if not is_allowed_project_url(project_url, solidityscan_git_hosts):
+            return jsonify({'error': f"Project URL must be an https URL on one of: {', '.join(solidityscan_git_hosts)}."}), 400
 
         # Convert skip_file_paths to list if it's a JSON string
         if isinstance(skip_file_paths, str):
@@ -190,85 +521,220 @@ def solidityscan():
             except json.JSONDecodeError:
                 skip_file_paths = []
 
-        # Run the scan using the API
-        results = scanner.scan_project(
-            project_url=project_url,
-            project_branch=project_branch,
-            skip_file_paths=skip_file_paths,
-            provider=provider,
-            project_name=project_name
-        )
-        
-        if results.get('status') == 'error':
-            return jsonify({
-                'status': 'error',
-                'message': results.get('message', 'SolidityScan analysis failed'),
-                'error_details': results
-            }), 500
-            
-        # Handle successful scan, including duplicate project cases
+        params = {
+            'project_url': project_url,
+            'project_branch': project_branch,
+            'skip_file_paths': skip_file_paths,
+            'provider': provider,
+            'project_name': project_name
+        }
+        if scan_results is not None:
+            params.update({'commit_sha': commit_sha, 'force': force})
+        elif force:
+            params['rescan'] = True
+        job = scan_jobs.submit(params, token=request.form.get('solidityscan_token') or None)
+
         return jsonify({
-            'status': 'success',
-            'message': 'SolidityScan analysis completed successfully!',
-            'results': results
-        })
+            'status': 'queued',
+            'message': 'SolidityScan analysis queued.',
+            'job_id': job['job_id'],
+            'status_url': url_for('solidityscan_status', job_id=job['job_id'])
+        }), 202
 
     except Exception as e:
-        print(f"Error during SolidityScan analysis: {str(e)}")
+        logger.exception("Error during SolidityScan analysis")
         return jsonify({
             'status': 'error',
             'message': str(e)
         }), 500
 
-def analyze_files_stream(solidity_files, eips):
-    """Generator function to analyze files and stream progress."""
-    analyzer = SmartContractAnalyzer(api_key)
-    total_files = len(solidity_files)
-    analyzed_count = 0
-
-    yield '{"progress": [\n'
-
-    for idx, (filename, code) in enumerate(solidity_files.items()):
-        analyzed_count += 1
-        try:
-            print(f"Analyzing file: {filename}")
-            result = analyzer.analyze_contract(contract_code=code, selected_eips=eips)
-            print(f"Result for {filename}: {result}")
-
-            progress = int((analyzed_count / total_files) * 100)
-            yield json.dumps({
-                "file": filename,
-                "progress": progress,
-                "oz_modules": result.get("oz_modules", "Unable to parse imports"),
-                "compliance": result.get("compliance", {})
-            })
-
-            if idx < total_files - 1:
-                yield ',\n'
+@app.route('/solidityscan/<job_id>', methods=['GET'])
+def solidityscan_status(job_id):
+    """
+    Report the status of a queued SolidityScan job and its results once finished.
+    """
+    job = scan_jobs.get(job_id)
+    if job is None:
+        return jsonify({'status': 'error', 'message': 'Unknown scan job.'}), 404
+
+    response = {
+        'job_id': job_id,
+        'job_status': job['status'],
+        'created_at': job['created_at'],
+        'updated_at': job['updated_at']
+    }
+
+    if job['status'] in (QUEUED, RUNNING):
+        response.update({'status': job['status'], 'message': 'SolidityScan analysis in progress.'})
+    elif job['status'] == FAILED:
+        results = job['result'] or {}
+        response.update({
+            'status': 'error',
+            'message': results.get('message') or job['error'] or 'SolidityScan analysis failed',
+            'error_details': results
+        })
+    else:
+        # Handle successful scan, including duplicate project cases
+        response.update({
+            'status': 'success',
+            'message': 'SolidityScan analysis completed successfully!',
+            'results': job['result']
+        })
+        if job['result'] and 'cache' in job['result']:
+            # Whether the findings are cached, for which commit, and how old they are
+            response['cache'] = job['result']['cache']
+    return jsonify(response)
 
-        except Exception as e:
-            print(f"Error analyzing {filename}: {e}")
+@app.route('/solidityscan/blocks', methods=['POST'])
+def solidityscan_blocks():
+    """
+    Scan deployed contracts in bulk. Targets come from the `targets` field or an uploaded
+    `targetsFile`, as CSV lines of address,chain[,platform] or a JSON list; results stream
+    back as NDJSON, one event per address as it completes.
+    """
+    upload = request.files.get('targetsFile')
+    text = upload.read().decode('utf-8', errors='replace') if upload else request.form.get('targets', '')
+    targets, invalid = parse_targets(text, request.form.get('platform') or 'etherscan')
+    if not targets:
+        return jsonify({'status': 'error', 'message': 'No valid targets given.', 'invalid': invalid}), 400
+    if len(targets) > block_scan_max_targets:
+        return jsonify({
+            'status': 'error',
+            'message': f'At most {block_scan_max_targets} addresses can be scanned per request.'
+        }), 400
+
+    token = request.form.get('solidityscan_token') or scanner.token
+    force = request.form.get('force', '').lower() in ('1', 'true', 'yes', 'on')
+
+    def events():
+        started = time.time()
+        completed = errors = cached = 0
+        yield json.dumps({'event': 'start', 'total': len(targets), 'invalid': invalid}) + '\n'
+        for result in block_scanner.scan_many(targets, token, force=force):
+            completed += 1
+            errors += result['status'] == 'error'
+            cached += bool(result.get('cached'))
             yield json.dumps({
-                "file": filename,
-                "progress": int((analyzed_count / total_files) * 100),
-                "error": f"Error analyzing file: {str(e)}"
-            })
-
-    yield '\n]}'
+                'event': 'result',
+                'completed': completed,
+                'total': len(targets),
+                'progress': int(completed / len(targets) * 100),
+                **result
+            }) + '\n'
+        yield json.dumps({
+            'event': 'summary',
+            'total': len(targets),
+            'completed': completed,
+            'errors': errors,
+            'cached': cached,
+            'elapsed_seconds': round(time.time() - started, 3)
+        }) + '\n'
+
+    return Response(
+        stream_with_context(events()),
+        mimetype='application/x-ndjson',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+def analyze_files_stream(solidity_files, eips, context_files=None, ingest_report=None,
+                         timings=None, include_timings=False, upload=None, stream_tokens=False):
+    """
+    Generator that analyzes files concurrently and yields one NDJSON line per event:
+    a "start" event, a "result" event per file as soon as it finishes, "heartbeat"
+    events while waiting, and a final "summary" event (with the stage `timings`
+    breakdown when `include_timings` is set). When the `upload` carries a project_id,
+    files reusable from the project's manifest are sent first with `"reused": true`.
+    With `stream_tokens`, "token" events carry the model's answer for a file's EIPs
+    while it is being generated. A "provisional" event carries the verdicts of a similar,
+    previously analyzed contract for a file that is still waiting on the LLM.
+    """
+    with metrics.track_timings(timings) as timings:
+        yield from _analysis_events(solidity_files, eips, context_files, ingest_report,
+                                    timings if include_timings else None, upload, stream_tokens)
 
-def extract_solidity_files(zip_file):
-    """Extract Solidity (.sol) files from the uploaded ZIP file."""
+def _analysis_events(solidity_files, eips, context_files, ingest_report, timings, upload, stream_tokens=False):
+    analyzer = make_analyzer()
+    engine = AnalysisEngine(analyzer, max_workers=analysis_max_workers)
+    total_files = len(solidity_files)
+    analyzed_count = 0
+    error_count = 0
+    started = time.time()
+
+    plan = None
+    if upload is not None:
+        plan, solidity_files, context_files = plan_incremental(upload, analyzer)
+
+    start_event = {"event": "start", "total": total_files, "eips": eips}
+    if ingest_report is not None:
+        start_event["ingest"] = ingest_report.summary()
+    if plan is not None:
+        start_event["incremental"] = plan.summary(upload['project_id'])
+    yield json.dumps(start_event) + '\n'
+
+    def result_event(filename, result, **extra):
+        return json.dumps({
+            "event": "result",
+            "file": filename,
+            "completed": analyzed_count,
+            "total": total_files,
+            "progress": int((analyzed_count / total_files) * 100),
+            **extra,
+            **result
+        }) + '\n'
+
+    # Results are recorded as they stream so the whole run can be downloaded afterwards
+    artifact = report_store.create(eips)
     try:
-        solidity_files = {}
-        with zipfile.ZipFile(zip_file, 'r') as zip_ref:
-            for file in zip_ref.namelist():
-                if file.endswith('.sol'):
-                    with zip_ref.open(file) as f:
-                        solidity_files[file] = f.read().decode('utf-8')
-        return solidity_files
-    except Exception as e:
-        print(f"Error extracting files: {e}")
-        return {}
+        results = {}
+        for filename, result in (plan.reused.items() if plan is not None else ()):
+            analyzed_count += 1
+            results[filename] = result
+            artifact.add(filename, result)
+            yield result_event(filename, result, reused=True)
+
+        for item in engine.iter_results(solidity_files, eips, context_files=context_files,
+                                        heartbeat_interval=stream_heartbeat_seconds, stream=stream_tokens,
+                                        provisional=True):
+            if item is None:
+                yield json.dumps({"event": "heartbeat", "completed": analyzed_count, "total": total_files}) + '\n'
+                continue
+            if isinstance(item, TokenDelta):
+                yield json.dumps({"event": "token", "file": item.filename, "eips": item.eips, "text": item.text}) + '\n'
+                continue
+            if isinstance(item, Provisional):
+                yield json.dumps({"event": "provisional", "file": item.filename, "compliance": item.compliance,
+                                  "similar": item.similar}) + '\n'
+                continue
+
+            filename, result = item
+            analyzed_count += 1
+            # Only kept for the project manifest, so plain uploads stream in constant memory
+            if plan is not None:
+                results[filename] = result
+            if 'error' in result:
+                error_count += 1
+
+            artifact.add(filename, result)
+            yield result_event(filename, result)
+
+        if plan is not None:
+            save_incremental(upload, analyzer, plan, results)
+
+        summary = {
+            "event": "summary",
+            "total": total_files,
+            "completed": analyzed_count,
+            "errors": error_count,
+            "elapsed_seconds": round(time.time() - started, 3)
+        }
+        if timings is not None:
+            summary["timings"] = timings.summary()
+        artifact.finish({key: value for key, value in summary.items() if key != "event"})
+        summary["report"] = report_links(artifact.id)
+        yield json.dumps(summary) + '\n'
+    finally:
+        # Unfinished when the client disconnected or the analysis failed
+        artifact.discard()
 
 if __name__ == '__main__':
     app.run(debug=True)
\ No newline at end of file
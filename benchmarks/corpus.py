@@ -0,0 +1,181 @@
+import io
+import random
+import zipfile
+from typing import Dict
+
+# Synthetic stand-ins for an installed OpenZeppelin tree, used as vendored context
+VENDORED_LIBRARIES = {
+    'token/ERC20/ERC20.sol': 'ERC20',
+    'token/ERC20/IERC20.sol': 'IERC20',
+    'token/ERC721/ERC721.sol': 'ERC721',
+    'token/ERC721/IERC721.sol': 'IERC721',
+    'token/ERC1155/ERC1155.sol': 'ERC1155',
+    'token/ERC1155/IERC1155.sol': 'IERC1155',
+    'access/Ownable.sol': 'Ownable',
+    'utils/Context.sol': 'Context',
+    'utils/Strings.sol': 'Strings',
+    'utils/math/Math.sol': 'Math',
+}
+
+_HEADER = """// SPDX-License-Identifier: MIT
+pragma solidity ^0.8.20;
+"""
+
+
+def _filler(rng: random.Random, name: str, count: int) -> str:
+    """
+    Internal helpers with comments and bodies, which the prompt minimizer is expected to strip.
+    """
+    parts = []
+    for i in range(count):
+        parts.append(f"""
+    /**
+     * @dev Internal bookkeeping helper #{i} of {name}. Kept verbose on purpose so the
+     * corpus has realistic comment and body weight.
+     */
+    function _helper{i}(uint256 value) internal pure returns (uint256) {{
+        uint256 acc = value;
+        for (uint256 j = 0; j < {rng.randint(2, 9)}; j++) {{
+            acc = (acc * {rng.randint(3, 97)} + j) % {rng.randint(1000, 99999)};
+        }}
+        return acc;
+    }}
+""")
+    return ''.join(parts)
+
+
+def oz_token(rng: random.Random, index: int) -> str:
+    """
+    Inherits an OpenZeppelin standard; the static classifier can decide it without an LLM call.
+    """
+    standard, path = rng.choice([
+        ('ERC20', 'token/ERC20/ERC20.sol'),
+        ('ERC721', 'token/ERC721/ERC721.sol'),
+        ('ERC1155', 'token/ERC1155/ERC1155.sol'),
+    ])
+    args = {'ERC20': '"Token", "TKN"', 'ERC721': '"Collectible", "NFT"', 'ERC1155': '"ipfs://x/{id}"'}[standard]
+    return f"""{_HEADER}
+import "@openzeppelin/contracts/{path}";
+import "@openzeppelin/contracts/access/Ownable.sol";
+
+contract Token{index} is {standard}, Ownable {{
+    uint256 public cap = {rng.randint(1, 10 ** 6)} ether;
+
+    constructor() {standard}({args}) Ownable(msg.sender) {{}}
+
+    function bump(uint256 value) external onlyOwner returns (uint256) {{
+        return _helper0(value);
+    }}
+{_filler(rng, f'Token{index}', rng.randint(2, 6))}}}
+"""
+
+
+def handrolled_token(rng: random.Random, index: int) -> str:
+    """
+    Implements ERC20 by hand without imports; only the LLM can judge it.
+    """
+    return f"""{_HEADER}
+contract Ledger{index} {{
+    mapping(address => uint256) public balanceOf;
+    mapping(address => mapping(address => uint256)) public allowance;
+    uint256 public totalSupply;
+
+    event Transfer(address indexed from, address indexed to, uint256 value);
+    event Approval(address indexed owner, address indexed spender, uint256 value);
+
+    function transfer(address to, uint256 value) external returns (bool) {{
+        balanceOf[msg.sender] -= value;
+        balanceOf[to] += value;
+        emit Transfer(msg.sender, to, value);
+        return true;
+    }}
+
+    function approve(address spender, uint256 value) external returns (bool) {{
+        allowance[msg.sender][spender] = value;
+        emit Approval(msg.sender, spender, value);
+        return true;
+    }}
+
+    function transferFrom(address from, address to, uint256 value) external returns (bool) {{
+        allowance[from][msg.sender] -= value;
+        balanceOf[from] -= value;
+        balanceOf[to] += value;
+        emit Transfer(from, to, value);
+        return true;
+    }}
+{_filler(rng, f'Ledger{index}', rng.randint(2, 8))}}}
+"""
+
+
+def integration(rng: random.Random, index: int) -> str:
+    """
+    Interacts with ERC20 tokens without implementing the standard.
+    """
+    return f"""{_HEADER}
+import "@openzeppelin/contracts/token/ERC20/IERC20.sol";
+
+contract Vault{index} {{
+    address public asset;
+    mapping(address => uint256) public deposits;
+
+    constructor(address asset_) {{
+        asset = asset_;
+    }}
+
+    function deposit(uint256 amount) external {{
+        IERC20(asset).transferFrom(msg.sender, address(this), amount);
+        deposits[msg.sender] += amount;
+    }}
+{_filler(rng, f'Vault{index}', rng.randint(1, 5))}}}
+"""
+
+
+def vendored_library(name: str) -> str:
+    if name.startswith('I') and name[1:2].isupper():
+        return f"""{_HEADER}
+interface {name} {{
+    function name() external view returns (string memory);
+}}
+"""
+    internals = ''.join(f"""
+    // Library internals, padded towards the size of the real file
+    function _internal{i}(uint256 a, uint256 b) internal pure returns (uint256) {{
+        return a * {i + 1} + b;
+    }}
+""" for i in range(40))
+    return f"""{_HEADER}
+abstract contract {name} {{
+    function name() public view virtual returns (string memory) {{
+        return "{name}";
+    }}
+{internals}}}
+"""
+
+
+def generate_files(count: int, vendored: bool = False, seed: int = 0) -> Dict[str, str]:
+    """
+    Build `count` project contracts (40% OpenZeppelin tokens, 40% hand-rolled, 20% integrations),
+    plus a node_modules OpenZeppelin tree when `vendored` is set.
+    """
+    rng = random.Random(seed)
+    files = {}
+    for index in range(count):
+        roll = rng.random()
+        if roll < 0.4:
+            files[f'contracts/tokens/Token{index}.sol'] = oz_token(rng, index)
+        elif roll < 0.8:
+            files[f'contracts/ledgers/Ledger{index}.sol'] = handrolled_token(rng, index)
+        else:
+            files[f'contracts/vaults/Vault{index}.sol'] = integration(rng, index)
+    if vendored:
+        for path, name in VENDORED_LIBRARIES.items():
+            files[f'node_modules/@openzeppelin/contracts/{path}'] = vendored_library(name)
+    return files
+
+
+def build_zip(count: int, vendored: bool = False, seed: int = 0) -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for path, code in generate_files(count, vendored, seed).items():
+            archive.writestr(path, code)
+    return buffer.getvalue()
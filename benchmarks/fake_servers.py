@@ -0,0 +1,255 @@
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Tuple
+
+
+class FaultProfile:
+    """
+    Latency and failure injection shared by the fake servers.
+    """
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0,
+                 rate_limit_rate: float = 0.0, retry_after: float = 1.0, seed: int = None):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def delay(self) -> float:
+        with self._lock:
+            return max(0.0, self.latency + self._random.uniform(-self.jitter, self.jitter))
+
+    def fault(self) -> int:
+        """
+        Return 429 or 500 when a fault should be injected, otherwise 0.
+        """
+        with self._lock:
+            roll = self._random.random()
+        if roll < self.rate_limit_rate:
+            return 429
+        if roll < self.rate_limit_rate + self.error_rate:
+            return 500
+        return 0
+
+
+class FakeServer:
+    """
+    Threaded local HTTP server; subclasses implement `handle(path, payload)`.
+    """
+
+    def __init__(self, faults: FaultProfile = None, host: str = '127.0.0.1', port: int = 0):
+        self.faults = faults or FaultProfile()
+        self.calls = Counter()
+        self.statuses = Counter()
+        self._lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                body = self.rfile.read(length) if length else b''
+                try:
+                    payload = json.loads(body or b'{}')
+                except ValueError:
+                    payload = {}
+                status, response, headers = server.dispatch(self.path, payload)
+                # Pre-encoded bodies (e.g. server-sent events) are sent as they are
+                data = response if isinstance(response, bytes) else json.dumps(response).encode('utf-8')
+                self.send_response(status)
+                if 'Content-Type' not in headers:
+                    self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer((host, port), Handler)
+        self._httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> 'FakeServer':
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def dispatch(self, path: str, payload: Dict) -> Tuple[int, Dict, Dict]:
+        time.sleep(self.faults.delay() * self.latency_factor(payload))
+        fault = self.faults.fault()
+        with self._lock:
+            self.calls[path] += 1
+            self.statuses[fault or 200] += 1
+        if fault == 429:
+            return 429, {"error": {"message": "Rate limit reached", "type": "rate_limit_error"}}, {
+                'Retry-After': str(self.faults.retry_after)
+            }
+        if fault:
+            return 500, {"error": {"message": "Injected server error", "type": "server_error"}}, {}
+        return self.handle(path, payload)
+
+    def handle(self, path: str, payload: Dict) -> Tuple[int, Dict, Dict]:
+        raise NotImplementedError
+
+    def latency_factor(self, payload: Dict) -> float:
+        return 1.0
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'calls': sum(self.calls.values()),
+                'calls_by_path': dict(self.calls),
+                'statuses': {str(status): count for status, count in self.statuses.items()},
+            }
+
+
+class FakeOpenAIServer(FakeServer):
+    """
+    Stand-in for POST /v1/chat/completions. A contract "complies" with a standard when its
+    source mentions `is ERC<n>` or declares the standard's hallmark functions by hand; batch
+    (JSON) prompts get a JSON answer, with a confidence when asked for one (low for about a
+    third of the hand-rolled implementations).
+    Requests with `stream: true` get the answer as server-sent chunks. Models listed in
+    `fast_models` answer in a quarter of the configured latency.
+    """
+
+    FAST_MODEL_LATENCY_FACTOR = 0.25
+    HALLMARKS = {
+        'ERC20': ('transfer', 'transferFrom', 'approve'),
+        'ERC721': ('ownerOf', 'safeTransferFrom'),
+        'ERC1155': ('balanceOfBatch', 'safeBatchTransferFrom'),
+    }
+
+    def __init__(self, faults: FaultProfile = None, fast_models=(), **kwargs):
+        super().__init__(faults, **kwargs)
+        self.fast_models = set(fast_models)
+
+    def latency_factor(self, payload: Dict) -> float:
+        return self.FAST_MODEL_LATENCY_FACTOR if payload.get('model') in self.fast_models else 1.0
+
+    def handle(self, path: str, payload: Dict) -> Tuple[int, Dict, Dict]:
+        if not path.rstrip('/').endswith('/chat/completions'):
+            return 404, {"error": {"message": f"Unknown path {path}"}}, {}
+
+        prompt = payload.get('messages', [{}])[-1].get('content', '')
+        if 'JSON only' in prompt:
+            match = re.search(r'each of these standards: ([^.\n]+)\.', prompt)
+            eips = [eip.strip() for eip in match.group(1).split(',')] if match else []
+            results = [
+                {"eip": eip, "verdict": "complies" if self._complies(prompt, eip) else "does_not_comply",
+                 "reasoning": "Synthetic benchmark answer."}
+                for eip in eips
+            ]
+            if '"confidence"' in prompt:
+                unsure = hashlib.sha1(self._code(prompt).encode('utf-8')).digest()[0] < 86
+                for result in results:
+                    hand_rolled = self._implements(prompt, result["eip"]) and not self._inherits(prompt, result["eip"])
+                    result["confidence"] = 0.55 if hand_rolled and unsure else 0.95
+            content = json.dumps({"results": results})
+        else:
+            match = re.search(r'carefully for (\w+) compliance', prompt)
+            eip = match.group(1) if match else 'ERC20'
+            content = ("Verdict: Complies. The contract inherits the standard." if self._complies(prompt, eip)
+                       else "Verdict: Does not comply. Reason: The standard is not inherited.")
+
+        if payload.get('stream'):
+            return 200, self._event_stream(content, payload.get('model', 'gpt-4')), {
+                'Content-Type': 'text/event-stream'
+            }
+
+        prompt_tokens = len(prompt) // 4
+        completion_tokens = len(content) // 4
+        return 200, {
+            "id": "chatcmpl-benchmark",
+            "object": "chat.completion",
+            "model": payload.get('model', 'gpt-4'),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        }, {}
+
+    @staticmethod
+    def _event_stream(content: str, model: str, chunk_size: int = 4) -> bytes:
+        events = []
+        for start in range(0, len(content), chunk_size):
+            events.append({
+                "id": "chatcmpl-benchmark",
+                "object": "chat.completion.chunk",
+                "model": model,
+                "choices": [{"index": 0, "delta": {"content": content[start:start + chunk_size]},
+                             "finish_reason": None}],
+            })
+        events.append({"id": "chatcmpl-benchmark", "object": "chat.completion.chunk", "model": model,
+                       "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]})
+        lines = [f"data: {json.dumps(event)}\n\n" for event in events] + ["data: [DONE]\n\n"]
+        return ''.join(lines).encode('utf-8')
+
+    def _complies(self, prompt: str, eip: str) -> bool:
+        return self._inherits(prompt, eip) or self._implements(prompt, eip)
+
+    def _inherits(self, prompt: str, eip: str) -> bool:
+        return re.search(rf'\bis\b[^{{;]*\b{re.escape(eip)}\b', self._code(prompt)) is not None
+
+    def _implements(self, prompt: str, eip: str) -> bool:
+        names = self.HALLMARKS.get(eip, ())
+        code = self._code(prompt)
+        return bool(names) and all(re.search(rf'\bfunction\s+{name}\b', code) for name in names)
+
+    @staticmethod
+    def _code(prompt: str) -> str:
+        code = prompt.split('Contract code:', 1)[-1]
+        return re.split(r'Respond with JSON|Provide your analysis', code)[0]
+
+
+class FakeSolidityScanServer(FakeServer):
+    """
+    Stand-in for the SolidityScan private API (project and block scans).
+    """
+
+    def handle(self, path: str, payload: Dict) -> Tuple[int, Dict, Dict]:
+        if path.rstrip('/').endswith('/api-project-scan'):
+            return 200, {
+                "status": "success",
+                "project_url": payload.get('project_url'),
+                "project_branch": payload.get('project_branch'),
+                "issues": [],
+            }, {}
+        if path.rstrip('/').endswith('/api-block-scan'):
+            return 200, {
+                "status": "success",
+                "contract_address": payload.get('contract_address'),
+                "contract_chain": payload.get('contract_chain'),
+                "contract_platform": payload.get('contract_platform'),
+                "issues": [],
+            }, {}
+        return 404, {"status": "failed", "message": f"Unknown path {path}"}, {}
@@ -0,0 +1,288 @@
+"""
+Benchmark /analyze, the analysis engine, SolidityScan job submission and bulk block scans against local fake
+OpenAI and SolidityScan servers, and write throughput, latency percentiles, peak RSS and
+API-call counts as JSON.
+
+    python -m benchmarks.run --sizes 10,100,1000 --latency 0.2 --output benchmark.json
+"""
+import argparse
+import io
+import json
+import math
+import os
+import resource
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List
+
+from benchmarks.corpus import build_zip, generate_files
+from benchmarks.fake_servers import FakeOpenAIServer, FakeSolidityScanServer, FaultProfile
+
+DEFAULT_EIPS = ['ERC20', 'ERC721', 'ERC1155']
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """
+    Nearest-rank percentile; 0.0 for no samples.
+    """
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(pct / 100.0 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def peak_rss_mb() -> float:
+    """
+    High-water resident set size of this process (ru_maxrss is KiB on Linux, bytes on macOS).
+    """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+class Measurement:
+    """
+    Collects latencies for one benchmark case plus API-call deltas from the fake servers.
+    """
+
+    def __init__(self, name: str, servers: Dict[str, 'FakeServer'], **params):
+        self.name = name
+        self.params = params
+        self.servers = servers
+        self.latencies: List[float] = []
+        self.items = 0
+        self.errors = 0
+
+    def __enter__(self):
+        self._calls = {name: server.stats()['calls'] for name, server in self.servers.items()}
+        self._rss = peak_rss_mb()
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.elapsed = time.perf_counter() - self._started
+
+    def result(self) -> Dict:
+        return {
+            'case': self.name,
+            **self.params,
+            'items': self.items,
+            'errors': self.errors,
+            'elapsed_seconds': round(self.elapsed, 3),
+            'throughput_per_second': round(self.items / self.elapsed, 2) if self.elapsed else 0.0,
+            'latency_seconds': {
+                'p50': round(percentile(self.latencies, 50), 4),
+                'p95': round(percentile(self.latencies, 95), 4),
+                'p99': round(percentile(self.latencies, 99), 4),
+                'max': round(max(self.latencies, default=0.0), 4),
+            },
+            'peak_rss_mb': peak_rss_mb(),
+            'rss_growth_mb': round(peak_rss_mb() - self._rss, 1),
+            'api_calls': {
+                name: server.stats()['calls'] - self._calls[name] for name, server in self.servers.items()
+            },
+        }
+
+
+def bench_analyze_endpoint(client, servers, size: int, vendored: bool, eips: List[str], repeat: int) -> Dict:
+    """
+    POST the same synthetic ZIP to /analyze `repeat` times; latency is per request, items are files.
+    """
+    archive = build_zip(size, vendored)
+    with Measurement('analyze_endpoint', servers, files=size, vendored=vendored, eips=len(eips),
+                     zip_bytes=len(archive)) as m:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            response = client.post('/analyze', data={
+                'zipFile': (io.BytesIO(archive), 'corpus.zip'),
+                'eips': json.dumps(eips),
+            }, content_type='multipart/form-data')
+            m.latencies.append(time.perf_counter() - started)
+            body = response.get_json(silent=True) or {}
+            results = body.get('data', {})
+            m.items += len(results)
+            m.errors += 0 if response.status_code == 200 else 1
+            m.errors += sum(1 for result in results.values() if _has_error(result))
+    return m.result()
+
+
+def bench_engine(make_analyzer: Callable, servers, size: int, vendored: bool, eips: List[str]) -> Dict:
+    """
+    Drive AnalysisEngine directly; latency is the time until each file's result is ready.
+    """
+    from analyzer.engine import AnalysisEngine
+
+    files = generate_files(size, vendored)
+    context = {path: code for path, code in files.items() if path.startswith('node_modules/')}
+    project = {path: code for path, code in files.items() if path not in context}
+    engine = AnalysisEngine(make_analyzer())
+    with Measurement('engine', servers, files=size, vendored=vendored, eips=len(eips)) as m:
+        started = time.perf_counter()
+        for event in engine.iter_results(project, eips, context_files=context):
+            if event is None:
+                continue
+            _, result = event
+            m.latencies.append(time.perf_counter() - started)
+            m.items += 1
+            m.errors += 1 if _has_error(result) else 0
+    return m.result()
+
+
+def bench_solidityscan(client, servers, jobs: int, poll_interval: float = 0.05, timeout: float = 300.0) -> Dict:
+    """
+    Queue `jobs` project scans and poll them to completion; latency is submit-to-finished per job.
+    """
+    with Measurement('solidityscan', servers, jobs=jobs) as m:
+        pending = {}
+        for index in range(jobs):
+            response = client.post('/solidityscan', data={
+                'project_url': f'https://github.com/benchmark/project-{index}',
+                'project_branch': 'main',
+            })
+            body = response.get_json(silent=True) or {}
+            if response.status_code != 202:
+                m.errors += 1
+                continue
+            pending[body['status_url']] = time.perf_counter()
+
+        deadline = time.perf_counter() + timeout
+        while pending and time.perf_counter() < deadline:
+            for url, submitted in list(pending.items()):
+                body = client.get(url).get_json(silent=True) or {}
+                if body.get('job_status') in ('queued', 'running'):
+                    continue
+                m.latencies.append(time.perf_counter() - submitted)
+                m.items += 1
+                m.errors += 0 if body.get('status') == 'success' else 1
+                del pending[url]
+            time.sleep(poll_interval)
+        m.errors += len(pending)
+    return m.result()
+
+
+def bench_block_scan(client, servers, targets: int) -> Dict:
+    """
+    Stream one bulk block scan of `targets` addresses; latency is time to each address's result.
+    """
+    lines = [f'0x{index:040x},mainnet,etherscan' for index in range(targets)]
+    with Measurement('block_scan', servers, targets=targets) as m:
+        started = time.perf_counter()
+        response = client.post('/solidityscan/blocks', data={'targets': '\n'.join(lines), 'force': '1'})
+        for line in response.response:
+            event = json.loads(line)
+            if event.get('event') != 'result':
+                continue
+            m.latencies.append(time.perf_counter() - started)
+            m.items += 1
+            m.errors += event['status'] == 'error'
+    return m.result()
+
+
+def _has_error(result: Dict) -> bool:
+    if 'error' in result:
+        return True
+    return any(str(verdict).startswith('❌ Error') for verdict in result.get('compliance', {}).values())
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default='10,100,1000', help='comma-separated corpus sizes (files per ZIP)')
+    parser.add_argument('--vendored', choices=['no', 'yes', 'both'], default='both',
+                        help='include a node_modules OpenZeppelin tree in the corpus')
+    parser.add_argument('--eips', default=','.join(DEFAULT_EIPS))
+    parser.add_argument('--repeat', type=int, default=3, help='/analyze requests per corpus')
+    parser.add_argument('--scan-jobs', type=int, default=20, help='SolidityScan jobs to queue (0 to skip)')
+    parser.add_argument('--block-targets', type=int, default=200, help='addresses per bulk block scan (0 to skip)')
+    parser.add_argument('--cases', default='analyze_endpoint,engine,solidityscan,block_scan')
+    parser.add_argument('--latency', type=float, default=0.2, help='mean fake API latency in seconds')
+    parser.add_argument('--jitter', type=float, default=0.05)
+    parser.add_argument('--error-rate', type=float, default=0.0, help='fraction of fake calls failing with 500')
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0, help='fraction of fake calls returning 429')
+    parser.add_argument('--retry-after', type=float, default=0.5, help='Retry-After sent with injected 429s')
+    parser.add_argument('--cache', action='store_true', help='keep the verdict cache enabled (off by default)')
+    parser.add_argument('--first-pass-model', default='',
+                        help='cheaper model asked before gpt-4; the fake server answers it 4x faster')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='write JSON here instead of stdout')
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> Dict:
+    args = parse_args(argv)
+    sizes = [int(size) for size in args.sizes.split(',') if size]
+    eips = [eip.strip() for eip in args.eips.split(',') if eip.strip()]
+    cases = set(args.cases.split(','))
+    vendored_options = {'no': [False], 'yes': [True], 'both': [False, True]}[args.vendored]
+
+    faults = dict(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+                  rate_limit_rate=args.rate_limit_rate, retry_after=args.retry_after)
+    openai_server = FakeOpenAIServer(FaultProfile(seed=args.seed, **faults),
+                                     fast_models=[args.first_pass_model] if args.first_pass_model else []).start()
+    scan_server = FakeSolidityScanServer(FaultProfile(seed=args.seed + 1, **faults)).start()
+    servers = {'openai': openai_server, 'solidityscan': scan_server}
+    workdir = tempfile.mkdtemp(prefix='compliantelligent-bench-')
+
+    # app.py reads its configuration at import time, so the environment is set up first
+    os.environ.update({
+        'OPENAI_API_KEY': 'sk-benchmark',
+        'OPENAI_API_BASE': f'{openai_server.url}/v1',
+        'SOLIDITYSCAN_TOKEN': 'benchmark-token',
+        'SOLIDITYSCAN_BASE_URL': f'{scan_server.url}/private',
+        'SCAN_JOBS_PATH': os.path.join(workdir, 'scan_jobs.sqlite3'),
+        'BLOCK_SCAN_CACHE_PATH': os.path.join(workdir, 'block_scans.sqlite3'),
+        # Synthetic project URLs cannot be resolved with git ls-remote
+        'SOLIDITYSCAN_CACHE_ENABLED': '0',
+        'VERDICT_CACHE_PATH': os.path.join(workdir, 'verdicts.sqlite3'),
+        'VERDICT_CACHE_ENABLED': '1' if args.cache else '0',
+        'ANALYSIS_FIRST_PASS_MODEL': args.first_pass_model,
+    })
+    import openai
+    openai.api_base = os.environ['OPENAI_API_BASE']
+    import app as webapp
+
+    client = webapp.app.test_client()
+    results = []
+    try:
+        for size in sizes:
+            for vendored in vendored_options:
+                if 'analyze_endpoint' in cases:
+                    results.append(bench_analyze_endpoint(client, servers, size, vendored, eips, args.repeat))
+                if 'engine' in cases:
+                    results.append(bench_engine(webapp.make_analyzer, servers, size, vendored, eips))
+        if 'solidityscan' in cases and args.scan_jobs:
+            results.append(bench_solidityscan(client, servers, args.scan_jobs))
+        if 'block_scan' in cases and args.block_targets:
+            results.append(bench_block_scan(client, servers, args.block_targets))
+    finally:
+        openai_server.stop()
+        scan_server.stop()
+
+    report = {
+        'config': {
+            'sizes': sizes,
+            'eips': eips,
+            'repeat': args.repeat,
+            'faults': faults,
+            'cache': args.cache,
+            'analysis_max_workers': webapp.analysis_max_workers,
+            'batch_eips': webapp.analysis_batch_eips,
+            'prompt_minimize': webapp.prompt_minimize,
+            'first_pass_model': webapp.analysis_first_pass_model or None,
+        },
+        'results': results,
+        'api_calls_total': {name: server.stats() for name, server in servers.items()},
+        'cascade': webapp.make_analyzer().cascade_stats(),
+        'peak_rss_mb': peak_rss_mb(),
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+    return report
+
+
+if __name__ == '__main__':
+    main()
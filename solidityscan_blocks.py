@@ -0,0 +1,219 @@
+import csv
+import io
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import requests
+
+from analyzer import metrics
+from solidityscan_http import SolidityScanHTTPClient, get_shared_http_client
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BLOCK_CACHE_PATH = os.path.join('.cache', 'block_scans.sqlite3')
+DEFAULT_BLOCK_SCAN_PATH = '/api-block-scan/'
+DEFAULT_PLATFORM = 'etherscan'
+# Deployed bytecode does not change, but proxies can be upgraded behind the same address
+DEFAULT_BLOCK_CACHE_TTL_SECONDS = 7 * 24 * 60 * 60
+DEFAULT_MAX_WORKERS = 16
+
+_ADDRESS_RE = re.compile(r'^0x[0-9a-fA-F]{40}$')
+
+BLOCK_SCANS = metrics.REGISTRY.register(metrics.Counter(
+    'compliantelligent_block_scans_total', 'On-chain contract scans by outcome.', ('outcome',)
+))
+
+
+@dataclass(frozen=True)
+class BlockTarget:
+    address: str
+    chain: str
+    platform: str = DEFAULT_PLATFORM
+
+    def key(self) -> Tuple[str, str]:
+        return self.chain, self.address
+
+
+def parse_targets(text: str, default_platform: str = DEFAULT_PLATFORM) -> Tuple[List[BlockTarget], List[str]]:
+    """
+    Read (address, chain[, platform]) targets from CSV text, one per line (an `address,...`
+    header, blank lines and `#` comments are skipped), or from a JSON list of objects with those
+    keys. Returns the valid, de-duplicated targets and one message per rejected entry.
+    """
+    text = (text or '').strip()
+    if text.startswith('['):
+        try:
+            rows = [[item.get('address', ''), item.get('chain', ''), item.get('platform', '')]
+                    for item in json.loads(text)]
+        except (ValueError, AttributeError) as e:
+            return [], [f'Invalid JSON target list: {e}']
+    else:
+        rows = list(csv.reader(io.StringIO(text)))
+
+    targets: Dict[Tuple[str, str], BlockTarget] = {}
+    errors = []
+    for line, row in enumerate(rows, start=1):
+        cells = [str(cell).strip() for cell in row]
+        if not any(cells) or cells[0].startswith('#') or cells[0].lower() == 'address':
+            continue
+        address = cells[0]
+        chain = cells[1].lower() if len(cells) > 1 else ''
+        platform = (cells[2].lower() if len(cells) > 2 else '') or default_platform
+        if not _ADDRESS_RE.match(address):
+            errors.append(f'Entry {line}: "{address}" is not a contract address')
+            continue
+        if not chain:
+            errors.append(f'Entry {line}: chain is required for {address}')
+            continue
+        target = BlockTarget(address.lower(), chain, platform)
+        targets.setdefault(target.key(), target)
+    return list(targets.values()), errors
+
+
+class BlockScanStore:
+    """
+    SQLite cache of successful block scan results per (chain, address).
+    """
+
+    def __init__(self, path: str = DEFAULT_BLOCK_CACHE_PATH, ttl_seconds: float = DEFAULT_BLOCK_CACHE_TTL_SECONDS):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS block_scans ("
+            "chain TEXT NOT NULL, address TEXT NOT NULL, platform TEXT NOT NULL, "
+            "result TEXT NOT NULL, scanned_at REAL NOT NULL, PRIMARY KEY (chain, address))"
+        )
+        self._db.commit()
+
+    def get(self, target: BlockTarget) -> Optional[Dict[str, Any]]:
+        """
+        Return {'result', 'scanned_at'} if `target` was scanned within the TTL, else None.
+        """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT result, scanned_at FROM block_scans WHERE chain = ? AND address = ? AND scanned_at > ?",
+                (target.chain, target.address, time.time() - self.ttl_seconds)
+            ).fetchone()
+        if row is None:
+            return None
+        return {'result': json.loads(row[0]), 'scanned_at': row[1]}
+
+    def put(self, target: BlockTarget, result: Dict[str, Any]) -> None:
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO block_scans (chain, address, platform, result, scanned_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (target.chain, target.address, target.platform, json.dumps(result), time.time())
+            )
+            self._db.commit()
+
+
+class BlockScanner:
+    """
+    Scan deployed contracts through SolidityScan's block-scan endpoint, many at a time.
+
+    Requests go through the shared SolidityScan HTTP client (keep-alive pool, per-host limit,
+    retries with backoff, circuit breaker); successful results are cached per (chain, address)
+    in `store`.
+    """
+
+    def __init__(self, base_url: str = None, store: BlockScanStore = None,
+                 max_workers: int = DEFAULT_MAX_WORKERS, http: SolidityScanHTTPClient = None):
+        self.base_url = (base_url or os.getenv('SOLIDITYSCAN_BASE_URL', 'https://api.solidityscan.com/private'))
+        self.path = os.getenv('SOLIDITYSCAN_BLOCK_SCAN_PATH', DEFAULT_BLOCK_SCAN_PATH)
+        self.store = store
+        self.max_workers = max_workers
+        self.http = http or get_shared_http_client()
+
+    def scan(self, target: BlockTarget, token: str, force: bool = False) -> Dict[str, Any]:
+        """
+        Scan one contract (or return its cached result) as a per-address result event.
+        """
+        started = time.perf_counter()
+        event = {'address': target.address, 'chain': target.chain, 'platform': target.platform}
+
+        cached = self.store.get(target) if self.store is not None and not force else None
+        if cached is not None:
+            BLOCK_SCANS.inc(outcome='cached')
+            return {**event, 'status': 'success', 'cached': True, 'scanned_at': cached['scanned_at'],
+                    'result': cached['result'], 'elapsed_seconds': round(time.perf_counter() - started, 3)}
+
+        response = self._post(token, {
+            'contract_address': target.address,
+            'contract_chain': target.chain,
+            'contract_platform': target.platform,
+        })
+        event.update({'cached': False, 'elapsed_seconds': round(time.perf_counter() - started, 3)})
+        if response.get('status') == 'error':
+            BLOCK_SCANS.inc(outcome='error')
+            return {**event, 'status': 'error', 'message': response.get('message'),
+                    'error_type': response.get('error_type')}
+
+        BLOCK_SCANS.inc(outcome='scanned')
+        if self.store is not None:
+            self.store.put(target, response)
+        return {**event, 'status': 'success', 'scanned_at': time.time(), 'result': response}
+
+    def scan_many(self, targets: List[BlockTarget], token: str, force: bool = False) -> Iterator[Dict[str, Any]]:
+        """
+        Yield one result event per target in completion order; cached targets come first.
+        Closing the iterator cancels scans that have not started yet.
+        """
+        pending = []
+        for target in targets:
+            cached = self.store.get(target) if self.store is not None and not force else None
+            if cached is None:
+                pending.append(target)
+            else:
+                yield self.scan(target, token)
+
+        if not pending:
+            return
+        executor = ThreadPoolExecutor(max_workers=min(self.max_workers, len(pending)))
+        try:
+            futures = [executor.submit(self.scan, target, token, force) for target in pending]
+            for future in as_completed(futures):
+                yield future.result()
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _post(self, token: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        url = f"{self.base_url.rstrip('/')}{self.path}"
+        headers = {
+            'accept': 'application/json, text/plain, */*',
+            'Authorization': token if token.startswith('Bearer') else f'Bearer {token}',
+            'Content-Type': 'application/json'
+        }
+        try:
+            response = self.http.post(url, json=data, headers=headers, lane='blocks')
+            logger.debug("SolidityScan block scan of %s responded %s: %.2000s",
+                         data['contract_address'], response.status_code, response.text)
+            try:
+                body = response.json() if response.text else {}
+            except ValueError:
+                body = {'message': response.text[:500]}
+            if not isinstance(body, dict):
+                # A list or bare string is not a scan result; keep it as the message
+                body = {'message': str(body)[:500]}
+            if response.status_code != 200:
+                return {
+                    'status': 'error',
+                    'message': body.get('message', f'Request failed with HTTP {response.status_code}'),
+                    'error_type': body.get('type', 'unknown'),
+                }
+            return body
+        except requests.exceptions.RequestException as e:
+            logger.warning("SolidityScan block scan of %s failed: %s", data['contract_address'], e)
+            return {'status': 'error', 'message': str(e), 'error_type': type(e).__name__}
@@ -0,0 +1,234 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import subprocess
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+from urllib.parse import urlsplit
+
+from analyzer import metrics
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SCAN_CACHE_PATH = os.path.join('.cache', 'scan_results.sqlite3')
+# Results whose commit could not be resolved are reused for this long before rescanning
+DEFAULT_UNVERIFIED_MAX_AGE_SECONDS = 24 * 60 * 60
+DEFAULT_LS_REMOTE_TIMEOUT = 15
+# Hosts `git ls-remote` may contact; project URLs elsewhere are never resolved
+DEFAULT_GIT_HOSTS = ('github.com', 'gitlab.com', 'bitbucket.org')
+
+_SHA_RE = re.compile(r'^[0-9a-f]{40}$')
+
+SCAN_CACHE_LOOKUPS = metrics.REGISTRY.register(metrics.Counter(
+    'compliantelligent_solidityscan_cache_total',
+    'SolidityScan requests by whether cached findings were returned or a (re)scan was requested.',
+    ('outcome',)
+))
+
+
+def is_allowed_project_url(project_url: str, hosts: Iterable[str] = DEFAULT_GIT_HOSTS) -> bool:
+    """
+    True for plain `https://` URLs on one of `hosts` (no credentials, port or whitespace), the
+    only project URLs handed to git. Anything else, such as `--upload-pack=...` options,
+    `file://` or local paths, is rejected.
+    """
+    if not project_url or project_url.startswith('-') or any(c.isspace() or ord(c) < 32 for c in project_url):
+        return False
+    try:
+        parts = urlsplit(project_url)
+        port = parts.port
+    except ValueError:
+        return False
+    return (parts.scheme == 'https' and port is None and parts.username is None and parts.password is None
+            and (parts.hostname or '') in {host.lower() for host in hosts})
+
+
+def resolve_commit(project_url: str, branch: str, timeout: float = DEFAULT_LS_REMOTE_TIMEOUT,
+                   allowed_hosts: Iterable[str] = DEFAULT_GIT_HOSTS) -> Optional[str]:
+    """
+    Head commit SHA of `branch` (or tag) in the remote repository via `git ls-remote`, without
+    cloning. Returns None when git is unavailable, the remote is private or unreachable, the
+    URL is not an https URL on `allowed_hosts`, or the ref does not exist. A full SHA passed as
+    `branch` is returned as is.
+    """
+    if _SHA_RE.match(branch or ''):
+        return branch
+    if not is_allowed_project_url(project_url, allowed_hosts):
+        logger.warning("Not resolving commit of disallowed project URL %r", (project_url or '')[:200])
+        return None
+    refs = [f'refs/heads/{branch}', f'refs/tags/{branch}^{{}}', f'refs/tags/{branch}']
+    # Never prompt for credentials from a server process, and only speak https
+    env = {**os.environ, 'GIT_TERMINAL_PROMPT': '0', 'GIT_ASKPASS': 'true', 'GIT_ALLOW_PROTOCOL': 'https'}
+    try:
+        with metrics.span('commit_resolution'):
+            completed = subprocess.run(
+                ['git', 'ls-remote', '--', project_url, *refs],
+                capture_output=True, text=True, timeout=timeout, env=env
+            )
+    except (OSError, subprocess.SubprocessError) as e:
+        logger.info("Could not resolve %s@%s: %s", project_url, branch, e)
+        return None
+    if completed.returncode != 0:
+        logger.info("git ls-remote failed for %s@%s: %s", project_url, branch, completed.stderr.strip()[:200])
+        return None
+
+    found = {}
+    for line in completed.stdout.splitlines():
+        sha, _, ref = line.partition('\t')
+        found[ref.strip()] = sha.strip()
+    for ref in refs:
+        if found.get(ref):
+            return found[ref]
+    return None
+
+
+def scan_key(provider: str, project_url: str, project_branch: str, skip_file_paths: List[str] = None) -> str:
+    """
+    Identity of a scan request apart from the commit: URL case, trailing slashes and `.git`,
+    and the order of skipped paths do not matter.
+    """
+    url = (project_url or '').strip().rstrip('/')
+    if url.endswith('.git'):
+        url = url[:-4]
+    identity = [(provider or 'github').lower(), url.lower(), project_branch or 'main',
+                sorted(set(skip_file_paths or []))]
+    return hashlib.sha256(json.dumps(identity).encode('utf-8')).hexdigest()
+
+
+class ScanResultStore:
+    """
+    SQLite store of successful SolidityScan results per scan key and commit.
+    """
+
+    def __init__(self, path: str = DEFAULT_SCAN_CACHE_PATH):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS scan_results ("
+            "scan_key TEXT NOT NULL, commit_sha TEXT NOT NULL, params TEXT NOT NULL, "
+            "result TEXT NOT NULL, scanned_at REAL NOT NULL, "
+            "PRIMARY KEY (scan_key, commit_sha))"
+        )
+        self._db.commit()
+
+    def latest(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Most recent result for `key` as {'commit_sha', 'result', 'scanned_at'}; `commit_sha`
+        is None when the commit was unknown at scan time.
+        """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT commit_sha, result, scanned_at FROM scan_results WHERE scan_key = ? "
+                "ORDER BY scanned_at DESC LIMIT 1", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        commit_sha, result, scanned_at = row
+        return {'commit_sha': commit_sha or None, 'result': json.loads(result), 'scanned_at': scanned_at}
+
+    def put(self, key: str, commit_sha: Optional[str], params: Dict[str, Any], result: Dict[str, Any]) -> None:
+        """
+        Record `result` as the latest scan of `key`; older commits of the key are dropped.
+        """
+        with self._lock:
+            self._db.execute("DELETE FROM scan_results WHERE scan_key = ?", (key,))
+            self._db.execute(
+                "INSERT INTO scan_results (scan_key, commit_sha, params, result, scanned_at) VALUES (?, ?, ?, ?, ?)",
+                (key, commit_sha or '', json.dumps(params), json.dumps(result), time.time())
+            )
+            self._db.commit()
+
+
+class CachedScanClient:
+    """
+    Wrap a SolidityScan client so a project is only rescanned when its branch moved.
+
+    The branch head is taken from the caller (`commit_sha`) or resolved with `git ls-remote`.
+    Stored findings for the same commit are returned without calling SolidityScan; a different
+    commit or `force=True` asks SolidityScan for a rescan. Every result carries a `cache`
+    object describing where it came from and whether it may be stale.
+    """
+
+    def __init__(self, client: Any, store: ScanResultStore,
+                 resolver: Callable[[str, str], Optional[str]] = resolve_commit,
+                 unverified_max_age: float = DEFAULT_UNVERIFIED_MAX_AGE_SECONDS):
+        """
+        `client` exposes `scan_project(..., rescan=bool)`, e.g. SolidityScanAPI or LocalSolidityScanClient.
+        """
+        self.client = client
+        self.store = store
+        self.resolver = resolver
+        self.unverified_max_age = unverified_max_age
+
+    @property
+    def token(self):
+        return getattr(self.client, 'token', None)
+
+    def scan_project(self, project_url: str, project_branch: str = "main",
+                     skip_file_paths: list = None, provider: str = "github",
+                     project_name: str = None, commit_sha: str = None, force: bool = False) -> Dict[str, Any]:
+        key = scan_key(provider, project_url, project_branch, skip_file_paths)
+        commit_sha = (commit_sha or '').strip().lower() or self.resolver(project_url, project_branch)
+        cached = self.store.latest(key)
+
+        if cached is not None and not force:
+            age = time.time() - cached['scanned_at']
+            if commit_sha and cached['commit_sha'] == commit_sha:
+                return self._from_cache(cached, 'hit', commit_sha, stale=False)
+            if not commit_sha and age < self.unverified_max_age:
+                # Without a commit to compare, recent findings are returned but flagged
+                return self._from_cache(cached, 'unverified', commit_sha, stale=True)
+
+        if force:
+            outcome = 'forced'
+        elif cached is None:
+            outcome = 'miss'
+        else:
+            outcome = 'stale'
+        SCAN_CACHE_LOOKUPS.inc(outcome=outcome)
+        logger.info("SolidityScan %s for %s@%s (commit %s)", outcome, project_url, project_branch,
+                    commit_sha or 'unknown')
+
+        # A known project only needs an explicit rescan if we hold results for it already;
+        # on a cold cache the client still turns duplicate_project into a rescan to get findings
+        result = self.client.scan_project(
+            project_url=project_url, project_branch=project_branch, skip_file_paths=skip_file_paths,
+            provider=provider, project_name=project_name, rescan=force or cached is not None
+        )
+        if result.get('status') != 'error':
+            self.store.put(key, commit_sha, {
+                'provider': provider, 'project_url': project_url, 'project_branch': project_branch,
+                'skip_file_paths': sorted(set(skip_file_paths or [])),
+            }, result)
+
+        result = dict(result)
+        result['cache'] = {
+            'status': outcome,
+            'stale': False if commit_sha else None,
+            'commit_sha': commit_sha,
+            'cached_commit_sha': cached['commit_sha'] if cached else None,
+            'scanned_at': time.time(),
+            'age_seconds': 0.0,
+        }
+        return result
+
+    @staticmethod
+    def _from_cache(cached: Dict[str, Any], status: str, commit_sha: Optional[str], stale: bool) -> Dict[str, Any]:
+        SCAN_CACHE_LOOKUPS.inc(outcome=status)
+        result = dict(cached['result'])
+        result['cache'] = {
+            'status': status,
+            'stale': stale,
+            'commit_sha': commit_sha,
+            'cached_commit_sha': cached['commit_sha'],
+            'scanned_at': cached['scanned_at'],
+            'age_seconds': round(time.time() - cached['scanned_at'], 1),
+        }
+        return result
@@ -0,0 +1,235 @@
+import asyncio
+import logging
+import os
+import random
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from analyzer import metrics
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POOL_SIZE = 16
+DEFAULT_PER_HOST_LIMIT = 8
+DEFAULT_CONNECT_TIMEOUT = 10.0
+# Project scans are answered once SolidityScan finishes, which can take minutes
+DEFAULT_READ_TIMEOUT = 600.0
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_FAILURE_THRESHOLD = 5
+DEFAULT_RESET_TIMEOUT = 30.0
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+RETRY_BASE_DELAY = 0.5
+RETRY_MAX_DELAY = 30.0
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """
+    Raised without contacting the upstream while its circuit breaker is open.
+    """
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker. After `failure_threshold` failures in a row the circuit
+    opens and calls fail fast for `reset_timeout` seconds; then one trial call is let through
+    (half-open) and its outcome closes or re-opens the circuit.
+    """
+
+    def __init__(self, failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+                 reset_timeout: float = DEFAULT_RESET_TIMEOUT):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self.state = HALF_OPEN
+                self._trial_running = False
+            if self.state == CLOSED:
+                return True
+            if self.state == HALF_OPEN and not self._trial_running:
+                self._trial_running = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = CLOSED
+            self._failures = 0
+            self._trial_running = False
+
+    def abandon(self) -> None:
+        """
+        Release a trial call that ended without an upstream outcome (e.g. a local error), so
+        the next call can try again instead of the circuit staying open.
+        """
+        with self._lock:
+            self._trial_running = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._trial_running = False
+            if self.state == HALF_OPEN or self._failures >= self.failure_threshold:
+                if self.state != OPEN:
+                    logger.warning("SolidityScan circuit opened after %d consecutive failures", self._failures)
+                self.state = OPEN
+                self._opened_at = time.monotonic()
+
+    def retry_in(self) -> float:
+        with self._lock:
+            return max(0.0, self.reset_timeout - (time.monotonic() - self._opened_at))
+
+
+class SolidityScanHTTPClient:
+    """
+    Pooled HTTP client shared by every SolidityScan caller.
+
+    One keep-alive session with `pool_size` connections per host, at most `per_host_limit`
+    requests in flight per host and `lane` (so slow project scans cannot hold every slot that
+    block scans need), separate connect and read timeouts, and retries of connection
+    errors and 429/5xx answers only, after the server's Retry-After or a jittered exponential
+    backoff. A per-host circuit breaker fails calls fast while the upstream keeps failing.
+    """
+
+    def __init__(self, pool_size: int = DEFAULT_POOL_SIZE, per_host_limit: int = DEFAULT_PER_HOST_LIMIT,
+                 connect_timeout: float = DEFAULT_CONNECT_TIMEOUT, read_timeout: float = DEFAULT_READ_TIMEOUT,
+                 max_retries: int = DEFAULT_MAX_RETRIES, failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+                 reset_timeout: float = DEFAULT_RESET_TIMEOUT):
+        self.per_host_limit = per_host_limit
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.retries = 0
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._slots: Dict[Tuple[str, str], threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+        self.session = requests.Session()
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def post(self, url: str, json: Any = None, headers: Dict[str, str] = None,
+             timeout: Tuple[float, float] = None, lane: str = 'default') -> requests.Response:
+        """
+        POST and return the final response; 4xx answers other than 429 are returned without
+        retrying. Raises requests exceptions (including CircuitOpenError) when no response arrives.
+        """
+        slots, breaker = self._host(url, lane)
+        attempt = 0
+        while True:
+            if not breaker.allow():
+                metrics.SOLIDITYSCAN_REQUESTS.inc(status='circuit_open')
+                raise CircuitOpenError(
+                    f"SolidityScan is failing; not retrying for another {breaker.retry_in():.0f}s"
+                )
+            delay = None
+            try:
+                with slots, metrics.span('solidityscan_call'):
+                    response = self.session.post(url, json=json, headers=headers, timeout=timeout or self.timeout)
+            except requests.exceptions.ConnectionError:
+                # Covers connect timeouts; read timeouts are not retried since the scan may be running
+                metrics.SOLIDITYSCAN_REQUESTS.inc(status='error')
+                breaker.record_failure()
+                if attempt >= self.max_retries:
+                    raise
+            except requests.exceptions.RequestException:
+                metrics.SOLIDITYSCAN_REQUESTS.inc(status='error')
+                breaker.record_failure()
+                raise
+            except BaseException:
+                # Not an upstream failure, but a half-open trial must not stay claimed forever
+                breaker.abandon()
+                raise
+            else:
+                metrics.SOLIDITYSCAN_REQUESTS.inc(status=response.status_code)
+                if response.status_code >= 500:
+                    breaker.record_failure()
+                else:
+                    breaker.record_success()
+                if response.status_code not in RETRY_STATUSES or attempt >= self.max_retries:
+                    return response
+                delay = _retry_after(response)
+
+            if delay is None:
+                delay = random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * (2 ** attempt)))
+            attempt += 1
+            with self._lock:
+                self.retries += 1
+            logger.info("Retrying SolidityScan request to %s in %.1fs (attempt %d)", urlparse(url).path,
+                        delay, attempt + 1)
+            time.sleep(min(delay, RETRY_MAX_DELAY))
+
+    async def apost(self, url: str, json: Any = None, headers: Dict[str, str] = None,
+                    timeout: Tuple[float, float] = None, lane: str = 'default') -> requests.Response:
+        """
+        Awaitable post(); the request runs on the event loop's default executor so the
+        connection pool, limits and circuit breaker are shared with synchronous callers.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, lambda: self.post(url, json=json, headers=headers, timeout=timeout, lane=lane))
+
+    def circuit_states(self) -> Dict[Tuple[str], int]:
+        """
+        {(host,): 1 if the circuit is open else 0}, for the metrics gauge.
+        """
+        with self._lock:
+            breakers = dict(self._breakers)
+        return {(host,): int(breaker.state == OPEN) for host, breaker in breakers.items()}
+
+    def _host(self, url: str, lane: str) -> Tuple[threading.BoundedSemaphore, CircuitBreaker]:
+        host = urlparse(url).netloc
+        with self._lock:
+            breaker = self._breakers.get(host)
+            if breaker is None:
+                breaker = self._breakers[host] = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+            slots = self._slots.get((host, lane))
+            if slots is None:
+                slots = self._slots[(host, lane)] = threading.BoundedSemaphore(self.per_host_limit)
+        return slots, breaker
+
+
+def _retry_after(response: requests.Response) -> Optional[float]:
+    try:
+        return float(response.headers.get('Retry-After'))
+    except (TypeError, ValueError):
+        return None
+
+
+_shared_http = None
+_shared_http_lock = threading.Lock()
+
+
+def get_shared_http_client() -> SolidityScanHTTPClient:
+    """
+    Process-wide client configured from the SOLIDITYSCAN_* pool, timeout, retry and breaker settings.
+    """
+    global _shared_http
+    with _shared_http_lock:
+        if _shared_http is None:
+            _shared_http = SolidityScanHTTPClient(
+                pool_size=int(os.getenv('SOLIDITYSCAN_POOL_SIZE', str(DEFAULT_POOL_SIZE))),
+                per_host_limit=int(os.getenv('SOLIDITYSCAN_PER_HOST_LIMIT', str(DEFAULT_PER_HOST_LIMIT))),
+                connect_timeout=float(os.getenv('SOLIDITYSCAN_CONNECT_TIMEOUT', str(DEFAULT_CONNECT_TIMEOUT))),
+                read_timeout=float(os.getenv('SOLIDITYSCAN_READ_TIMEOUT', str(DEFAULT_READ_TIMEOUT))),
+                max_retries=int(os.getenv('SOLIDITYSCAN_MAX_RETRIES', str(DEFAULT_MAX_RETRIES))),
+                failure_threshold=int(os.getenv('SOLIDITYSCAN_BREAKER_FAILURES', str(DEFAULT_FAILURE_THRESHOLD))),
+                reset_timeout=float(os.getenv('SOLIDITYSCAN_BREAKER_RESET_SECONDS', str(DEFAULT_RESET_TIMEOUT)))
+            )
+        return _shared_http
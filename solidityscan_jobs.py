@@ -0,0 +1,281 @@
+import hashlib
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+QUEUED = 'queued'
+RUNNING = 'running'
+SUCCEEDED = 'succeeded'
+FAILED = 'failed'
+
+DEFAULT_JOBS_PATH = os.path.join('.cache', 'scan_jobs.sqlite3')
+# Unfinished jobs are owned by the worker process holding their lease; the owner renews it
+# every third of this, and other workers take over the job only once it has expired
+DEFAULT_LEASE_SECONDS = 60
+
+_COLUMNS = "id, token_key, status, params, result, error, created_at, updated_at"
+
+
+def token_key(token: str) -> str:
+    """
+    Stable, non-reversible identifier for a token; raw tokens are never persisted.
+    """
+    return hashlib.sha256(token.encode('utf-8')).hexdigest()[:16]
+
+
+class ScanJobStore:
+    """
+    SQLite-backed persistence for scan jobs so they survive a restart.
+    """
+
+    def __init__(self, path: str = DEFAULT_JOBS_PATH):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS scan_jobs ("
+            "id TEXT PRIMARY KEY, token_key TEXT NOT NULL, status TEXT NOT NULL, "
+            "params TEXT NOT NULL, result TEXT, error TEXT, "
+            "created_at REAL NOT NULL, updated_at REAL NOT NULL, "
+            "worker_id TEXT, lease_expires_at REAL)"
+        )
+        # Stores created before leases existed lack the ownership columns
+        columns = {row[1] for row in self._db.execute("PRAGMA table_info(scan_jobs)")}
+        for column, kind in (('worker_id', 'TEXT'), ('lease_expires_at', 'REAL')):
+            if column not in columns:
+                self._db.execute(f"ALTER TABLE scan_jobs ADD COLUMN {column} {kind}")
+        self._db.execute("CREATE INDEX IF NOT EXISTS scan_jobs_status ON scan_jobs (status)")
+        self._db.commit()
+
+    def create(self, job_id: str, key: str, params: Dict[str, Any], worker_id: str = None,
+               lease_expires_at: float = None) -> None:
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO scan_jobs (id, token_key, status, params, created_at, updated_at, "
+                "worker_id, lease_expires_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (job_id, key, QUEUED, json.dumps(params), now, now, worker_id, lease_expires_at)
+            )
+            self._db.commit()
+
+    def update(self, job_id: str, status: str, result: Dict = None, error: str = None) -> None:
+        with self._lock:
+            self._db.execute(
+                "UPDATE scan_jobs SET status = ?, result = ?, error = ?, updated_at = ? WHERE id = ?",
+                (status, json.dumps(result) if result is not None else None, error, time.time(), job_id)
+            )
+            self._db.commit()
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._db.execute(f"SELECT {_COLUMNS} FROM scan_jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._to_dict(row) if row else None
+
+    def renew(self, worker_id: str, lease_expires_at: float) -> int:
+        """
+        Extend the leases of the unfinished jobs owned by `worker_id`; returns how many there are.
+        """
+        with self._lock:
+            cursor = self._db.execute(
+                "UPDATE scan_jobs SET lease_expires_at = ? WHERE worker_id = ? AND status IN (?, ?)",
+                (lease_expires_at, worker_id, QUEUED, RUNNING)
+            )
+            self._db.commit()
+        return cursor.rowcount
+
+    def claim_expired(self, worker_id: str, now: float, lease_seconds: float) -> List[Dict[str, Any]]:
+        """
+        Take over unfinished jobs whose lease expired (their worker stopped), oldest first, and
+        return them re-queued under `worker_id`. Each row is claimed with one conditional UPDATE,
+        so when several processes recover at once every job goes to exactly one of them.
+        """
+        claimed = []
+        with self._lock:
+            candidates = self._db.execute(
+                f"SELECT {_COLUMNS} FROM scan_jobs WHERE status IN (?, ?) "
+                "AND COALESCE(lease_expires_at, 0) < ? ORDER BY created_at",
+                (QUEUED, RUNNING, now)
+            ).fetchall()
+            for row in candidates:
+                cursor = self._db.execute(
+                    "UPDATE scan_jobs SET status = ?, worker_id = ?, lease_expires_at = ?, updated_at = ? "
+                    "WHERE id = ? AND status IN (?, ?) AND COALESCE(lease_expires_at, 0) < ?",
+                    (QUEUED, worker_id, now + lease_seconds, now, row[0], QUEUED, RUNNING, now)
+                )
+                self._db.commit()
+                if cursor.rowcount == 1:
+                    job = self._to_dict(row)
+                    job['status'] = QUEUED
+                    claimed.append(job)
+        return claimed
+
+    @staticmethod
+    def _to_dict(row) -> Dict[str, Any]:
+        job_id, key, status, params, result, error, created_at, updated_at = row
+        return {
+            'job_id': job_id,
+            'token_key': key,
+            'status': status,
+            'params': json.loads(params),
+            'result': json.loads(result) if result else None,
+            'error': error,
+            'created_at': created_at,
+            'updated_at': updated_at,
+        }
+
+
+class ScanJobQueue:
+    """
+    Run SolidityScan project scans on a worker pool with a per-token concurrency limit.
+
+    Several processes may share one store: each job is leased to the process that accepted it,
+    and another process only resumes it once that lease has expired. Tokens passed to submit()
+    are kept in memory only, so a job submitted with its own token fails when its process stops
+    before the scan finishes; jobs using the default token are resumed.
+    """
+
+    def __init__(self, client_factory: Callable[[str], Any], store: ScanJobStore,
+                 default_token: str, max_workers: int = 4, per_token_limit: int = 2,
+                 lease_seconds: float = DEFAULT_LEASE_SECONDS):
+        """
+        `client_factory(token)` returns an object exposing `scan_project(**params)`, either
+        SolidityScanAPI or a local stand-in such as LocalSolidityScanClient.
+        """
+        self.client_factory = client_factory
+        self.store = store
+        self.default_token = default_token
+        self.per_token_limit = per_token_limit
+        self.lease_seconds = lease_seconds
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._lock = threading.Lock()
+        self._tokens: Dict[str, str] = {token_key(default_token): default_token}
+        self._running: Dict[str, int] = {}
+        self._waiting: Dict[str, deque] = {}
+        self._started = False
+
+    def start(self) -> None:
+        """
+        Resume jobs whose worker stopped and start renewing this worker's leases. Safe to call repeatedly.
+        """
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+
+        self._recover()
+        threading.Thread(target=self._maintain_leases, name='scan-job-leases', daemon=True).start()
+
+    def _recover(self) -> None:
+        for job in self.store.claim_expired(self.worker_id, time.time(), self.lease_seconds):
+            token = self._tokens.get(job['token_key'])
+            if token is None:
+                self.store.update(job['job_id'], FAILED, error="Scan token is not available after restart")
+                continue
+            self._enqueue(job['job_id'], job['token_key'], job['params'])
+
+    def _maintain_leases(self) -> None:
+        while True:
+            time.sleep(self.lease_seconds / 3)
+            try:
+                self.store.renew(self.worker_id, time.time() + self.lease_seconds)
+                self._recover()
+            except Exception:
+                logger.exception("Could not renew scan job leases")
+
+    def submit(self, params: Dict[str, Any], token: str = None) -> Dict[str, Any]:
+        """
+        Persist a new job and schedule it; returns the job record immediately.
+        """
+        self.start()
+        token = token or self.default_token
+        key = token_key(token)
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            self._tokens[key] = token
+        self.store.create(job_id, key, params, self.worker_id, time.time() + self.lease_seconds)
+        self._enqueue(job_id, key, params)
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        self.start()
+        job = self.store.get(job_id)
+        if job is not None:
+            job.pop('token_key', None)
+        return job
+
+    def queue_depth(self) -> int:
+        with self._lock:
+            return sum(len(waiting) for waiting in self._waiting.values())
+
+    def _enqueue(self, job_id: str, key: str, params: Dict[str, Any]) -> None:
+        with self._lock:
+            if self._running.get(key, 0) >= self.per_token_limit:
+                self._waiting.setdefault(key, deque()).append((job_id, params))
+                return
+            self._running[key] = self._running.get(key, 0) + 1
+        self._executor.submit(self._run, job_id, key, params)
+
+    def _run(self, job_id: str, key: str, params: Dict[str, Any]) -> None:
+        try:
+            self.store.update(job_id, RUNNING)
+            client = self.client_factory(self._tokens[key])
+            result = client.scan_project(**params)
+            if result.get('status') == 'error':
+                self.store.update(job_id, FAILED, result=result, error=result.get('message'))
+            else:
+                self.store.update(job_id, SUCCEEDED, result=result)
+        except Exception as e:
+            self.store.update(job_id, FAILED, error=str(e))
+        finally:
+            self._release(key)
+
+    def _release(self, key: str) -> None:
+        with self._lock:
+            waiting = self._waiting.get(key)
+            if not waiting:
+                self._running[key] -= 1
+                return
+            job_id, params = waiting.popleft()
+        # The slot passes straight to the next waiting job of the same token
+        self._executor.submit(self._run, job_id, key, params)
+
+
+class LocalSolidityScanClient:
+    """
+    In-process stand-in for the SolidityScan API, for tests and local development.
+    """
+
+    def __init__(self, token: str = None, delay: float = None, result: Dict[str, Any] = None):
+        self.token = token
+        self.delay = float(os.getenv('SOLIDITYSCAN_LOCAL_DELAY', '1')) if delay is None else delay
+        self.result = result
+        self.calls = 0
+
+    def scan_project(self, project_url: str, project_branch: str = "main",
+                     skip_file_paths: list = None, provider: str = "github",
+                     project_name: str = None, rescan: bool = False) -> Dict[str, Any]:
+        self.calls += 1
+        time.sleep(self.delay)
+        if self.result is not None:
+            return self.result
+        return {
+            "status": "success",
+            "project_url": project_url,
+            "project_branch": project_branch,
+            "provider": provider,
+            "project_name": project_name or "SolidityScan",
+            "issues": [],
+        }
@@ -1,8 +1,10 @@
 import os
-import time
+import logging
 import requests
-import json
 from typing import Dict, Any, Optional
+from solidityscan_http import get_shared_http_client
+
+logger = logging.getLogger(__name__)
 
 class SolidityScanRunner:
     def __init__(self, token: Optional[str] = None):
@@ -10,13 +12,6 @@ class SolidityScanRunner:
         if not self.token:
             raise ValueError("SolidityScan token is required")
         
-        # Debug print token (masked)
-        token_preview = f"{self.token[:10]}...{self.token[-10:]}" if len(self.token) > 20 else "..."
-        print("\nDebug: Token being used:")
-        print(f"Token length: {len(self.token)}")
-        print(f"Token preview: {token_preview}")
-        print(f"Token starts with 'Bearer': {self.token.startswith('Bearer')}")
-        
         # Ensure correct headers exactly matching the curl command
         self.headers = {
             'accept': 'application/json, text/plain, */*',
@@ -30,73 +25,69 @@ class SolidityScanRunner:
             'Content-Type': 'application/json'
         }
         
-        # Debug print full Authorization header
-        auth_header = self.headers['Authorization']
-        auth_preview = f"{auth_header[:15]}...{auth_header[-15:]}"
-        print("\nDebug: Authorization header being used:")
-        print(f"Header length: {len(auth_header)}")
-        print(f"Header preview: {auth_preview}")
-        
-        self.base_url = 'https://api.solidityscan.com/private'
+        self.base_url = os.getenv('SOLIDITYSCAN_BASE_URL', 'https://api.solidityscan.com/private')
+        self.http = get_shared_http_client()
+
+    def _make_request(self, endpoint: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        url = f"{self.base_url}{endpoint}"
+
+        logger.debug("SolidityScan request to %s: %s", url, data)
 
-    def _make_request(self, endpoint: str, data: Dict[str, Any], max_retries: int = 5, retry_delay: int = 15) -> Dict[str, Any]:
+        # Retries with backoff and the circuit breaker live in the shared client
+        try:
+            response = self.http.post(url, json=data, headers=self.headers, lane='projects')
+        except requests.exceptions.RequestException as e:
+            logger.warning("SolidityScan request failed: %s", e)
+            return {
+                "status": "error",
+                "message": f"Request failed: {e}",
+                "error_type": "RequestError"
+            }
+
+        return self._to_result(response)
+
+    async def _amake_request(self, endpoint: str, data: Dict[str, Any]) -> Dict[str, Any]:
         url = f"{self.base_url}{endpoint}"
-        retry_count = 0
-
-        # Debug print request details
-        print("\nDebug: Making request with:")
-        print(f"URL: {url}")
-        print("Headers:")
-        for key, value in self.headers.items():
-            if key == 'Authorization':
-                print(f"{key}: {value[:15]}...{value[-15:]}")
-            else:
-                print(f"{key}: {value}")
-        print(f"Data: {json.dumps(data, indent=2)}")
-
-        while retry_count < max_retries:
-            try:
-                print(f"\nAttempt {retry_count + 1} of {max_retries}")
-                
-                response = requests.post(
-                    url,
-                    headers=self.headers,
-                    data=json.dumps(data),
-                    timeout=600
-                )
-                
-                print(f"Response status code: {response.status_code}")
-                print("Response headers:")
-                print(response.headers)
-                print("Response body:")
-                print(response.text)
-                
-                if response.status_code == 403:
-                    return {
-                        "status": "error",
-                        "message": "Authentication failed. Please check your token.",
-                        "error_type": "AuthError",
-                        "details": response.text
-                    }
-
-                response.raise_for_status()
-                return {
-                    "status": "success",
-                    "data": response.json() if response.text else {},
-                    "raw_response": response.text
-                }
-
-            except requests.exceptions.RequestException as e:
-                print(f"\nRequest failed: {str(e)}")
-                if retry_count < max_retries - 1:
-                    print(f"Waiting {retry_delay} seconds before retry...")
-                    time.sleep(retry_delay)
-                retry_count += 1
+
+        logger.debug("SolidityScan request to %s: %s", url, data)
+
+        try:
+            response = await self.http.apost(url, json=data, headers=self.headers, lane='projects')
+        except requests.exceptions.RequestException as e:
+            logger.warning("SolidityScan request failed: %s", e)
+            return {
+                "status": "error",
+                "message": f"Request failed: {e}",
+                "error_type": "RequestError"
+            }
+
+        return self._to_result(response)
+
+    @staticmethod
+    def _to_result(response: requests.Response) -> Dict[str, Any]:
+        logger.info("SolidityScan responded %s", response.status_code)
+        logger.debug("SolidityScan response body: %.2000s", response.text)
+
+        if response.status_code == 403:
+            return {
+                "status": "error",
+                "message": "Authentication failed. Please check your token.",
+                "error_type": "AuthError",
+                "details": response.text
+            }
+
+        if response.status_code >= 400:
+            return {
+                "status": "error",
+                "message": f"Request failed with HTTP {response.status_code}",
+                "error_type": "RequestError",
+                "details": response.text
+            }
 
         return {
-            "status": "error",
-            "message": f"Request failed after {retry_count} attempts",
-            "error_type": "RequestError"
+            "status": "success",
+            "data": response.json() if response.text else {},
+            "raw_response": response.text
         }
 
     def run_scan(self, project_url: str, project_branch: str = "main", 
@@ -112,6 +103,20 @@ class SolidityScanRunner:
 
         return self._make_request('/api-project-scan/', data)
 
+    async def arun_scan(self, project_url: str, project_branch: str = "main",
+                        skip_file_paths: list = None, provider: str = "github",
+                        project_name: str = None) -> Dict[str, Any]:
+        """Awaitable run_scan(), sharing the same connection pool and circuit breaker."""
+        data = {
+            "provider": provider,
+            "project_name": project_name or "SolidityScan",
+            "project_url": project_url,
+            "project_branch": project_branch,
+            "project_skip_files": skip_file_paths or []
+        }
+
+        return await self._amake_request('/api-project-scan/', data)
+
 
 def run_solidityscan(project_url: str, project_branch: str = "main", **kwargs) -> Dict[str, Any]:
     try:
@@ -6,5 +6,5 @@ load_dotenv()
 
 # Now you can access the variables
 api_key = os.getenv('OPENAI_API_KEY')
-print(f"OPENAI_API_KEY: {api_key}")
+print(f"OPENAI_API_KEY is {'set' if api_key else 'not set'}")
 
@@ -0,0 +1,55 @@
+import threading
+import time
+
+import pytest
+
+
+class FakeClock:
+    """
+    Monotonic clock that only moves when a test advances `now` or a caller sleeps. Sleeps block
+    until `gate` is set, so a test can hold a waiting caller in place.
+    """
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        assert self.gate.wait(5), 'sleep was never released'
+        self.now += seconds
+
+
+@pytest.fixture
+def fake_clock(monkeypatch):
+    """
+    Install a FakeClock as `time.monotonic` (and with `sleep=True`, `time.sleep`) of a module.
+    """
+    def install(module, sleep=False):
+        fake = FakeClock()
+        monkeypatch.setattr(f'{module}.time.monotonic', fake.monotonic)
+        if sleep:
+            monkeypatch.setattr(f'{module}.time.sleep', fake.sleep)
+        return fake
+
+    return install
+
+
+def _wait_until(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, 'timed out'
+        time.sleep(0.005)
+
+
+@pytest.fixture
+def wait_until():
+    """
+    Poll `predicate` until it holds, failing the test after `timeout` seconds.
+    """
+    return _wait_until
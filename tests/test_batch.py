@@ -0,0 +1,130 @@
+import io
+import json
+
+import pytest
+
+from analyzer import batch
+from analyzer.batch import BatchRun, completed_files, main, read_sources
+from analyzer.smart_contract_analyzer import SmartContractAnalyzer
+
+OZ_TOKEN = (
+    'import "@openzeppelin/contracts/token/ERC20/ERC20.sol";\n'
+    'contract Token is ERC20 { constructor() ERC20("Token", "TKN") {} }\n'
+)
+# Implements most of ERC20 by hand, so only the LLM can decide
+HANDWRITTEN = '''
+contract Coin {
+    function totalSupply() external view returns (uint256) {}
+    function balanceOf(address a) external view returns (uint256) {}
+    function transfer(address to, uint256 v) external returns (bool) {}
+    function approve(address s, uint256 v) external returns (bool) {}
+}
+'''
+
+
+class FakeClient:
+    requests = 0
+    retries = 0
+
+
+class FakeAnalyzer:
+    analyze_oz_imports = staticmethod(SmartContractAnalyzer.analyze_oz_imports)
+
+    def __init__(self, verdict='✅ Complies with ERC20', **settings):
+        self.verdict = verdict
+        self.settings = settings
+        self.client = FakeClient()
+        self.checked = []
+
+    def similar_verdicts(self, code, eips):
+        return None
+
+    def check_eip_compliance(self, code, oz_modules, eips, signals=None):
+        self.checked.append(code)
+        return {eip: self.verdict for eip in eips}
+
+    def cascade_stats(self):
+        return None
+
+
+@pytest.fixture
+def project(tmp_path):
+    root = tmp_path / 'project'
+    (root / 'src').mkdir(parents=True)
+    (root / 'src' / 'Token.sol').write_text(OZ_TOKEN)
+    (root / 'src' / 'Coin.sol').write_text(HANDWRITTEN)
+    return str(root)
+
+
+def sweep(analyzer, sources, output_path, done=()):
+    with open(output_path, 'a', encoding='utf-8') as output:
+        return BatchRun(analyzer, ['ERC20'], output, set(done), processes=1, api_concurrency=2).run(sources)
+
+
+def records(output_path):
+    with open(output_path, 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def test_read_sources_merges_manifests(tmp_path):
+    manifest = tmp_path / 'more.txt'
+    manifest.write_text('# comment\n\nrepos/a\n/abs/b\nrepos/a\n')
+    assert read_sources(['x.zip', str(tmp_path / 'repos/a')], [str(manifest)]) == [
+        'x.zip', str(tmp_path / 'repos/a'), '/abs/b'
+    ]
+
+
+def test_static_files_skip_the_llm(project, tmp_path):
+    analyzer = FakeAnalyzer()
+    output = tmp_path / 'sweep.jsonl'
+    summary = sweep(analyzer, [project], output)
+    assert summary['files'] == 2 and summary['static_only'] == 1 and summary['llm_files'] == 1
+    assert analyzer.checked == [HANDWRITTEN]
+    by_file = {record['file']: record for record in records(output)}
+    assert by_file['src/Token.sol']['static_eips'] == ['ERC20']
+    assert by_file['src/Coin.sol']['static_eips'] == []
+
+
+def test_resume_redoes_only_failed_and_missing_files(project, tmp_path):
+    output = tmp_path / 'sweep.jsonl'
+    failed = sweep(FakeAnalyzer(verdict='❌ Error: timeout'), [project], output)
+    assert failed['file_failures'] == 1
+    with open(output, 'a', encoding='utf-8') as f:
+        f.write('{"source": "truncated by a cra')
+
+    done = completed_files(str(output), ['ERC20'])
+    assert {file for _, file, _ in done} == {'src/Token.sol'}
+    assert completed_files(str(output), ['ERC20', 'ERC721']) == set()
+
+    analyzer = FakeAnalyzer()
+    resumed = sweep(analyzer, [project], output, done)
+    assert resumed['resumed'] == 1 and resumed['llm_files'] == 1 and resumed['file_failures'] == 0
+    assert analyzer.checked == [HANDWRITTEN]
+
+
+def test_unreadable_sources_are_recorded(tmp_path):
+    not_a_project = tmp_path / 'notes.txt'
+    not_a_project.write_text('hello')
+    output = tmp_path / 'sweep.jsonl'
+    summary = sweep(FakeAnalyzer(), [str(not_a_project)], output)
+    assert summary['source_failures'] == 1
+    assert records(output) == [{'source': str(not_a_project), 'error': 'Not a directory or ZIP archive.'}]
+
+
+@pytest.mark.parametrize('argument, expected', [(['--min-confidence', '0'], 0.0), ([], 0.5)])
+def test_min_confidence_zero_is_honoured(argument, expected, project, tmp_path, monkeypatch):
+    created = []
+
+    class RecordingAnalyzer(FakeAnalyzer):
+        def __init__(self, **settings):
+            super().__init__(**settings)
+            created.append(self)
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv('ANALYSIS_ESCALATION_CONFIDENCE', '0.5')
+    monkeypatch.setattr(batch, 'SmartContractAnalyzer', RecordingAnalyzer)
+    monkeypatch.setattr('sys.stdout', io.StringIO())
+    code = main([project, '--eips', 'ERC20', '--output', str(tmp_path / 'out.jsonl'),
+                 '--no-cache', '--processes', '1', *argument])
+    assert code == 0
+    assert created[0].settings['min_confidence'] == expected
@@ -0,0 +1,116 @@
+import pytest
+
+from analyzer import keccak
+from analyzer.eip_interfaces import (
+    ConformanceChecker, _digest, canonical_type, event_topic, load_index, selector,
+)
+
+ERC20 = '''
+contract Token {
+    event Transfer(address indexed from, address indexed to, uint256 value);
+    event Approval(address indexed owner, address indexed spender, uint256 value);
+    function totalSupply() external view returns (uint256) {}
+    function balanceOf(address account) external view returns (uint) {}
+    function transfer(address to, uint256 value) external returns (bool) {}
+    function transferFrom(address from, address to, uint256 value) external returns (bool) {}
+    function approve(address spender, uint256 value) external returns (bool) {}
+    function allowance(address owner, address spender) external view returns (uint256) {}
+}
+'''
+MOCK = 'contract Token { function ping() external {} }\n'
+
+
+@pytest.fixture(params=['pure', 'pycryptodome'])
+def keccak_backend(request, monkeypatch):
+    if request.param == 'pure':
+        monkeypatch.setattr(keccak, '_pycryptodome_keccak', None)
+    else:
+        pytest.importorskip('Crypto.Hash.keccak')
+    _digest.cache_clear()
+    yield request.param
+    _digest.cache_clear()
+
+
+def test_selectors_and_topics(keccak_backend):
+    assert keccak.keccak256(b'').hex() == 'c5d2460186f7233c927e7db2dcc703c0e500b653ca82273b7bfad8045d85a470'
+    assert selector('transfer(address,uint256)') == '0xa9059cbb'
+    assert selector('balanceOf(address)') == '0x70a08231'
+    assert event_topic('Transfer(address,address,uint256)') == (
+        '0xddf252ad1be2c89b69c2b068fc378daa952ba7f163c4a11628f55a4df523b3ef'
+    )
+
+
+def test_index_selectors_match_signatures():
+    index = load_index()
+    for name in index.interfaces:
+        for entry in index.functions(name, optional=True):
+            assert entry.selector == selector(entry.signature)
+        for signature, topic in index.events(name).items():
+            assert topic == event_topic(signature)
+
+
+def test_canonical_types():
+    types = {'Side': 'enum', 'Order': 'struct(address,uint,Side)', 'Price': 'uint128'}
+    assert canonical_type('uint') == 'uint256'
+    assert canonical_type('IERC20[]') == 'address[]'
+    assert canonical_type('Side', types) == 'uint8'
+    assert canonical_type('Order[2]', types) == '(address,uint256,uint8)[2]'
+    assert canonical_type('Price', types) == 'uint128'
+
+
+def test_complete_token_complies():
+    report = ConformanceChecker.from_sources({'src/Token.sol': ERC20}).check('src/Token.sol', ['ERC-20'])['ERC-20']
+    assert report['complies']
+    assert report['missing'] == [] and report['missing_events'] == []
+
+
+def test_inherited_functions_and_events_count():
+    base = ERC20.replace('contract Token', 'abstract contract Base')
+    checker = ConformanceChecker.from_sources({
+        'src/Base.sol': base,
+        'src/Token.sol': 'import "./Base.sol";\ncontract Token is Base {}\n',
+    })
+    assert checker.check('src/Token.sol', ['ERC20'])['ERC20']['complies']
+
+
+def test_openzeppelin_base_outside_the_upload_comes_from_the_index():
+    checker = ConformanceChecker.from_sources({
+        'src/Token.sol': 'import "@openzeppelin/contracts/token/ERC20/ERC20.sol";\ncontract Token is ERC20 {}\n',
+    })
+    report = checker.check('src/Token.sol', ['ERC20'])['ERC20']
+    assert report['complies'] and report['unresolved_bases'] == []
+
+
+def test_unresolved_base_is_reported():
+    checker = ConformanceChecker.from_sources({
+        'src/Token.sol': 'import "solmate/tokens/ERC20.sol";\ncontract Token is ERC20 {}\n',
+    })
+    report = checker.check('src/Token.sol', ['ERC20'])['ERC20']
+    assert not report['complies'] and report['unresolved_bases'] == ['ERC20']
+
+
+def test_mismatched_return_and_parameter_types():
+    source = ERC20.replace('function transfer(address to, uint256 value) external returns (bool)',
+                           'function transfer(address to, uint256 value) external')
+    source = source.replace('approve(address spender, uint256 value)', 'approve(address spender, uint128 value)')
+    report = ConformanceChecker.from_sources({'src/Token.sol': source}).check('src/Token.sol', ['ERC20'])['ERC20']
+    assert not report['complies']
+    assert {'expected': 'transfer(address,uint256) returns (bool)',
+            'found': ['transfer(address,uint256)']} in report['mismatched']
+    assert {'expected': 'approve(address,uint256)', 'found': ['approve(address,uint128)']} in report['mismatched']
+    assert report['missing'] == []
+
+
+def test_missing_event_is_reported():
+    source = ERC20.replace('    event Approval(address indexed owner, address indexed spender, uint256 value);\n', '')
+    report = ConformanceChecker.from_sources({'src/Token.sol': source}).check('src/Token.sol', ['ERC20'])['ERC20']
+    assert [event['signature'] for event in report['missing_events']] == ['Approval(address,address,uint256)']
+
+
+@pytest.mark.parametrize('order', [1, -1])
+def test_same_named_contract_in_another_file_is_not_compared(order):
+    files = dict(list({'src/Token.sol': ERC20, 'test/Token.sol': MOCK}.items())[::order])
+    checker = ConformanceChecker.from_sources(files)
+    assert checker.check('src/Token.sol', ['ERC20'])['ERC20']['complies']
+    mock = checker.check('test/Token.sol', ['ERC20'])['ERC20']
+    assert not mock['complies'] and len(mock['missing']) == 6
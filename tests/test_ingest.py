@@ -0,0 +1,105 @@
+import io
+import os
+import zipfile
+
+import pytest
+
+from analyzer.fingerprints import FingerprintIndex, build
+from analyzer.ingest import IngestLimits, load_solidity_directory, load_solidity_files
+
+TOKEN = 'contract Token {}\n'
+FILES = {
+    'src/Token.sol': TOKEN,
+    'src/Copy.sol': TOKEN,
+    'src/Vault.sol': 'contract Vault {}\n',
+    'node_modules/@openzeppelin/contracts/token/ERC20/ERC20.sol': 'contract ERC20 {}\n',
+    'src/._Vault.sol': 'resource fork',
+    '__MACOSX/src/Token.sol': 'resource fork',
+    'README.md': '# not solidity',
+}
+
+
+def as_zip(files):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for path, code in files.items():
+            archive.writestr(path, code)
+    buffer.seek(0)
+    return buffer
+
+
+def as_directory(files, root):
+    for path, code in files.items():
+        target = root / path
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_bytes(code if isinstance(code, bytes) else code.encode('utf-8'))
+    return str(root)
+
+
+@pytest.fixture(params=['zip', 'directory'])
+def load(request, tmp_path):
+    def load(files, limits=None, fingerprints=None):
+        if request.param == 'zip':
+            return load_solidity_files(as_zip(files), limits, fingerprints)
+        return load_solidity_directory(as_directory(files, tmp_path / 'project'), limits, fingerprints)
+    return load
+
+
+def test_splits_project_and_vendored_files_and_skips_metadata(load):
+    project, vendored, report = load(FILES)
+    # Of two identical files only the first seen is kept
+    assert len(project) == 2 and 'src/Vault.sol' in project
+    assert list(vendored) == ['node_modules/@openzeppelin/contracts/token/ERC20/ERC20.sol']
+    assert report.vendored == {'node_modules/@openzeppelin/contracts/token/ERC20/ERC20.sol': 'path'}
+    assert len(report.duplicates) == 1
+    assert report.files == 3 and report.skipped == {}
+
+
+def test_enforces_file_and_upload_limits(load):
+    files = {'a/Big.sol': 'x' * 200, 'b/One.sol': 'contract One {}', 'c/Two.sol': 'contract Two {}'}
+    project, _, report = load(files, IngestLimits(max_file_bytes=100, max_files=1))
+    assert list(project) == ['b/One.sol']
+    assert report.skipped == {'a/Big.sol': 'file too large', 'c/Two.sol': 'upload limit reached'}
+    assert report.truncated
+
+
+def test_rejects_invalid_utf8(load):
+    project, _, report = load({'src/Bad.sol': b'\xff\xfe contract', 'src/Good.sol': TOKEN})
+    assert list(project) == ['src/Good.sol']
+    assert report.skipped == {'src/Bad.sol': 'not valid UTF-8'}
+
+
+def test_zip_rejects_suspicious_compression_ratio():
+    project, _, report = load_solidity_files(as_zip({'src/Bomb.sol': ' ' * 100000}))
+    assert project == {}
+    assert report.skipped == {'src/Bomb.sol': 'suspicious compression ratio'}
+
+
+def test_directory_skips_git_metadata(tmp_path):
+    root = as_directory({'.git/objects/Token.sol': TOKEN, 'src/Vault.sol': 'contract Vault {}\n'}, tmp_path)
+    project, _, _ = load_solidity_directory(root)
+    assert list(project) == ['src/Vault.sol']
+    assert os.path.isdir(os.path.join(root, '.git'))
+
+
+def test_fingerprinted_library_file_is_vendored(load, tmp_path):
+    checkout = tmp_path / 'openzeppelin-contracts'
+    (checkout / 'contracts' / 'token' / 'ERC20').mkdir(parents=True)
+    (checkout / 'contracts' / 'token' / 'ERC20' / 'ERC20.sol').write_text('contract ERC20 {\n}\n')
+    (checkout / 'contracts' / 'package.json').write_text('{"name": "@openzeppelin/contracts", "version": "4.9.6"}')
+    index_path = str(tmp_path / 'oz_fingerprints.json')
+    assert build(str(checkout), path=index_path) == 1
+    index = FingerprintIndex.load(index_path)
+    assert index.releases == ['@openzeppelin/contracts@4.9.6']
+
+    # Copied into the project with CRLF line endings and trailing whitespace
+    copied = 'contract ERC20 {  \r\n}\r\n'
+    project, vendored, report = load({'contracts/ERC20.sol': copied, 'contracts/Token.sol': TOKEN}, fingerprints=index)
+    assert list(project) == ['contracts/Token.sol']
+    assert list(vendored) == ['contracts/ERC20.sol']
+    assert report.vendored == {'contracts/ERC20.sol': 'fingerprint'}
+    assert index.match(copied) == '@openzeppelin/contracts@4.9.6:token/ERC20/ERC20.sol'
+
+
+def test_shipped_index_loads():
+    assert isinstance(FingerprintIndex.load().hashes, dict)
@@ -0,0 +1,105 @@
+import pytest
+
+from analyzer.manifest import ManifestStore, dependents, import_graph
+
+TOKEN = 'pragma solidity ^0.8.0;\ncontract Token {}\n'
+VAULT = 'pragma solidity ^0.8.0;\nimport "./Token.sol";\ncontract Vault {}\n'
+ROUTER = 'pragma solidity ^0.8.0;\nimport "src/Vault.sol";\ncontract Router {}\n'
+OZ_ERC20 = 'pragma solidity ^0.8.0;\ncontract ERC20 {}\n'
+WRAPPED = 'pragma solidity ^0.8.0;\nimport "openzeppelin/token/ERC20.sol";\ncontract Wrapped {}\n'
+
+
+def result(*eips, verdict='✅ Compliant'):
+    return {'compliance': {eip: verdict for eip in eips}}
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ManifestStore(str(tmp_path / 'manifests.sqlite3'))
+
+
+@pytest.fixture
+def files():
+    return {'src/Token.sol': TOKEN, 'src/Vault.sol': VAULT, 'src/Router.sol': ROUTER}
+
+
+def save(store, files, eips=('EIP-20',), version='1', context_files=None):
+    store.save('p', files, context_files or {}, {path: result(*eips) for path in files}, version)
+
+
+def test_import_graph_resolves_relative_and_remapped_paths():
+    files = {
+        'src/Token.sol': TOKEN, 'src/Vault.sol': VAULT, 'src/Router.sol': ROUTER,
+        'lib/openzeppelin/token/ERC20.sol': OZ_ERC20, 'src/Wrapped.sol': WRAPPED,
+    }
+    graph = import_graph(files)
+    assert graph['src/Vault.sol'] == {'src/Token.sol'}
+    assert graph['src/Router.sol'] == {'src/Vault.sol'}
+    assert graph['src/Wrapped.sol'] == {'lib/openzeppelin/token/ERC20.sol'}
+    assert graph['src/Token.sol'] == set()
+    assert dependents(graph, {'src/Token.sol'}) == {'src/Vault.sol', 'src/Router.sol'}
+
+
+def test_unchanged_upload_reuses_everything(store, files):
+    save(store, files)
+    plan = store.plan('p', files, {}, ['EIP-20'], '1')
+    assert plan.recompute == {}
+    assert set(plan.reused) == set(files)
+
+
+def test_changed_file_invalidates_its_transitive_importers(store, files):
+    save(store, files)
+    changed = {**files, 'src/Token.sol': TOKEN + '// fee on transfer\n'}
+    plan = store.plan('p', changed, {}, ['EIP-20'], '1')
+    assert plan.recompute == {
+        'src/Token.sol': 'changed',
+        'src/Vault.sol': 'dependency changed',
+        'src/Router.sol': 'dependency changed',
+    }
+    assert plan.invalidated == {'src/Vault.sol', 'src/Router.sol'}
+
+
+def test_removed_import_invalidates_importers(store, files):
+    save(store, files)
+    remaining = {path: code for path, code in files.items() if path != 'src/Token.sol'}
+    plan = store.plan('p', remaining, {}, ['EIP-20'], '1')
+    assert plan.removed == ['src/Token.sol']
+    assert plan.recompute == {'src/Vault.sol': 'dependency changed', 'src/Router.sol': 'dependency changed'}
+
+
+def test_new_eips_version_and_failures_force_recompute(store, files):
+    store.save('p', files, {}, {
+        'src/Token.sol': result('EIP-20'),
+        'src/Vault.sol': result('EIP-20', verdict='❌ Error: timeout'),
+        'src/Router.sol': {'error': 'failed'},
+    }, '1')
+    plan = store.plan('p', files, {}, ['EIP-20'], '1')
+    assert plan.recompute == {'src/Vault.sol': 'missing verdicts', 'src/Router.sol': 'missing verdicts'}
+
+    assert store.plan('p', files, {}, ['EIP-20', 'EIP-4626'], '1').recompute['src/Token.sol'] == 'missing verdicts'
+    assert store.plan('p', files, {}, ['EIP-20'], '2').recompute['src/Token.sol'] == 'analyzer changed'
+
+
+def test_reused_results_only_carry_selected_eips(store, files):
+    save(store, files, eips=('EIP-20', 'EIP-4626'))
+    plan = store.plan('p', files, {}, ['EIP-4626'], '1')
+    assert plan.reused['src/Vault.sol'] == result('EIP-4626')
+
+
+def test_save_merges_verdicts_of_unchanged_files_but_not_invalidated_ones(store, files):
+    save(store, files, eips=('EIP-20',))
+    store.save('p', files, {}, {path: result('EIP-4626') for path in files}, '1', invalidated={'src/Vault.sol'})
+    stored = store.load('p')
+    assert stored['src/Token.sol']['result'] == result('EIP-20', 'EIP-4626')
+    assert stored['src/Vault.sol']['result'] == result('EIP-4626')
+
+
+def test_context_file_change_invalidates_project_importers(store):
+    context = {'lib/openzeppelin/token/ERC20.sol': OZ_ERC20}
+    files = {'src/Wrapped.sol': WRAPPED}
+    save(store, files, context_files=context)
+    assert store.load('p')['lib/openzeppelin/token/ERC20.sol']['result'] is None
+
+    changed_context = {'lib/openzeppelin/token/ERC20.sol': OZ_ERC20 + '// patched\n'}
+    plan = store.plan('p', files, changed_context, ['EIP-20'], '1')
+    assert plan.recompute == {'src/Wrapped.sol': 'dependency changed'}
@@ -0,0 +1,38 @@
+from analyzer import minimizer
+from analyzer.minimizer import count_tokens, prepare_source
+
+
+def test_unminimizable_source_is_split_within_budget():
+    code = '\n'.join(f'// line {i} ' + 'x' * 40 for i in range(400))
+    prepared = prepare_source(code, token_budget=200)
+    assert len(prepared.chunks) > 1
+    assert all(count_tokens(chunk) <= 200 for chunk in prepared.chunks)
+    assert '\n'.join(prepared.chunks).split('\n') == code.split('\n')
+
+
+def test_single_oversized_line_is_cut():
+    prepared = prepare_source('y' * 10000, token_budget=100)
+    assert all(count_tokens(chunk) <= 100 for chunk in prepared.chunks)
+    assert ''.join(prepared.chunks) == 'y' * 10000
+
+
+def test_cache_is_keyed_by_content_and_bounded(monkeypatch):
+    cache = minimizer._PreparedCache(max_entries=10, max_chars=5000)
+    monkeypatch.setattr(minimizer, '_prepared', cache)
+    prepared = []
+    prepare = minimizer._prepare
+    monkeypatch.setattr(minimizer, '_prepare', lambda *args: prepared.append(args) or prepare(*args))
+
+    code = 'pragma solidity ^0.8.0;\ncontract A { function f() external {} }\n'
+    equal = ''.join(list(code))
+    assert equal == code and equal is not code
+    first = prepare_source(code)
+    assert prepare_source(equal) is first
+    assert len(prepared) == 1
+    prepare_source(code, token_budget=100)
+    assert len(prepared) == 2
+
+    for i in range(50):
+        prepare_source(f'contract C{i} {{ uint256 public value{i} = {"1" * 500}; }}')
+    assert len(cache._entries) <= 10
+    assert cache._chars <= 5000
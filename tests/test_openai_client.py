@@ -0,0 +1,81 @@
+import threading
+
+import openai
+import pytest
+
+from analyzer.openai_client import BACKOFF_RATE_FACTOR, RateLimitedChatClient, TokenBucket
+
+
+@pytest.fixture
+def clock(fake_clock):
+    return fake_clock('analyzer.openai_client', sleep=True)
+
+
+def test_bucket_refills_at_the_configured_rate(clock):
+    bucket = TokenBucket(600)
+    bucket.consume(600, clock.now)
+    assert bucket.time_until(100, clock.now) == pytest.approx(10)
+    assert bucket.time_until(100, clock.now + 10) == 0
+
+
+def test_waiting_head_of_queue_is_not_overtaken(clock, wait_until):
+    client = RateLimitedChatClient(tokens_per_minute=1000)
+    client._acquire(900)
+    order = []
+
+    def acquire(name, tokens):
+        client._acquire(tokens)
+        order.append(name)
+
+    clock.gate.clear()
+    large = threading.Thread(target=acquire, args=('large', 500))
+    large.start()
+    wait_until(lambda: clock.sleeps)
+    # 100 tokens are left: enough for the small request, but the large one is first in line
+    small = threading.Thread(target=acquire, args=('small', 50))
+    small.start()
+    wait_until(lambda: client.queue_depth == 2)
+    assert order == []
+
+    clock.gate.set()
+    large.join(5)
+    small.join(5)
+    assert order == ['large', 'small']
+    assert clock.sleeps[0] == pytest.approx(24)
+
+
+def test_retry_after_pauses_requests_and_lowers_rates(clock, monkeypatch):
+    client = RateLimitedChatClient(requests_per_minute=60, max_retries=2)
+    calls = []
+
+    def create(**kwargs):
+        calls.append(clock.now)
+        if len(calls) == 1:
+            raise openai.error.RateLimitError('slow down', headers={'retry-after': '7'})
+        return {'choices': [{'message': {'content': 'ok'}}], 'usage': {'total_tokens': 3}}
+
+    monkeypatch.setattr(openai.ChatCompletion, 'create', create)
+    response = client.create(model='gpt-4', messages=[{'role': 'user', 'content': 'hi'}])
+
+    assert response['choices'][0]['message']['content'] == 'ok'
+    assert calls[1] - calls[0] == pytest.approx(7)
+    assert client.retries == 1 and client.rate_limited == 1
+    assert client._buckets['requests'].capacity < 60
+    assert client._buckets['requests'].capacity >= 60 * BACKOFF_RATE_FACTOR
+
+
+def test_retry_after_ms_takes_precedence():
+    error = openai.error.RateLimitError('slow down', headers={'retry-after-ms': '250', 'retry-after': '7'})
+    assert RateLimitedChatClient._retry_after(error) == 0.25
+
+
+def test_gives_up_after_max_retries(clock, monkeypatch):
+    client = RateLimitedChatClient(max_retries=1, base_delay=0.5)
+
+    def create(**kwargs):
+        raise openai.error.RateLimitError('slow down')
+
+    monkeypatch.setattr(openai.ChatCompletion, 'create', create)
+    with pytest.raises(openai.error.RateLimitError):
+        client.create(model='gpt-4', messages=[])
+    assert client.retries == 1
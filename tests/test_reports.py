@@ -0,0 +1,216 @@
+import csv
+import io
+import json
+import os
+import time
+from html.parser import HTMLParser
+
+import openai
+import pytest
+
+from analyzer.reports import (
+    CHUNK_CHARS, ERROR_RULE, ReportStore, iter_report, main, read_results, verdict_status, write_report,
+)
+from analyzer.smart_contract_analyzer import SmartContractAnalyzer
+
+EIPS = ['ERC20', 'ERC721']
+RESULTS = [
+    ('src/Token.sol', {
+        'oz_modules': ['ERC20'],
+        'compliance': {
+            'ERC20': '✅ Complies with ERC20',
+            'ERC721': '❌ Does not comply with ERC721. Reason: no ownerOf, approve, or transfer hooks.\nSee "docs".',
+        },
+        'functions': {'ERC721': {'missing': [
+            {'signature': 'ownerOf(uint256)'}, {'signature': 'approve(address,uint256)'},
+        ]}},
+        'solidityscan_results': {'issues': [{'severity': 'Low', 'description': 'Floating pragma'}]},
+    }),
+    ('src/<script>alert(1)</script>.sol', {
+        'oz_modules': [],
+        'compliance': {
+            'ERC20': '❌ Error analyzing ERC20: <b>timeout</b>',
+            'ERC721': '❌ Does not comply with ERC721.',
+        },
+    }),
+    ('src/Broken.sol', {'error': 'Parse failed, "unexpected" token'}),
+]
+
+
+def legacy_generate_report(analysis_results):
+    """
+    SmartContractAnalyzer.generate_report as it was before the report writers.
+    """
+    report = "Smart Contract Analysis Report\n"
+    report += "===========================\n\n"
+
+    for contract_name, data in analysis_results.items():
+        report += f"{contract_name}\n"
+        report += f"- OpenZeppelin Imports: {', '.join(data.get('oz_modules', ['No OpenZeppelin imports found']))}\n"
+        report += "- EIP Compliance:\n"
+        for eip, status in data['compliance'].items():
+            report += f"  - {eip}: {status}\n"
+
+        if "solidityscan_results" in data:
+            report += "- SolidityScan Results:\n"
+            for issue in data["solidityscan_results"].get("issues", []):
+                report += f"  - {issue['severity']}: {issue['description']}\n"
+
+        report += "\n"
+
+    return report
+
+
+def render(fmt, results=RESULTS, **options):
+    out = io.StringIO()
+    count = write_report(results, fmt, out, EIPS, **options)
+    return out.getvalue(), count
+
+
+def test_verdict_status():
+    assert verdict_status('✅ Complies with ERC20') == 'compliant'
+    assert verdict_status('❌ Does not comply with ERC20.') == 'non_compliant'
+    assert verdict_status('❌ Error analyzing ERC20: timeout') == 'error'
+
+
+def test_sarif_is_valid_json_with_one_result_per_failed_check():
+    text, count = render('sarif')
+    log = json.loads(text)
+    assert count == 3
+    assert log['version'] == '2.1.0'
+    run, = log['runs']
+    assert [rule['id'] for rule in run['tool']['driver']['rules']] == ['ERC20', 'ERC721', ERROR_RULE]
+    found = [(r['ruleId'], r['level'], r['locations'][0]['physicalLocation']['artifactLocation']['uri'])
+             for r in run['results']]
+    assert found == [
+        ('ERC721', 'error', 'src/Token.sol'),
+        (ERROR_RULE, 'warning', 'src/<script>alert(1)</script>.sol'),
+        ('ERC721', 'error', 'src/<script>alert(1)</script>.sol'),
+        (ERROR_RULE, 'warning', 'src/Broken.sol'),
+    ]
+    assert run['results'][0]['message']['text'] == RESULTS[0][1]['compliance']['ERC721']
+
+
+def test_sarif_without_results_is_valid():
+    log = json.loads(render('sarif', results=[])[0])
+    assert log['runs'][0]['results'] == []
+
+
+def test_csv_quotes_commas_newlines_and_quotes():
+    text, _ = render('csv')
+    rows = list(csv.reader(io.StringIO(text)))
+    assert rows[0] == ['file', 'eip', 'status', 'verdict', 'missing_functions']
+    assert rows[2] == ['src/Token.sol', 'ERC721', 'non_compliant', RESULTS[0][1]['compliance']['ERC721'],
+                      'ownerOf(uint256);approve(address,uint256)']
+    assert rows[3][2] == 'error'
+    assert rows[-1] == ['src/Broken.sol', '', 'error', 'Parse failed, "unexpected" token', '']
+    assert len(rows) == 1 + 2 + 2 + 1
+
+
+class _Collector(HTMLParser):
+    def __init__(self):
+        super().__init__()
+        self.tags = []
+        self.text = []
+        self.links = []
+
+    def handle_starttag(self, tag, attrs):
+        self.tags.append(tag)
+        if tag == 'a':
+            self.links.append(dict(attrs)['href'])
+
+    def handle_data(self, data):
+        self.text.append(data)
+
+
+def parse_html(text):
+    collector = _Collector()
+    collector.feed(text)
+    return collector
+
+
+def test_html_escapes_file_names_and_verdicts():
+    text, _ = render('html')
+    parsed = parse_html(text)
+    assert 'script' not in parsed.tags and 'b' not in parsed.tags
+    assert 'src/<script>alert(1)</script>.sol' in parsed.text
+    assert '❌ Error analyzing ERC20: <b>timeout</b>' in parsed.text
+    assert text.endswith('</body></html>\n')
+
+
+@pytest.mark.parametrize('page, files, links', [
+    (1, ['src/0.sol', 'src/1.sol'], ['?page=2']),
+    (2, ['src/2.sol', 'src/3.sol'], ['?page=1', '?page=3']),
+    (3, ['src/4.sol'], ['?page=2']),
+])
+def test_html_pages(page, files, links):
+    results = [(f'src/{i}.sol', {'compliance': {'ERC20': '✅ Complies with ERC20'}}) for i in range(5)]
+    text, count = render('html', results=results, page=page, page_size=2, total=5,
+                         page_url=lambda number: f'?page={number}')
+    parsed = parse_html(text)
+    assert count == 5
+    assert [item for item in parsed.text if item.startswith('src/')] == files
+    assert parsed.links == links
+    assert f'page {page} of 3' in text
+
+
+def test_text_report_matches_the_old_generate_report(monkeypatch):
+    results = dict(RESULTS[:2])
+    results['src/Plain.sol'] = {'compliance': {'ERC20': '✅ Complies with ERC20'}}
+    expected = legacy_generate_report(results)
+
+    assert render('text', results=results.items())[0] == expected
+    monkeypatch.setattr(openai, 'api_key', None)
+    analyzer = SmartContractAnalyzer(api_key='test', client=object())
+    assert analyzer.generate_report(results) == expected
+    out = io.StringIO()
+    assert analyzer.generate_report(results, out) is None
+    assert out.getvalue().encode('utf-8') == expected.encode('utf-8')
+
+
+def test_iter_report_streams_the_same_document(monkeypatch):
+    monkeypatch.setattr('analyzer.reports.CHUNK_CHARS', 200)
+    chunks = list(iter_report(RESULTS * 20, 'sarif', EIPS))
+    assert len(chunks) > 1
+    assert ''.join(chunks) == render('sarif', results=RESULTS * 20)[0]
+    assert CHUNK_CHARS > 200
+
+
+def test_report_store_round_trip_and_expiry(tmp_path):
+    store = ReportStore(str(tmp_path), ttl_seconds=60)
+    artifact = store.create(EIPS)
+    for filename, result in RESULTS:
+        artifact.add(filename, result)
+    assert store.load(artifact.id) is None
+    artifact.finish({'completed': 3, 'total': 3, 'errors': 1})
+
+    meta = store.load(artifact.id)
+    assert meta['files'] == 3 and meta['eips'] == EIPS and meta['summary']['errors'] == 1
+    assert list(store.results(artifact.id)) == RESULTS
+
+    assert store.load('../../etc/passwd') is None
+    assert store.load('0' * 32) is None
+
+    expired = ReportStore(str(tmp_path), ttl_seconds=0)
+    time.sleep(0.01)
+    assert expired.load(artifact.id) is None
+    expired.create(EIPS).discard()
+    assert os.listdir(str(tmp_path)) == []
+
+
+def test_discarded_artifact_leaves_nothing(tmp_path):
+    store = ReportStore(str(tmp_path))
+    artifact = store.create(EIPS)
+    artifact.add(*RESULTS[0])
+    artifact.discard()
+    assert os.listdir(str(tmp_path)) == []
+
+
+def test_cli_converts_jsonl_to_sarif(tmp_path):
+    source = tmp_path / 'results.jsonl'
+    write_report(RESULTS, 'jsonl', source.open('w', encoding='utf-8'))
+    assert list(read_results(str(source))) == RESULTS
+    output = tmp_path / 'results.sarif'
+    assert main([str(source), '--format', 'sarif', '--output', str(output)]) == 0
+    log = json.loads(output.read_text(encoding='utf-8'))
+    assert [rule['id'] for rule in log['runs'][0]['tool']['driver']['rules']] == ['ERC20', 'ERC721', ERROR_RULE]
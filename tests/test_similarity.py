@@ -0,0 +1,98 @@
+import pytest
+
+from analyzer.similarity import (
+    MERGE_THRESHOLD, SimilarityIndex, estimated_similarity, minhash, normalized_tokens, structure_key,
+)
+
+VAULT = '''
+pragma solidity ^0.8.0;
+import "@openzeppelin/contracts/access/Ownable.sol";
+
+contract Vault is Ownable {
+    mapping(address => uint256) private deposits;
+    uint256 public constant LIMIT = 1000 ether;
+    event Deposited(address indexed account, uint256 amount);
+
+    function deposit() external payable {
+        require(msg.value <= LIMIT, "too much");
+        deposits[msg.sender] += msg.value;
+        emit Deposited(msg.sender, msg.value);
+    }
+
+    function withdraw(uint256 amount) external {
+        require(deposits[msg.sender] >= amount, "insufficient");
+        deposits[msg.sender] -= amount;
+        payable(msg.sender).transfer(amount);
+    }
+
+    function balanceOf(address account) external view returns (uint256) {
+        return deposits[account];
+    }
+}
+'''
+# Same contract with its name, private state, constants and messages changed
+FORK = (VAULT.replace('contract Vault', 'contract SafeBox').replace('deposits', 'stash')
+        .replace('1000 ether', '5 ether').replace('"too much"', '"cap"'))
+VERDICTS = {'ERC20': '❌ Does not comply with ERC20. Reason: no transfer functions.'}
+SCOPE = 'gpt-4:v1'
+
+
+@pytest.fixture
+def index(tmp_path):
+    return SimilarityIndex(str(tmp_path / 'similarity.sqlite3'))
+
+
+def test_renames_and_constants_do_not_change_the_fingerprint():
+    assert normalized_tokens(FORK) == normalized_tokens(VAULT)
+    assert estimated_similarity(minhash(FORK), minhash(VAULT)) == 1.0
+    assert structure_key(FORK) == structure_key(VAULT)
+    assert minhash('') is None
+
+
+def test_renamed_fork_reuses_verdicts(index):
+    index.add(VAULT, VERDICTS, SCOPE)
+    match = index.query(FORK, ['ERC20', 'ERC721'], SCOPE)
+    assert match.reusable and match.same_structure
+    assert match.verdicts == VERDICTS
+    assert match.summary()['eips'] == ['ERC20']
+
+
+@pytest.mark.parametrize('changed', [
+    VAULT.replace('access/Ownable.sol', 'access/Ownable2Step.sol'),
+    VAULT.replace('contract Vault is Ownable', 'contract Vault is Pausable'),
+    VAULT.replace('returns (uint256) {\n        return deposits', 'returns (uint128) {\n        return deposits'),
+])
+def test_changed_imports_bases_or_abi_only_give_a_provisional_match(index, changed):
+    index.add(VAULT, VERDICTS, SCOPE)
+    match = index.query(changed, ['ERC20'], SCOPE)
+    assert match is not None and match.similarity >= index.provisional_threshold
+    assert not match.same_structure and not match.reusable
+
+
+def test_unrelated_contracts_other_scopes_and_itself_do_not_match(index):
+    index.add(VAULT, VERDICTS, SCOPE)
+    unrelated = 'pragma solidity ^0.8.0;\nlibrary Math { function max(uint a, uint b) internal pure returns (uint) ' \
+                '{ return a >= b ? a : b; } }\n'
+    assert index.query(unrelated, ['ERC20'], SCOPE) is None
+    assert index.query(FORK, ['ERC20'], 'gpt-3.5:v1') is None
+    assert index.query(FORK, ['ERC721'], SCOPE) is None
+    assert index.query(VAULT, ['ERC20'], SCOPE) is None
+
+
+def test_near_identical_contracts_share_one_entry(index):
+    index.add(VAULT, VERDICTS, SCOPE)
+    assert estimated_similarity(minhash(FORK), minhash(VAULT)) >= MERGE_THRESHOLD
+    index.add(FORK, {'ERC721': '❌ Does not comply with ERC721.'}, SCOPE)
+    assert index.size() == 1
+    match = index.query(FORK.replace('"cap"', '"max"'), ['ERC20', 'ERC721'], SCOPE)
+    assert sorted(match.verdicts) == ['ERC20', 'ERC721']
+
+    index.add(VAULT.replace('contract Vault is Ownable', 'contract Vault is Pausable'), VERDICTS, SCOPE)
+    assert index.size() == 2
+
+
+def test_thresholds_are_configurable(tmp_path):
+    strict = SimilarityIndex(str(tmp_path / 'strict.sqlite3'), reuse_threshold=1.01, provisional_threshold=0.5)
+    strict.add(VAULT, VERDICTS, SCOPE)
+    match = strict.query(FORK, ['ERC20'], SCOPE)
+    assert match.same_structure and not match.reusable
@@ -0,0 +1,118 @@
+import threading
+import time
+
+import pytest
+
+from analyzer.singleflight import FLIGHTS, FlightError, SingleFlight, fcntl
+
+
+def run_threads(count, target):
+    threads = [threading.Thread(target=target, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    return threads
+
+
+def joined(scope):
+    return FLIGHTS.value(scope=scope, outcome='coalesced')
+
+
+def test_concurrent_callers_share_one_compute_with_independent_results(wait_until):
+    flights = SingleFlight(scope='test-shared')
+    release = threading.Event()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        release.wait(5)
+        return {'findings': ['reentrancy'], 'report_id': 'r1'}
+
+    results = [None] * 8
+
+    def call(i):
+        results[i] = flights.do('contract', compute)
+
+    threads = run_threads(len(results), call)
+    wait_until(lambda: calls and joined('test-shared') == len(results) - 1)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(calls) == 1
+    assert all(result == {'findings': ['reentrancy'], 'report_id': 'r1'} for result in results)
+    assert len({id(result) for result in results}) == len(results)
+
+    results[0].pop('report_id')
+    results[1]['findings'].append('overflow')
+    assert results[2] == {'findings': ['reentrancy'], 'report_id': 'r1'}
+
+
+def test_joined_caller_gets_the_leaders_exception(wait_until):
+    flights = SingleFlight(scope='test-error')
+    release = threading.Event()
+    errors = [None, None]
+
+    def compute():
+        release.wait(5)
+        raise ValueError('model unavailable')
+
+    def call(i):
+        try:
+            flights.do('contract', compute)
+        except Exception as e:
+            errors[i] = e
+
+    threads = run_threads(2, call)
+    wait_until(lambda: joined('test-error') == 1)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert all(isinstance(e, ValueError) for e in errors)
+    assert 'contract' not in flights._inflight
+
+
+@pytest.mark.skipif(fcntl is None, reason='needs flock')
+def test_error_in_another_process_is_replayed_as_flight_error(tmp_path, wait_until):
+    # Two instances over one directory stand in for two processes; flock on separately
+    # opened files excludes them from each other just the same
+    leader, follower = SingleFlight(str(tmp_path)), SingleFlight(str(tmp_path))
+    started, release = threading.Event(), threading.Event()
+    outcome = {}
+
+    def fail():
+        started.set()
+        release.wait(5)
+        raise ValueError('model unavailable')
+
+    def lead():
+        with pytest.raises(ValueError):
+            leader.do('contract', fail)
+
+    def follow():
+        try:
+            follower.do('contract', lambda: outcome.setdefault('computed', True))
+        except FlightError as e:
+            outcome['error'] = e
+
+    lead_thread = threading.Thread(target=lead)
+    lead_thread.start()
+    started.wait(5)
+    follow_thread = threading.Thread(target=follow)
+    follow_thread.start()
+    # The follower is now blocked on the leader's lock stripe
+    wait_until(lambda: 'contract' in follower._inflight)
+    time.sleep(0.05)
+    release.set()
+    lead_thread.join(5)
+    follow_thread.join(5)
+
+    assert 'computed' not in outcome
+    assert str(outcome['error']) == 'ValueError: model unavailable'
+
+
+@pytest.mark.skipif(fcntl is None, reason='needs flock')
+def test_stale_outcomes_are_not_reused(tmp_path):
+    flights = SingleFlight(str(tmp_path))
+    assert flights.do('contract', lambda: 1) == 1
+    assert flights.do('contract', lambda: 2) == 2
@@ -0,0 +1,56 @@
+from analyzer.solidity_parser import parse_source, resolve_import, suffix_index
+
+SOURCE = '''
+pragma solidity ^0.8.0;
+
+import "@openzeppelin/contracts/token/ERC20/ERC20.sol";
+import {IERC20 as Token, SafeERC20} from "./utils/SafeERC20.sol";
+import "./Lib.sol" as Lib;
+
+// contract Commented is ERC721 {}
+abstract contract Base is ERC20, Lib.Ownable("owner") {
+    uint256 public cap;
+    function mint(address to, uint amount) external returns (bool) {}
+    event Minted(address indexed to, uint256 amount);
+}
+
+contract Token is Base {}
+'''
+
+
+def test_parses_imports_with_aliases():
+    unit = parse_source(SOURCE)
+    plain, symbols, aliased = unit.imports
+    assert plain.path == '@openzeppelin/contracts/token/ERC20/ERC20.sol' and plain.symbols == {}
+    assert symbols.symbols == {'Token': 'IERC20', 'SafeERC20': 'SafeERC20'}
+    assert aliased.unit_alias == 'Lib'
+
+
+def test_parses_contracts_bases_and_signatures():
+    base, token = parse_source(SOURCE).contracts
+    assert (base.name, base.kind, base.is_abstract) == ('Base', 'contract', True)
+    assert base.bases == ['ERC20', 'Ownable']
+    assert base.functions == {'mint'} and base.public_variables == {'cap'}
+    mint = next(s for s in base.signatures if s.name == 'mint')
+    assert (mint.params, mint.returns, mint.visibility) == (['address', 'uint'], ['bool'], 'external')
+    assert [(e.name, e.params) for e in base.events] == [('Minted', ['address', 'uint256'])]
+    assert token.bases == ['Base'] and not token.is_abstract
+
+
+def test_same_named_contracts_parse_independently_per_file():
+    erc20 = parse_source('import "./ERC20.sol";\ncontract Token is ERC20 {}').contracts[0]
+    mock = parse_source('contract Token { function ping() external {} }').contracts[0]
+    assert erc20.name == mock.name == 'Token'
+    assert erc20.bases == ['ERC20'] and mock.bases == []
+    assert mock.functions == {'ping'}
+
+
+def test_resolve_import_by_relative_path_and_suffix():
+    by_suffix = suffix_index(['src/Token.sol', 'test/Token.sol', 'lib/openzeppelin/token/ERC20.sol'])
+    assert resolve_import('src/Vault.sol', './Token.sol', by_suffix) == ['src/Token.sol']
+    assert resolve_import('test/mocks/Mock.sol', '../Token.sol', by_suffix) == ['test/Token.sol']
+    assert resolve_import('src/Vault.sol', 'openzeppelin/token/ERC20.sol', by_suffix) == [
+        'lib/openzeppelin/token/ERC20.sol'
+    ]
+    assert resolve_import('src/Vault.sol', 'Token.sol', by_suffix) == ['src/Token.sol', 'test/Token.sol']
+    assert resolve_import('src/Vault.sol', './Missing.sol', by_suffix) == []
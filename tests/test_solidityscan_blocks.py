@@ -0,0 +1,30 @@
+import requests
+
+from solidityscan_blocks import BlockScanner, BlockTarget
+
+
+class FakeHTTP:
+    def __init__(self, status, text):
+        self.status, self.text = status, text
+
+    def post(self, url, **kwargs):
+        response = requests.Response()
+        response.status_code = self.status
+        response._content = self.text.encode('utf-8')
+        return response
+
+
+def scan(status, text):
+    scanner = BlockScanner(base_url='https://scan.test', http=FakeHTTP(status, text))
+    return scanner.scan(BlockTarget('0x' + '1' * 40, 'mainnet', 'etherscan'), token='t')
+
+
+def test_non_object_error_bodies_become_error_events():
+    for status, text in ((400, '["bad address"]'), (502, '"upstream down"')):
+        event = scan(status, text)
+        assert event['status'] == 'error'
+        assert 'bad address' in event['message'] or 'upstream down' in event['message']
+
+
+def test_non_object_success_body_is_not_a_crash():
+    assert scan(200, '[1, 2]')['status'] == 'success'
@@ -0,0 +1,36 @@
+import subprocess
+
+import solidityscan_cache
+from solidityscan_cache import is_allowed_project_url, resolve_commit
+
+
+def test_upload_pack_option_is_not_executed(tmp_path):
+    probe = tmp_path / 'pwned_probe'
+    assert resolve_commit(f'--upload-pack=touch {probe};', 'main') is None
+    assert not probe.exists()
+
+
+def test_disallowed_urls_never_reach_git(monkeypatch):
+    calls = []
+    monkeypatch.setattr(solidityscan_cache.subprocess, 'run', lambda *args, **kwargs: calls.append(args))
+    for url in ('--upload-pack=id', 'file:///etc', '/srv/repo', 'ssh://github.com/a/b', 'http://github.com/a/b',
+                'https://evil.example/a/b', 'https://user:pw@github.com/a/b', 'https://github.com:2222/a/b',
+                'https://github.com/a/b --upload-pack=id', 'ext::sh -c id'):
+        assert not is_allowed_project_url(url)
+        assert resolve_commit(url, 'main') is None
+    assert calls == []
+
+
+def test_allowed_url_is_passed_after_end_of_options(monkeypatch):
+    seen = {}
+
+    def fake_run(command, **kwargs):
+        seen['command'] = command
+        seen['env'] = kwargs['env']
+        return subprocess.CompletedProcess(command, 0, stdout=f"{'a' * 40}\trefs/heads/main\n", stderr='')
+
+    monkeypatch.setattr(solidityscan_cache.subprocess, 'run', fake_run)
+    assert resolve_commit('https://github.com/org/repo', 'main') == 'a' * 40
+    assert seen['command'][:4] == ['git', 'ls-remote', '--', 'https://github.com/org/repo']
+    assert seen['env']['GIT_ALLOW_PROTOCOL'] == 'https'
+    assert seen['env']['GIT_TERMINAL_PROMPT'] == '0'
@@ -0,0 +1,69 @@
+import threading
+
+import pytest
+import requests
+
+from solidityscan_http import HALF_OPEN, OPEN, CircuitBreaker, SolidityScanHTTPClient
+
+
+@pytest.fixture
+def clock(fake_clock):
+    return fake_clock('solidityscan_http')
+
+
+def open_breaker(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    breaker.record_failure()
+    assert breaker.state == OPEN and not breaker.allow()
+    clock.now += 30
+    return breaker
+
+
+def test_half_open_allows_a_single_trial(clock):
+    breaker = open_breaker(clock)
+    assert breaker.allow()
+    assert breaker.state == HALF_OPEN
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.allow()
+
+
+def test_local_error_during_trial_releases_it(clock):
+    breaker = open_breaker(clock)
+    client = SolidityScanHTTPClient(max_retries=0)
+    client._breakers['scan.test'] = breaker
+
+    def broken_post(*args, **kwargs):
+        raise TypeError('not JSON serializable')
+
+    client.session.post = broken_post
+    with pytest.raises(TypeError):
+        client.post('https://scan.test/x', json=object())
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow()
+
+
+def test_lanes_have_separate_slots():
+    client = SolidityScanHTTPClient(per_host_limit=1)
+    started, release = threading.Event(), threading.Event()
+    response = requests.Response()
+    response.status_code = 200
+
+    def post(url, **kwargs):
+        if url.endswith('/project'):
+            started.set()
+            release.wait(5)
+        return response
+
+    client.session.post = post
+    project = threading.Thread(target=client.post, args=('https://scan.test/project',), kwargs={'lane': 'projects'})
+    project.start()
+    assert started.wait(5)
+    try:
+        slots, _ = client._host('https://scan.test/block', 'blocks')
+        assert slots.acquire(timeout=0.5)
+        slots.release()
+        assert client.post('https://scan.test/block', lane='blocks').status_code == 200
+    finally:
+        release.set()
+        project.join()
@@ -0,0 +1,67 @@
+import threading
+import time
+
+from solidityscan_jobs import FAILED, QUEUED, RUNNING, SUCCEEDED, ScanJobQueue, ScanJobStore, token_key
+
+
+class SlowClient:
+    def __init__(self, calls, release):
+        self.calls = calls
+        self.release = release
+
+    def scan_project(self, **params):
+        self.calls.append(params['name'])
+        self.release.wait(5)
+        return {'status': 'success'}
+
+
+def make_queue(path, calls, release, lease_seconds=60):
+    return ScanJobQueue(lambda token: SlowClient(calls, release), ScanJobStore(path), default_token='default',
+                        lease_seconds=lease_seconds)
+
+
+def wait_for(predicate, timeout=5):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_second_worker_does_not_rerun_leased_jobs(tmp_path):
+    path = str(tmp_path / 'jobs.sqlite3')
+    calls, release = [], threading.Event()
+    first = make_queue(path, calls, release)
+    job = first.submit({'name': 'a'})
+    assert wait_for(lambda: first.get(job['job_id'])['status'] == RUNNING)
+
+    second = make_queue(path, calls, release)
+    second.start()
+    release.set()
+    assert wait_for(lambda: first.get(job['job_id'])['status'] == SUCCEEDED)
+    assert calls == ['a']
+
+
+def test_expired_lease_is_claimed_by_exactly_one_worker(tmp_path):
+    path = str(tmp_path / 'jobs.sqlite3')
+    store = ScanJobStore(path)
+    store.create('dead', token_key('default'), {'name': 'a'}, 'gone-worker', time.time() - 1)
+    store.update('dead', RUNNING)
+
+    claims = [ScanJobStore(path).claim_expired(f'w{i}', time.time(), 60) for i in range(3)]
+    assert sorted(len(claimed) for claimed in claims) == [0, 0, 1]
+    assert store.get('dead')['status'] == QUEUED
+
+
+def test_recovered_job_with_unknown_token_fails(tmp_path):
+    path = str(tmp_path / 'jobs.sqlite3')
+    store = ScanJobStore(path)
+    store.create('private', token_key('per-request'), {'name': 'a'}, 'gone-worker', time.time() - 1)
+
+    calls, release = [], threading.Event()
+    release.set()
+    queue = make_queue(path, calls, release)
+    queue.start()
+    assert queue.get('private')['status'] == FAILED
+    assert calls == []
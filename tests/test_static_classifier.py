@@ -0,0 +1,87 @@
+import pytest
+
+from analyzer.static_classifier import StaticClassifier, eip_families, normalize_eip
+
+OZ_TOKEN = (
+    'import "@openzeppelin/contracts/token/ERC20/ERC20.sol";\n'
+    'contract Token is ERC20 { constructor() ERC20("Token", "TKN") {} }\n'
+)
+MOCK_TOKEN = 'contract Token { function ping() external {} }\n'
+
+
+def complies(verdict):
+    return verdict is not None and verdict.startswith('✅')
+
+
+@pytest.mark.parametrize('eip, expected', [
+    ('ERC-20', 'ERC20'), ('eip721', 'ERC721'), ('ERC20', 'ERC20'), ('ABC', None),
+])
+def test_normalize_eip(eip, expected):
+    assert normalize_eip(eip) == expected
+
+
+def test_eip_families_skip_helpers():
+    assert eip_families('ERC20Permit') == {'ERC20'}
+    assert eip_families('IERC721') == {'ERC721'}
+    assert eip_families('ERC4626') == {'ERC20', 'ERC4626'}
+    assert eip_families('ERC721Holder') == set()
+
+
+def test_openzeppelin_base_complies():
+    classifier = StaticClassifier({'contracts/Token.sol': OZ_TOKEN})
+    assert complies(classifier.classify('contracts/Token.sol', 'ERC-20'))
+    assert not complies(classifier.classify('contracts/Token.sol', 'ERC721'))
+
+
+@pytest.mark.parametrize('order', [1, -1])
+def test_same_named_contract_in_another_file_is_not_used(order):
+    files = dict(list({'contracts/Token.sol': OZ_TOKEN, 'test/mocks/Token.sol': MOCK_TOKEN}.items())[::order])
+    classifier = StaticClassifier(files)
+    assert complies(classifier.classify('contracts/Token.sol', 'ERC20'))
+    assert classifier.classify('test/mocks/Token.sol', 'ERC20').startswith('❌')
+
+
+def test_usage_only_contract_is_not_credited_with_a_namesake_token():
+    classifier = StaticClassifier({
+        'src/T.sol': 'import "@openzeppelin/contracts/token/ERC20/ERC20.sol";\ncontract T is ERC20 {}\n',
+        'src/payments/T.sol': (
+            'import "@openzeppelin/contracts/token/ERC20/utils/SafeERC20.sol";\n'
+            'contract T { using SafeERC20 for IERC20; }\n'
+        ),
+    })
+    verdict = classifier.classify('src/payments/T.sol', 'ERC20')
+    assert verdict.startswith('❌') and 'IERC20' in verdict
+
+
+def test_bases_resolve_through_the_importing_files_imports():
+    classifier = StaticClassifier({
+        'src/Base.sol': 'import "@openzeppelin/contracts/token/ERC20/ERC20.sol";\nabstract contract Base is ERC20 {}\n',
+        'test/Base.sol': 'abstract contract Base { function ping() external {} }\n',
+        'src/Token.sol': 'import {Base as Parent} from "./Base.sol";\ncontract Token is Parent {}\n',
+        'test/Token.sol': 'import "./Base.sol";\ncontract Token is Base {}\n',
+    })
+    assert complies(classifier.classify('src/Token.sol', 'ERC20'))
+    assert classifier.classify('test/Token.sol', 'ERC20').startswith('❌')
+    assert classifier.lookup('Parent', 'src/Token.sol')[0] == 'src/Base.sol'
+
+
+def test_unimported_base_falls_back_to_any_declaration():
+    classifier = StaticClassifier({
+        'src/Base.sol': 'import "@openzeppelin/contracts/token/ERC20/ERC20.sol";\nabstract contract Base is ERC20 {}\n',
+        'src/Token.sol': 'contract Token is Base {}\n',
+    })
+    assert complies(classifier.classify('src/Token.sol', 'ERC20'))
+
+
+def test_openzeppelin_import_wins_over_a_namesake_elsewhere():
+    classifier = StaticClassifier({
+        'src/Token.sol': OZ_TOKEN,
+        'test/ERC20.sol': 'contract ERC20 { function ping() external {} }\n',
+    })
+    assert classifier.lookup('ERC20', 'src/Token.sol') is None
+    assert complies(classifier.classify('src/Token.sol', 'ERC20'))
+
+
+def test_unresolved_bases_leave_the_verdict_to_the_model():
+    classifier = StaticClassifier({'src/Token.sol': 'import "solmate/tokens/ERC20.sol";\ncontract Token is ERC20 {}\n'})
+    assert classifier.classify('src/Token.sol', 'ERC20') is None